@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Alerta
+from core.facetas import nova_versao
+from .models import Alerta, RegraAlerta
 
 
 @admin.register(Alerta)
@@ -30,5 +31,30 @@ class AlertaAdmin(admin.ModelAdmin):
     def marcar_como_resolvido(self, request, queryset):
         from django.utils import timezone
         queryset.update(resolvido=True, data_resolucao=timezone.now())
+        nova_versao(Alerta)
         self.message_user(request, f'{queryset.count()} alertas marcados como resolvidos.')
     marcar_como_resolvido.short_description = 'Marcar como resolvido'
+
+
+@admin.register(RegraAlerta)
+class RegraAlertaAdmin(admin.ModelAdmin):
+    list_display = [
+        'tipo_residuo', 'empresa', 'limite_quase_cheia',
+        'limite_cheia', 'temperatura_maxima', 'is_active'
+    ]
+    list_filter = ['tipo_residuo', 'is_active']
+    search_fields = ['empresa__nome']
+    readonly_fields = ['created_at', 'updated_at']
+    autocomplete_fields = ['empresa']
+    
+    fieldsets = (
+        ('Aplicação', {
+            'fields': ('tipo_residuo', 'empresa', 'is_active')
+        }),
+        ('Limites', {
+            'fields': ('limite_quase_cheia', 'limite_cheia', 'temperatura_maxima')
+        }),
+        ('Controle', {
+            'fields': ('created_at', 'updated_at')
+        }),
+    )
@@ -5,3 +5,13 @@ class AlertasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.alertas'
     verbose_name = 'Alertas'
+
+    def ready(self):
+        # Versão dos dados das contagens por faceta
+        from core.facetas import registrar_versao
+        from .models import Alerta
+        registrar_versao(Alerta)
+
+        # Regras de alerta compiladas em memória: invalidadas a cada alteração
+        from . import regras
+        regras.registrar()
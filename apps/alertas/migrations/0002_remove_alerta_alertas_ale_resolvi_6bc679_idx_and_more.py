@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:56
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Índices criados sem bloquear escritas nas tabelas
+    atomic = False
+
+    dependencies = [
+        ('alertas', '0001_initial'),
+    ]
+
+    operations = [
+        RemoveIndexConcurrently(
+            model_name='alerta',
+            name='alertas_ale_resolvi_6bc679_idx',
+        ),
+        AddIndexConcurrently(
+            model_name='alerta',
+            index=models.Index(condition=models.Q(('resolvido', False)), fields=['bombona', 'tipo'], name='alerta_aberto_bomb_tipo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='alerta',
+            index=models.Index(condition=models.Q(('resolvido', False)), fields=['nivel', 'tipo'], name='alerta_aberto_nivel_tipo_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.9 on 2026-10-19 13:26
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    # Índices criados sem bloquear escritas nas tabelas
+    atomic = False
+
+    dependencies = [
+        ('alertas', '0002_remove_alerta_alertas_ale_resolvi_6bc679_idx_and_more'),
+        ('empresas', '0002_empresa_busca_trgm'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='alerta',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('descricao'), name='gin_trgm_ops'), name='alerta_descricao_trgm'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.9 on 2026-10-19 13:37
+
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+
+def resolver_duplicados(apps, schema_editor):
+    """Mantém só o alerta aberto mais antigo de cada bombona/tipo antes da constraint"""
+    Alerta = apps.get_model('alertas', 'Alerta')
+    agora = timezone.now()
+    anterior = Alerta.objects.filter(
+        bombona_id=OuterRef('bombona_id'),
+        tipo=OuterRef('tipo'),
+        resolvido=False,
+        id__lt=OuterRef('id'),
+    )
+    Alerta.objects.filter(resolvido=False).filter(Exists(anterior)).update(
+        resolvido=True,
+        data_resolucao=agora,
+        observacoes_resolucao='Alerta duplicado - resolvido automaticamente',
+        updated_at=agora,
+    )
+
+
+class Migration(migrations.Migration):
+
+    # Índice único criado sem bloquear escritas na tabela
+    atomic = False
+
+    dependencies = [
+        ('alertas', '0003_alerta_alerta_descricao_trgm'),
+    ]
+
+    operations = [
+        migrations.RunPython(resolver_duplicados, migrations.RunPython.noop),
+        # Mesmo índice que o AddConstraint criaria, mas com CONCURRENTLY. Um índice
+        # inválido de uma execução interrompida é removido antes de recriar.
+        migrations.RunSQL(
+            sql=[
+                'DROP INDEX CONCURRENTLY IF EXISTS "alerta_aberto_bomb_tipo_uniq"',
+                'CREATE UNIQUE INDEX CONCURRENTLY "alerta_aberto_bomb_tipo_uniq" '
+                'ON "alertas_alerta" ("bombona_id", "tipo") WHERE NOT "resolvido"',
+            ],
+            reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "alerta_aberto_bomb_tipo_uniq"',
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='alerta',
+                    constraint=models.UniqueConstraint(condition=models.Q(('resolvido', False)), fields=('bombona', 'tipo'), name='alerta_aberto_bomb_tipo_uniq'),
+                ),
+            ],
+        ),
+        RemoveIndexConcurrently(
+            model_name='alerta',
+            name='alerta_aberto_bomb_tipo_idx',
+        ),
+    ]
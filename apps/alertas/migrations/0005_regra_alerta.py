@@ -0,0 +1,68 @@
+# Generated by Django 4.2.9 on 2026-10-19 13:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+from decimal import Decimal
+
+
+# Resíduos perigosos com limites mais restritivos que o padrão (80% / 95% / 40 °C)
+REGRAS_INICIAIS = [
+    ('hospitalar_radioativo', Decimal('60'), Decimal('80'), Decimal('30')),
+    ('solventes_organicos', Decimal('70'), Decimal('85'), Decimal('35')),
+]
+
+
+def criar_regras_iniciais(apps, schema_editor):
+    RegraAlerta = apps.get_model('alertas', 'RegraAlerta')
+    RegraAlerta.objects.bulk_create([
+        RegraAlerta(
+            tipo_residuo=tipo,
+            limite_quase_cheia=quase_cheia,
+            limite_cheia=cheia,
+            temperatura_maxima=temperatura,
+        )
+        for tipo, quase_cheia, cheia, temperatura in REGRAS_INICIAIS
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresas', '0002_empresa_busca_trgm'),
+        ('alertas', '0004_alerta_aberto_unico'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegraAlerta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_residuo', models.CharField(blank=True, choices=[('hospitalar_infectante', 'Hospitalar Infectante (Classe A)'), ('hospitalar_quimico', 'Hospitalar Químico (Classe B)'), ('hospitalar_radioativo', 'Hospitalar Radioativo (Classe C)'), ('hospitalar_perfurocortante', 'Hospitalar Perfurocortante (Classe E)'), ('industrial_toxico', 'Industrial Tóxico'), ('solventes_organicos', 'Solventes Orgânicos'), ('metais_pesados', 'Metais Pesados'), ('acidos_bases', 'Ácidos e Bases'), ('laboratorio_quimico', 'Laboratório Químico'), ('farmaceutico', 'Farmacêutico'), ('outros_perigosos', 'Outros Perigosos')], default='', help_text='Vazio: todos os tipos', max_length=30, verbose_name='Tipo de Resíduo')),
+                ('limite_quase_cheia', models.DecimalField(decimal_places=2, default=80, help_text='Ocupação a partir da qual a bombona fica quase cheia (alerta de nível alto)', max_digits=5, verbose_name='Nível Alto (%)')),
+                ('limite_cheia', models.DecimalField(decimal_places=2, default=95, help_text='Ocupação a partir da qual a bombona fica cheia (alerta de nível crítico)', max_digits=5, verbose_name='Nível Crítico (%)')),
+                ('temperatura_maxima', models.DecimalField(decimal_places=2, default=40, help_text='Acima dela é gerado alerta de temperatura alta', max_digits=5, verbose_name='Temperatura Máxima (°C)')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Ativa')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('empresa', models.ForeignKey(blank=True, help_text='Vazio: todas as empresas', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='regras_alerta', to='empresas.empresa', verbose_name='Empresa')),
+            ],
+            options={
+                'verbose_name': 'Regra de Alerta',
+                'verbose_name_plural': 'Regras de Alerta',
+                'ordering': ['tipo_residuo', 'empresa'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='regraalerta',
+            constraint=models.UniqueConstraint(condition=models.Q(('empresa__isnull', False)), fields=('tipo_residuo', 'empresa'), name='regra_alerta_tipo_empresa_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='regraalerta',
+            constraint=models.UniqueConstraint(condition=models.Q(('empresa__isnull', True)), fields=('tipo_residuo',), name='regra_alerta_tipo_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='regraalerta',
+            constraint=models.CheckConstraint(check=models.Q(('limite_quase_cheia__lte', models.F('limite_cheia'))), name='regra_alerta_limites_ordem'),
+        ),
+        migrations.RunPython(criar_regras_iniciais, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,10 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.core.exceptions import ValidationError
+from django.db import connections, models, router, transaction
+from django.db.models.constants import OnConflict
+from django.db.models.functions import Upper
 from apps.bombonas.models import Bombona
+from apps.empresas.models import Empresa
 
 
 class Alerta(models.Model):
@@ -21,6 +26,14 @@ class Alerta(models.Model):
         ('critico', 'Crítico'),
     ]
     
+    # Cores do nível de alerta
+    NIVEL_CORES = {
+        'baixo': 'blue',
+        'medio': 'yellow',
+        'alto': 'orange',
+        'critico': 'red',
+    }
+    
     # Bombona relacionada
     bombona = models.ForeignKey(
         Bombona,
@@ -67,20 +80,167 @@ class Alerta(models.Model):
         indexes = [
             models.Index(fields=['-data_alerta']),
             models.Index(fields=['bombona']),
-            models.Index(fields=['resolvido']),
             models.Index(fields=['nivel']),
+            # Alertas abertos: contagens por nível e agrupamento por tipo nos dashboards
+            models.Index(
+                fields=['nivel', 'tipo'],
+                condition=models.Q(resolvido=False),
+                name='alerta_aberto_nivel_tipo_idx',
+            ),
+            # Busca (?search=) por trigramas
+            GinIndex(OpClass(Upper('descricao'), name='gin_trgm_ops'), name='alerta_descricao_trgm'),
+        ]
+        constraints = [
+            # No máximo um alerta aberto por bombona/tipo, garantido pelo banco
+            # (também serve de índice para os alertas abertos da bombona)
+            models.UniqueConstraint(
+                fields=['bombona', 'tipo'],
+                condition=models.Q(resolvido=False),
+                name='alerta_aberto_bomb_tipo_uniq',
+            ),
         ]
     
     def __str__(self):
         return f"{self.get_tipo_display()} - {self.bombona.identificacao} - {self.data_alerta.strftime('%d/%m/%Y %H:%M')}"
     
+    @classmethod
+    def criar_em_lote(cls, alertas):
+        """
+        Insere os alertas em lote com INSERT ... ON CONFLICT DO NOTHING
+        Alertas de uma bombona/tipo que já tem alerta aberto são descartados pelo
+        banco, sem consulta prévia e sem duplicatas entre workers simultâneos.
+        Retorna os alertas inseridos (com pk).
+        """
+        from core.facetas import nova_versao
+        from apps.monitoramento.metricas import incrementar
+        
+        alertas = list(alertas)
+        if not alertas:
+            return []
+        
+        # bulk_create(ignore_conflicts=True) não informa quais linhas entraram:
+        # o mesmo INSERT é montado aqui com RETURNING
+        banco = router.db_for_write(cls)
+        campos = [campo for campo in cls._meta.concrete_fields if not campo.primary_key]
+        tamanho = connections[banco].ops.bulk_batch_size(campos, alertas) or len(alertas)
+        inseridos = {}
+        with transaction.atomic(using=banco, savepoint=False):
+            for inicio in range(0, len(alertas), tamanho):
+                lote = alertas[inicio:inicio + tamanho]
+                linhas = cls._base_manager._insert(
+                    lote, fields=campos, returning_fields=[cls._meta.pk, cls._meta.get_field('bombona'),
+                                                           cls._meta.get_field('tipo')],
+                    using=banco, on_conflict=OnConflict.IGNORE,
+                )
+                # INSERT de uma linha ignorado pelo conflito: o compilador retorna [None]
+                inseridos.update({(linha[1], linha[2]): linha[0] for linha in linhas if linha})
+        
+        criados = []
+        for alerta in alertas:
+            pk = inseridos.pop((alerta.bombona_id, alerta.tipo), None)
+            if pk is not None:
+                alerta.pk = pk
+                alerta._state.adding = False
+                alerta._state.db = banco
+                criados.append(alerta)
+        
+        # _insert não dispara post_save: métrica e versão das facetas atualizadas aqui
+        if criados:
+            def contar():
+                for alerta in criados:
+                    incrementar('iowaste_alertas_criados_total', tipo=alerta.tipo)
+            
+            transaction.on_commit(contar, using=banco)
+            nova_versao(cls)
+        return criados
+    
     @property
     def nivel_color(self):
         """Retorna cor do nível de alerta"""
-        colors = {
-            'baixo': 'blue',
-            'medio': 'yellow',
-            'alto': 'orange',
-            'critico': 'red',
-        }
-        return colors.get(self.nivel, 'gray')
+        return self.NIVEL_CORES.get(self.nivel, 'gray')
+
+
+class RegraAlerta(models.Model):
+    """
+    Limites de alerta e de status por tipo de resíduo e/ou empresa
+    Tipo ou empresa vazios valem para todos. Precedência: empresa + tipo, tipo,
+    empresa e, sem regra, os limites padrão da Bombona.
+    """
+    
+    tipo_residuo = models.CharField(
+        max_length=30,
+        choices=Bombona.TIPO_RESIDUO_CHOICES,
+        blank=True,
+        default='',
+        verbose_name='Tipo de Resíduo',
+        help_text='Vazio: todos os tipos'
+    )
+    empresa = models.ForeignKey(
+        Empresa,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='regras_alerta',
+        verbose_name='Empresa',
+        help_text='Vazio: todas as empresas'
+    )
+    
+    # Limites
+    limite_quase_cheia = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=Bombona.LIMITE_QUASE_CHEIA,
+        verbose_name='Nível Alto (%)',
+        help_text='Ocupação a partir da qual a bombona fica quase cheia (alerta de nível alto)'
+    )
+    limite_cheia = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=Bombona.LIMITE_CHEIA,
+        verbose_name='Nível Crítico (%)',
+        help_text='Ocupação a partir da qual a bombona fica cheia (alerta de nível crítico)'
+    )
+    temperatura_maxima = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=Bombona.LIMITE_TEMPERATURA,
+        verbose_name='Temperatura Máxima (°C)',
+        help_text='Acima dela é gerado alerta de temperatura alta'
+    )
+    
+    # Controle
+    is_active = models.BooleanField(default=True, verbose_name='Ativa')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
+    
+    class Meta:
+        verbose_name = 'Regra de Alerta'
+        verbose_name_plural = 'Regras de Alerta'
+        ordering = ['tipo_residuo', 'empresa']
+        constraints = [
+            # Uma regra por combinação (empresa vazia conta como um valor)
+            models.UniqueConstraint(
+                fields=['tipo_residuo', 'empresa'],
+                condition=models.Q(empresa__isnull=False),
+                name='regra_alerta_tipo_empresa_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['tipo_residuo'],
+                condition=models.Q(empresa__isnull=True),
+                name='regra_alerta_tipo_uniq',
+            ),
+            models.CheckConstraint(
+                check=models.Q(limite_quase_cheia__lte=models.F('limite_cheia')),
+                name='regra_alerta_limites_ordem',
+            ),
+        ]
+    
+    def __str__(self):
+        tipo = self.get_tipo_residuo_display() if self.tipo_residuo else 'Todos os tipos'
+        empresa = self.empresa.nome if self.empresa_id else 'Todas as empresas'
+        return f"{tipo} - {empresa}"
+    
+    def clean(self):
+        if self.limite_quase_cheia is not None and self.limite_cheia is not None:
+            if self.limite_quase_cheia > self.limite_cheia:
+                raise ValidationError({'limite_quase_cheia': 'O nível alto não pode ser maior que o nível crítico.'})
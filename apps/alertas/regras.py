@@ -0,0 +1,238 @@
+"""
+Regras de alerta (RegraAlerta) compiladas em um avaliador em memória
+
+O avaliador resolve uma única vez a precedência das regras (empresa + tipo, tipo,
+empresa, padrão) em uma tabela de limites e a aplica a lotes de bombonas lidas:
+o simulador e a ingestão de leituras avaliam o ciclo inteiro de uma vez. Os mesmos
+limites são compilados em CASE para os UPDATEs que calculam o status no banco.
+
+Cada processo guarda o avaliador e confere a versão das regras no cache a cada
+REGRAS_ALERTA_INTERVALO segundos; a versão é trocada após o commit de qualquer
+alteração nas regras, e o processo que alterou descarta o seu avaliador na hora.
+Após o commit, o status das bombonas cobertas pela regra alterada é recalculado.
+"""
+import time
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.signals import post_save, post_delete, pre_save
+
+from apps.bombonas.models import Bombona
+from core.facetas import nova_versao, versao_dados
+from .models import Alerta, RegraAlerta
+
+
+Limites = namedtuple('Limites', ['quase_cheia', 'cheia', 'temperatura'])
+
+LIMITES_PADRAO = Limites(
+    Decimal(Bombona.LIMITE_QUASE_CHEIA),
+    Decimal(Bombona.LIMITE_CHEIA),
+    Decimal(Bombona.LIMITE_TEMPERATURA),
+)
+
+CENTESIMO = Decimal('0.01')
+
+
+def ocupacao(bombona):
+    """
+    Percentual de ocupação em Decimal, arredondado como o ROUND(..., 2) do
+    status_por_peso: bombona.percentual_ocupacao (float) pode cair do outro lado
+    do limite (119,99 kg de 200 kg dá 59,99 no float e 60,00 no banco)
+    """
+    if not bombona.capacidade or bombona.capacidade <= 0:
+        return Decimal('0')
+    percentual = Decimal(bombona.peso_atual) * 100 / Decimal(bombona.capacidade)
+    return percentual.quantize(CENTESIMO, rounding=ROUND_HALF_UP)
+
+
+class Avaliador:
+    """Limites por (empresa, tipo de resíduo) já resolvidos e avaliação em lote"""
+
+    def __init__(self, regras):
+        self.padrao = LIMITES_PADRAO
+        self._empresa_tipo = {}
+        self._tipo = {}
+        self._empresa = {}
+        for regra in regras:
+            limites = Limites(regra.limite_quase_cheia, regra.limite_cheia, regra.temperatura_maxima)
+            if regra.empresa_id and regra.tipo_residuo:
+                self._empresa_tipo[(regra.empresa_id, regra.tipo_residuo)] = limites
+            elif regra.tipo_residuo:
+                self._tipo[regra.tipo_residuo] = limites
+            elif regra.empresa_id:
+                self._empresa[regra.empresa_id] = limites
+            else:
+                self.padrao = limites
+        self._resolvidos = {}
+
+    def limites(self, empresa_id, tipo_residuo):
+        chave = (empresa_id, tipo_residuo)
+        limites = self._resolvidos.get(chave)
+        if limites is None:
+            limites = (
+                self._empresa_tipo.get(chave) or
+                self._tipo.get(tipo_residuo) or
+                self._empresa.get(empresa_id) or
+                self.padrao
+            )
+            self._resolvidos[chave] = limites
+        return limites
+
+    def limites_bombona(self, bombona):
+        return self.limites(bombona.empresa_id, bombona.tipo_residuo)
+
+    def status(self, bombona):
+        """Status pela ocupação (mesmo critério de Bombona.status_por_peso)"""
+        if not bombona.is_active:
+            return 'inativa'
+        if bombona.status == 'manutencao':
+            return 'manutencao'
+        limites = self.limites_bombona(bombona)
+        percentual = ocupacao(bombona)
+        if percentual >= limites.cheia:
+            return 'cheia'
+        if percentual >= limites.quase_cheia:
+            return 'quase_cheia'
+        return 'normal'
+
+    def alertas(self, bombonas):
+        """Alertas (não salvos) das leituras de um lote de bombonas"""
+        alertas = []
+        for bombona in bombonas:
+            limites = self.limites_bombona(bombona)
+            percentual = ocupacao(bombona)
+
+            # Alerta de nível crítico
+            if percentual >= limites.cheia:
+                alertas.append(Alerta(
+                    bombona=bombona,
+                    tipo='nivel_critico',
+                    nivel='critico',
+                    descricao=f'Bombona {bombona.identificacao} atingiu {percentual:.1f}% de capacidade. Coleta urgente necessária!'
+                ))
+
+            # Alerta de nível alto
+            elif percentual >= limites.quase_cheia:
+                alertas.append(Alerta(
+                    bombona=bombona,
+                    tipo='nivel_alto',
+                    nivel='alto',
+                    descricao=f'Bombona {bombona.identificacao} atingiu {percentual:.1f}% de capacidade. Agendar coleta em breve.'
+                ))
+
+            # Alerta de temperatura alta
+            if bombona.temperatura > limites.temperatura:
+                alertas.append(Alerta(
+                    bombona=bombona,
+                    tipo='temperatura_alta',
+                    nivel='medio',
+                    descricao=f'Bombona {bombona.identificacao} com temperatura elevada: {bombona.temperatura}°C'
+                ))
+        return alertas
+
+    def limite_sql(self, campo):
+        """
+        Expressão com o limite (`quase_cheia`, `cheia` ou `temperatura`) de cada bombona
+        Para consultas e UPDATEs na tabela de bombonas, na ordem de precedência das regras.
+        """
+        condicoes = [
+            When(Q(empresa_id=empresa_id, tipo_residuo=tipo), then=Value(getattr(limites, campo)))
+            for (empresa_id, tipo), limites in self._empresa_tipo.items()
+        ] + [
+            When(tipo_residuo=tipo, then=Value(getattr(limites, campo)))
+            for tipo, limites in self._tipo.items()
+        ] + [
+            When(empresa_id=empresa_id, then=Value(getattr(limites, campo)))
+            for empresa_id, limites in self._empresa.items()
+        ]
+        padrao = Value(getattr(self.padrao, campo))
+        if not condicoes:
+            return padrao
+        return Case(
+            *condicoes,
+            default=padrao,
+            output_field=models.DecimalField(max_digits=5, decimal_places=2),
+        )
+
+
+_local = {'avaliador': None, 'versao': None, 'verificado_em': 0.0}
+
+
+def compilar():
+    """Avaliador com as regras ativas do banco"""
+    return Avaliador(RegraAlerta.objects.filter(is_active=True))
+
+
+def avaliador():
+    """Avaliador do processo, recompilado quando a versão das regras muda"""
+    agora = time.monotonic()
+    atual = _local['avaliador']
+    if atual is not None and agora - _local['verificado_em'] < settings.REGRAS_ALERTA_INTERVALO:
+        return atual
+
+    # A versão é lida antes das regras: uma alteração durante a compilação troca a
+    # versão de novo e o avaliador é recompilado na próxima verificação
+    versao = versao_dados([RegraAlerta])
+    if atual is None or versao is None or versao != _local['versao']:
+        atual = compilar()
+    _local.update(avaliador=atual, versao=versao, verificado_em=agora)
+    return atual
+
+
+def invalidar():
+    _local.update(avaliador=None, versao=None, verificado_em=0.0)
+
+
+def bombonas_cobertas(empresa_id, tipo_residuo):
+    """Bombonas ativas no escopo de uma regra (inclui as cobertas por regras mais específicas)"""
+    bombonas = Bombona.objects.filter(is_active=True)
+    if empresa_id:
+        bombonas = bombonas.filter(empresa_id=empresa_id)
+    if tipo_residuo:
+        bombonas = bombonas.filter(tipo_residuo=tipo_residuo)
+    return bombonas
+
+
+def recalcular_status(escopos):
+    """Regrava o status das bombonas dos escopos cujo status mudou com as regras atuais"""
+    consulta = Q()
+    for empresa_id, tipo_residuo in escopos:
+        consulta |= Q(pk__in=bombonas_cobertas(empresa_id, tipo_residuo).values('pk'))
+    status = Bombona.status_por_peso()
+    ids = (
+        Bombona.objects.filter(consulta)
+        .alias(novo_status=status)
+        .exclude(status=F('novo_status'))
+        .values_list('id', flat=True)
+    )
+    return Bombona.atualizar_em_lote(ids, status=status)
+
+
+def _escopo_anterior(sender, instance, **kwargs):
+    # Uma regra que muda de empresa/tipo deixa de cobrir as bombonas do escopo antigo
+    anterior = RegraAlerta.objects.filter(pk=instance.pk).values_list('empresa_id', 'tipo_residuo').first()
+    instance._escopo_anterior = anterior
+
+
+def _regras_alteradas(sender, instance, **kwargs):
+    nova_versao(RegraAlerta)
+    escopos = {(instance.empresa_id, instance.tipo_residuo)}
+    anterior = getattr(instance, '_escopo_anterior', None)
+    if anterior:
+        escopos.add(anterior)
+
+    def aplicar():
+        invalidar()
+        recalcular_status(escopos)
+
+    transaction.on_commit(aplicar)
+
+
+def registrar():
+    """Troca a versão das regras e recalcula os status a cada save/delete"""
+    pre_save.connect(_escopo_anterior, sender=RegraAlerta, dispatch_uid='regras_alerta_escopo')
+    post_save.connect(_regras_alteradas, sender=RegraAlerta, dispatch_uid='regras_alerta_salva')
+    post_delete.connect(_regras_alteradas, sender=RegraAlerta, dispatch_uid='regras_alerta_removida')
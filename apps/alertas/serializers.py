@@ -1,10 +1,13 @@
 from rest_framework import serializers
 from .models import Alerta
+from core.serializacao import CamposDinamicosMixin, SerializerRapido, coluna, data_hora, rotulo
 
 
-class AlertaSerializer(serializers.ModelSerializer):
+class AlertaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer completo para Alerta"""
     
+    dependencias = {'nivel_color': ('nivel',)}
+    
     bombona_identificacao = serializers.CharField(source='bombona.identificacao', read_only=True)
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
     nivel_display = serializers.CharField(source='get_nivel_display', read_only=True)
@@ -19,6 +22,24 @@ class AlertaSerializer(serializers.ModelSerializer):
             'data_alerta', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'data_alerta', 'created_at', 'updated_at']
+    
+    def validate(self, attrs):
+        """Um único alerta aberto por bombona e tipo (constraint alerta_aberto_bomb_tipo_uniq)"""
+        instancia = self.instance
+        bombona = attrs.get('bombona', instancia.bombona if instancia else None)
+        tipo = attrs.get('tipo', instancia.tipo if instancia else None)
+        resolvido = attrs.get('resolvido', instancia.resolvido if instancia else False)
+        
+        if bombona is not None and tipo and not resolvido:
+            abertos = Alerta.objects.filter(bombona=bombona, tipo=tipo, resolvido=False)
+            if instancia is not None:
+                abertos = abertos.exclude(pk=instancia.pk)
+            if abertos.exists():
+                raise serializers.ValidationError({
+                    'tipo': 'Já existe um alerta aberto deste tipo para a bombona.'
+                })
+        
+        return attrs
 
 
 class AlertaListSerializer(serializers.ModelSerializer):
@@ -36,3 +57,20 @@ class AlertaListSerializer(serializers.ModelSerializer):
             'nivel', 'nivel_display', 'nivel_color',
             'descricao', 'resolvido', 'data_alerta'
         ]
+
+
+class AlertaListRapidoSerializer(SerializerRapido):
+    """Mesma saída do AlertaListSerializer a partir de values()"""
+    
+    campos = {
+        'id': coluna('id'),
+        'bombona_identificacao': coluna('bombona__identificacao'),
+        'tipo': coluna('tipo'),
+        'tipo_display': rotulo('tipo', Alerta.TIPO_CHOICES),
+        'nivel': coluna('nivel'),
+        'nivel_display': rotulo('nivel', Alerta.NIVEL_CHOICES),
+        'nivel_color': rotulo('nivel', Alerta.NIVEL_CORES, padrao='gray'),
+        'descricao': coluna('descricao'),
+        'resolvido': coluna('resolvido'),
+        'data_alerta': data_hora('data_alerta'),
+    }
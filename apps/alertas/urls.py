@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import (
-    AlertaListCreateView, AlertaDetailView,
+    AlertaListCreateView, AlertaDetailView, AlertaFacetasView,
     resolver_alerta, alertas_estatisticas
 )
 
@@ -8,5 +8,6 @@ urlpatterns = [
     path('', AlertaListCreateView.as_view(), name='alerta-list-create'),
     path('<int:pk>/', AlertaDetailView.as_view(), name='alerta-detail'),
     path('<int:pk>/resolver/', resolver_alerta, name='resolver-alerta'),
+    path('facetas/', AlertaFacetasView.as_view(), name='alertas-facetas'),
     path('estatisticas/', alertas_estatisticas, name='alertas-estatisticas'),
 ]
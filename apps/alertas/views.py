@@ -5,16 +5,22 @@ from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from .models import Alerta
-from .serializers import AlertaSerializer, AlertaListSerializer
+from .serializers import AlertaSerializer, AlertaListSerializer, AlertaListRapidoSerializer
+from core.busca import BuscaTrigramaFilter
+from core.facetas import FacetasViewMixin
+from core.serializacao import CamposDinamicosViewMixin, ListagemRapidaMixin
 from apps.authentication.permissions import IsOperadorOrAdmin
+from apps.bombonas.models import Bombona
+from apps.empresas.models import Empresa
 
 
-class AlertaListCreateView(generics.ListCreateAPIView):
+class AlertaListCreateView(ListagemRapidaMixin, generics.ListCreateAPIView):
     """View para listar e criar alertas"""
     
     queryset = Alerta.objects.select_related('bombona').all()
+    serializer_rapido_class = AlertaListRapidoSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BuscaTrigramaFilter]
     filterset_fields = ['tipo', 'nivel', 'resolvido', 'bombona']
     search_fields = ['descricao', 'bombona__identificacao']
     ordering_fields = ['data_alerta', 'nivel']
@@ -26,7 +32,19 @@ class AlertaListCreateView(generics.ListCreateAPIView):
         return AlertaSerializer
 
 
-class AlertaDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AlertaFacetasView(FacetasViewMixin, AlertaListCreateView):
+    """Contagens por nível, tipo, situação e empresa dos alertas filtrados"""
+    
+    facetas = {
+        'nivel': 'nivel',
+        'tipo': 'tipo',
+        'resolvido': 'resolvido',
+        'empresa': ('bombona__empresa', 'bombona__empresa__nome'),
+    }
+    facetas_modelos = (Alerta, Bombona, Empresa)
+
+
+class AlertaDetailView(CamposDinamicosViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """View para detalhes, atualização e exclusão de alerta"""
     
     queryset = Alerta.objects.select_related('bombona').all()
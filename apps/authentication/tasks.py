@@ -4,7 +4,7 @@ from django.utils import timezone
 from .models import Log
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def cleanup_old_logs():
     """Remove logs com mais de 90 dias"""
     cutoff_date = timezone.now() - timedelta(days=90)
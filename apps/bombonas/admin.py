@@ -40,20 +40,25 @@ class BombonaAdmin(admin.ModelAdmin):
     
     actions = ['atualizar_status', 'ativar_bombonas', 'desativar_bombonas']
     
+    # Ações em lote: um SELECT dos ids e um UPDATE com o status calculado no banco,
+    # independente do número de bombonas selecionadas
+    
     def atualizar_status(self, request, queryset):
-        for bombona in queryset:
-            bombona.atualizar_status()
-        self.message_user(request, f'{queryset.count()} bombonas atualizadas.')
+        ids = queryset.values_list('id', flat=True)
+        atualizadas = Bombona.atualizar_em_lote(ids, status=Bombona.status_por_peso())
+        self.message_user(request, f'{atualizadas} bombonas atualizadas.')
     atualizar_status.short_description = 'Atualizar status das bombonas selecionadas'
     
     def ativar_bombonas(self, request, queryset):
-        queryset.update(is_active=True)
-        self.message_user(request, f'{queryset.count()} bombonas ativadas.')
+        ids = queryset.values_list('id', flat=True)
+        atualizadas = Bombona.atualizar_em_lote(ids, is_active=True, status=Bombona.status_por_peso(ativa=True))
+        self.message_user(request, f'{atualizadas} bombonas ativadas.')
     ativar_bombonas.short_description = 'Ativar bombonas selecionadas'
     
     def desativar_bombonas(self, request, queryset):
-        queryset.update(is_active=False)
-        self.message_user(request, f'{queryset.count()} bombonas desativadas.')
+        ids = queryset.values_list('id', flat=True)
+        atualizadas = Bombona.atualizar_em_lote(ids, is_active=False, status=Bombona.status_por_peso(ativa=False))
+        self.message_user(request, f'{atualizadas} bombonas desativadas.')
     desativar_bombonas.short_description = 'Desativar bombonas selecionadas'
 
 
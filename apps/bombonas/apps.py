@@ -1,7 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BombonasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.bombonas'
     verbose_name = 'Bombonas'
+
+    def ready(self):
+        # Versão dos dados das contagens por faceta
+        from core.facetas import registrar_versao
+        from .models import Bombona
+        registrar_versao(Bombona)
+
+        if getattr(settings, 'ESTADO_ATUAL_ATIVO', False):
+            from . import signals
+            signals.conectar()
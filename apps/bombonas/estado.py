@@ -0,0 +1,365 @@
+"""
+Estado atual das bombonas no Redis
+Um hash por bombona com a última leitura (peso, temperatura, status) e os dados
+exibidos no mapa. O PostgreSQL continua sendo a fonte da verdade: o store é
+atualizado após cada commit e reconciliado periodicamente (reconciliar_estado).
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from core.redis import cliente_redis
+
+
+logger = logging.getLogger('iowaste.estado')
+
+# Campos alterados a cada leitura (gravados sem reler a bombona)
+CAMPOS_LEITURA = ('peso_atual', 'temperatura', 'status', 'ultima_leitura', 'updated_at')
+
+# Campos mantidos no hash (mesmos nomes das colunas)
+CAMPOS = (
+    'id', 'identificacao', 'empresa_id', 'latitude', 'longitude', 'endereco_instalacao',
+    'capacidade', 'tipo_residuo', 'created_at',
+) + CAMPOS_LEITURA
+
+# Grava os campos de leitura apenas se o hash completo já existir
+# (um hash parcial seria servido no mapa sem identificação/localização)
+_SCRIPT_LEITURA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    redis.call('HSET', KEYS[1], unpack(ARGV))
+    return 1
+end
+return 0
+"""
+
+
+def ativo():
+    return getattr(settings, 'ESTADO_ATUAL_ATIVO', False)
+
+
+def _cliente():
+    return cliente_redis(settings.ESTADO_ATUAL_REDIS_URL)
+
+
+def _prefixo():
+    # O nome do banco separa o estado do banco de testes/benchmark do estado real
+    return f"iowaste:estado:{connections['default'].settings_dict['NAME']}"
+
+
+def _chave_bombona(bombona_id):
+    return f'{_prefixo()}:bombona:{bombona_id}'
+
+
+def _chave_ativas():
+    return f'{_prefixo()}:ativas'
+
+
+def _chave_sincronizado():
+    return f'{_prefixo()}:sincronizado'
+
+
+def _decimal(valor, casas):
+    """Mesmo formato do DecimalField do DRF (string com casas fixas)"""
+    return str(Decimal(valor).quantize(Decimal(1).scaleb(-casas)))
+
+
+def _data(valor):
+    return valor.isoformat() if valor is not None else ''
+
+
+def _data_iso(valor):
+    return datetime.fromisoformat(valor) if valor else None
+
+
+def _serializar(campo, valor):
+    if campo in ('latitude', 'longitude'):
+        return _decimal(valor, 6)
+    if campo in ('peso_atual', 'capacidade', 'temperatura'):
+        return _decimal(valor, 2)
+    if campo in ('ultima_leitura', 'updated_at', 'created_at'):
+        return _data(valor)
+    if valor is None:
+        return ''
+    return str(valor)
+
+
+def _registro_bombona(bombona, campos=CAMPOS):
+    return {campo: _serializar(campo, getattr(bombona, campo)) for campo in campos}
+
+
+def _registro_valores(linha):
+    return {campo: _serializar(campo, linha[campo]) for campo in CAMPOS}
+
+
+def _decodificar(bruto):
+    return {chave.decode(): valor.decode() for chave, valor in bruto.items()}
+
+
+def gravar_bombona(bombona):
+    """Grava o hash completo da bombona (criação/edição)"""
+    if not ativo():
+        return
+    try:
+        chave = _chave_bombona(bombona.pk)
+        pipe = _cliente().pipeline()
+        if bombona.is_active:
+            pipe.hset(chave, mapping=_registro_bombona(bombona))
+            pipe.sadd(_chave_ativas(), bombona.pk)
+        else:
+            pipe.delete(chave)
+            pipe.srem(_chave_ativas(), bombona.pk)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f'Falha ao gravar estado da bombona {bombona.pk}: {e}')
+
+
+def gravar_leitura(bombona, campos=CAMPOS_LEITURA):
+    """Atualiza somente os campos de leitura (caminho quente do simulador/ingestão)"""
+    if not ativo():
+        return
+    valores = []
+    for campo in campos:
+        if campo in CAMPOS_LEITURA:
+            valores.extend((campo, _serializar(campo, getattr(bombona, campo))))
+    if not valores:
+        return
+    try:
+        cliente = _cliente()
+        cliente.register_script(_SCRIPT_LEITURA)(keys=[_chave_bombona(bombona.pk)], args=valores)
+    except Exception as e:
+        logger.warning(f'Falha ao gravar leitura da bombona {bombona.pk}: {e}')
+
+
+def remover_bombona(bombona_id):
+    if not ativo():
+        return
+    try:
+        pipe = _cliente().pipeline()
+        pipe.delete(_chave_bombona(bombona_id))
+        pipe.srem(_chave_ativas(), bombona_id)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f'Falha ao remover estado da bombona {bombona_id}: {e}')
+
+
+def ler_bombonas_ativas(campos=None):
+    """
+    Hashes de todas as bombonas ativas, ou None quando o store não pode ser usado
+    (desativado, Redis indisponível, ainda não sincronizado ou incompleto)
+    """
+    if not ativo():
+        return None
+    try:
+        cliente = _cliente()
+        pipe = cliente.pipeline(transaction=False)
+        pipe.exists(_chave_sincronizado())
+        pipe.smembers(_chave_ativas())
+        sincronizado, ids = pipe.execute()
+        if not sincronizado:
+            return None
+
+        ids = sorted(int(i) for i in ids)
+        pipe = cliente.pipeline(transaction=False)
+        for bombona_id in ids:
+            if campos:
+                pipe.hmget(_chave_bombona(bombona_id), campos)
+            else:
+                pipe.hgetall(_chave_bombona(bombona_id))
+        brutos = pipe.execute()
+    except Exception as e:
+        logger.warning(f'Falha ao ler estado das bombonas: {e}')
+        return None
+
+    registros = []
+    for bombona_id, bruto in zip(ids, brutos):
+        if campos:
+            if any(valor is None for valor in bruto):
+                return None
+            registro = {'id': str(bombona_id)}
+            registro.update(zip(campos, (valor.decode() for valor in bruto)))
+        else:
+            if not bruto:
+                return None
+            registro = _decodificar(bruto)
+        registros.append(registro)
+    return registros
+
+
+def percentual_ocupacao(registro):
+    capacidade = float(registro['capacidade'])
+    if capacidade > 0:
+        return round((float(registro['peso_atual']) / capacidade) * 100, 2)
+    return 0.0
+
+
+def mapa(status=None, tipo_residuo=None, empresa=None):
+    """Bombonas ativas no formato do BombonaMapSerializer (None: usar o banco)"""
+    from .models import Bombona
+
+    registros = ler_bombonas_ativas()
+    if registros is None:
+        return None
+
+    if status:
+        registros = [r for r in registros if r['status'] == status]
+    if tipo_residuo:
+        registros = [r for r in registros if r['tipo_residuo'] == tipo_residuo]
+    if empresa:
+        registros = [r for r in registros if r['empresa_id'] == str(empresa)]
+
+    # Mesma ordenação do modelo (-created_at)
+    registros.sort(key=lambda r: r['created_at'], reverse=True)
+
+    nomes_empresas = _nomes_empresas({r['empresa_id'] for r in registros})
+    return [
+        {
+            'id': int(r['id']),
+            'identificacao': r['identificacao'],
+            'latitude': r['latitude'],
+            'longitude': r['longitude'],
+            'status': r['status'],
+            'status_color': Bombona.STATUS_CORES.get(r['status'], 'gray'),
+            'tipo_residuo': r['tipo_residuo'],
+            'peso_atual': r['peso_atual'],
+            'capacidade': r['capacidade'],
+            'percentual_ocupacao': percentual_ocupacao(r),
+            'empresa_nome': nomes_empresas.get(r['empresa_id']),
+            'endereco_instalacao': r['endereco_instalacao'],
+        }
+        for r in registros
+    ]
+
+
+def _nomes_empresas(ids):
+    """Nomes das empresas (tabela pequena e raramente alterada)"""
+    from apps.empresas.models import Empresa
+
+    if not ids:
+        return {}
+    return {
+        str(empresa_id): nome
+        for empresa_id, nome in Empresa.objects.filter(id__in=ids).values_list('id', 'nome')
+    }
+
+
+def kpis():
+    """Contagens e peso armazenado das bombonas ativas (None: usar o banco)"""
+    registros = ler_bombonas_ativas(campos=['status', 'peso_atual'])
+    if registros is None:
+        return None
+
+    peso_total = Decimal('0')
+    cheias = quase_cheias = 0
+    for registro in registros:
+        peso_total += Decimal(registro['peso_atual'])
+        if registro['status'] == 'cheia':
+            cheias += 1
+        elif registro['status'] == 'quase_cheia':
+            quase_cheias += 1
+
+    return {
+        'total': len(registros),
+        'cheias': cheias,
+        'quase_cheias': quase_cheias,
+        'peso_total_armazenado': peso_total,
+    }
+
+
+def aplicar_leitura(bombona):
+    """Sobrepõe a última leitura do store à instância (réplicas podem estar atrasadas)"""
+    if not ativo() or not bombona.is_active:
+        return bombona
+    try:
+        valores = _cliente().hmget(_chave_bombona(bombona.pk), CAMPOS_LEITURA)
+    except Exception as e:
+        logger.warning(f'Falha ao ler estado da bombona {bombona.pk}: {e}')
+        return bombona
+    if any(valor is None for valor in valores):
+        return bombona
+
+    leitura = dict(zip(CAMPOS_LEITURA, (valor.decode() for valor in valores)))
+    atualizado_em = _data_iso(leitura['updated_at'])
+    if bombona.updated_at and atualizado_em and atualizado_em <= bombona.updated_at:
+        return bombona
+
+    bombona.peso_atual = Decimal(leitura['peso_atual'])
+    bombona.temperatura = Decimal(leitura['temperatura'])
+    bombona.status = leitura['status']
+    bombona.ultima_leitura = _data_iso(leitura['ultima_leitura'])
+    bombona.updated_at = atualizado_em
+    return bombona
+
+
+def reconciliar_estado(bombona_ids=None):
+    """
+    Regrava o store a partir do PostgreSQL e remove bombonas que não estão mais ativas.
+    Hashes com updated_at mais recente que o banco (leitura gravada durante a
+    reconciliação) são preservados. Retorna contadores de divergência.
+    """
+    from .models import Bombona
+
+    if not ativo():
+        return None
+
+    queryset = Bombona.objects.using('default').filter(is_active=True)
+    if bombona_ids is not None:
+        queryset = queryset.filter(id__in=bombona_ids)
+    linhas = {linha['id']: _registro_valores(linha) for linha in queryset.values(*CAMPOS)}
+
+    cliente = _cliente()
+    ativos_store = {int(i) for i in cliente.smembers(_chave_ativas())}
+    if bombona_ids is not None:
+        ativos_store &= {int(i) for i in bombona_ids}
+
+    ids = sorted(linhas)
+    pipe = cliente.pipeline(transaction=False)
+    for bombona_id in ids:
+        pipe.hgetall(_chave_bombona(bombona_id))
+    atuais = dict(zip(ids, (_decodificar(bruto) for bruto in pipe.execute())))
+
+    resultado = {'ausentes': 0, 'divergentes': 0, 'removidas': 0, 'preservadas': 0}
+    pipe = cliente.pipeline(transaction=False)
+    for bombona_id, registro in linhas.items():
+        atual = atuais[bombona_id]
+        if not atual:
+            resultado['ausentes'] += 1
+        elif atual == registro:
+            continue
+        elif _data_iso(atual.get('updated_at')) > _data_iso(registro['updated_at']):
+            resultado['preservadas'] += 1
+            continue
+        else:
+            resultado['divergentes'] += 1
+        pipe.hset(_chave_bombona(bombona_id), mapping=registro)
+        pipe.sadd(_chave_ativas(), bombona_id)
+
+    for bombona_id in ativos_store - set(linhas):
+        resultado['removidas'] += 1
+        pipe.delete(_chave_bombona(bombona_id))
+        pipe.srem(_chave_ativas(), bombona_id)
+
+    if bombona_ids is None:
+        pipe.set(_chave_sincronizado(), 1)
+    pipe.execute()
+
+    if resultado['divergentes'] or resultado['removidas']:
+        logger.warning(f'Estado das bombonas reconciliado com divergências: {resultado}')
+    return resultado
+
+
+def sincronizar_bombonas(bombona_ids):
+    """Regrava após o commit as bombonas alteradas com update() (que não dispara signals)"""
+    if not ativo():
+        return
+    bombona_ids = list(bombona_ids)
+
+    def sincronizar():
+        try:
+            reconciliar_estado(bombona_ids)
+        except Exception as e:
+            logger.warning(f'Falha ao sincronizar estado das bombonas {bombona_ids}: {e}')
+
+    transaction.on_commit(sincronizar)
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:56
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Índices criados sem bloquear escritas nas tabelas
+    atomic = False
+
+    dependencies = [
+        ('bombonas', '0002_alter_bombona_tipo_residuo'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='bombona',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['status'], include=('tipo_residuo', 'peso_atual', 'capacidade'), name='bombona_ativa_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bombona',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['tipo_residuo'], include=('peso_atual',), name='bombona_ativa_tipo_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='bombona',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['empresa'], include=('peso_atual',), name='bombona_ativa_empresa_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-19 13:26
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    # Índices criados sem bloquear escritas nas tabelas
+    atomic = False
+
+    dependencies = [
+        ('bombonas', '0003_bombona_bombona_ativa_status_idx_and_more'),
+        ('empresas', '0002_empresa_busca_trgm'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='bombona',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('identificacao'), name='gin_trgm_ops'), name='bombona_ident_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='bombona',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('endereco_instalacao'), name='gin_trgm_ops'), name='bombona_endereco_trgm'),
+        ),
+    ]
@@ -1,4 +1,11 @@
+from decimal import Decimal
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import NullIf, Round, Upper
+from django.db.models.lookups import GreaterThanOrEqual
+from django.utils import timezone
 from apps.empresas.models import Empresa
 
 
@@ -13,6 +20,21 @@ class Bombona(models.Model):
         ('inativa', 'Inativa'),
     ]
     
+    # Cores do status no mapa
+    STATUS_CORES = {
+        'normal': 'green',
+        'quase_cheia': 'yellow',
+        'cheia': 'red',
+        'manutencao': 'gray',
+        'inativa': 'black',
+    }
+    
+    # Limites padrão (sem RegraAlerta para o tipo de resíduo/empresa): percentual de
+    # ocupação a partir do qual a bombona fica quase cheia / cheia e temperatura máxima
+    LIMITE_QUASE_CHEIA = 80
+    LIMITE_CHEIA = 95
+    LIMITE_TEMPERATURA = 40
+    
     TIPO_RESIDUO_CHOICES = [
         ('hospitalar_infectante', 'Hospitalar Infectante (Classe A)'),
         ('hospitalar_quimico', 'Hospitalar Químico (Classe B)'),
@@ -123,6 +145,30 @@ class Bombona(models.Model):
             models.Index(fields=['empresa']),
             models.Index(fields=['status']),
             models.Index(fields=['tipo_residuo']),
+            # Bombonas ativas: contagens por status e somas de peso (index-only scan)
+            models.Index(
+                fields=['status'],
+                include=['tipo_residuo', 'peso_atual', 'capacidade'],
+                condition=models.Q(is_active=True),
+                name='bombona_ativa_status_idx',
+            ),
+            # Bombonas ativas: agregados por tipo de resíduo
+            models.Index(
+                fields=['tipo_residuo'],
+                include=['peso_atual'],
+                condition=models.Q(is_active=True),
+                name='bombona_ativa_tipo_idx',
+            ),
+            # Bombonas ativas: agregados por empresa
+            models.Index(
+                fields=['empresa'],
+                include=['peso_atual'],
+                condition=models.Q(is_active=True),
+                name='bombona_ativa_empresa_idx',
+            ),
+            # Busca (?search=) por trigramas
+            GinIndex(OpClass(Upper('identificacao'), name='gin_trgm_ops'), name='bombona_ident_trgm'),
+            GinIndex(OpClass(Upper('endereco_instalacao'), name='gin_trgm_ops'), name='bombona_endereco_trgm'),
         ]
     
     def __str__(self):
@@ -138,34 +184,86 @@ class Bombona(models.Model):
     @property
     def necessita_coleta(self):
         """Verifica se a bombona necessita coleta"""
-        return self.percentual_ocupacao >= 80
+        from apps.alertas.regras import avaliador, ocupacao
+        return ocupacao(self) >= avaliador().limites_bombona(self).quase_cheia
     
     @property
     def status_color(self):
         """Retorna cor do status para o mapa"""
-        colors = {
-            'normal': 'green',
-            'quase_cheia': 'yellow',
-            'cheia': 'red',
-            'manutencao': 'gray',
-            'inativa': 'black',
-        }
-        return colors.get(self.status, 'gray')
+        return self.STATUS_CORES.get(self.status, 'gray')
     
     def atualizar_status(self):
-        """Atualiza status baseado no percentual de ocupação"""
-        if not self.is_active:
-            self.status = 'inativa'
-        elif self.status == 'manutencao':
-            pass  # Mantém em manutenção
-        elif self.percentual_ocupacao >= 95:
-            self.status = 'cheia'
-        elif self.percentual_ocupacao >= 80:
-            self.status = 'quase_cheia'
-        else:
-            self.status = 'normal'
+        """Atualiza status baseado no percentual de ocupação e nas regras de alerta"""
+        from apps.alertas.regras import avaliador
+        self.status = avaliador().status(self)
         
         self.save(update_fields=['status', 'updated_at'])
+    
+    @classmethod
+    def status_por_peso(cls, peso=F('peso_atual'), ativa=None):
+        """
+        CASE com o mesmo critério de atualizar_status para o peso informado
+        Os limites de cada bombona vêm das regras de alerta (apps.alertas.regras).
+        Usado em update(): o status é gravado no mesmo comando que o peso. Dentro de
+        um UPDATE as colunas valem o que eram antes do comando, por isso o novo
+        peso (e o novo is_active, em `ativa`, quando muda junto) é informado aqui.
+        """
+        from apps.alertas.regras import avaliador
+        
+        if ativa is False:
+            return Value('inativa')
+        regras = avaliador()
+        ocupacao = Round(peso * Decimal('100') / NullIf(F('capacidade'), Value(Decimal('0'))), 2)
+        inativa = [] if ativa else [When(is_active=False, then=Value('inativa'))]
+        return Case(
+            *inativa,
+            When(status='manutencao', then=Value('manutencao')),
+            When(GreaterThanOrEqual(ocupacao, regras.limite_sql('cheia')), then=Value('cheia')),
+            When(GreaterThanOrEqual(ocupacao, regras.limite_sql('quase_cheia')), then=Value('quase_cheia')),
+            default=Value('normal'),
+            output_field=models.CharField(),
+        )
+    
+    @classmethod
+    def atualizar_em_lote(cls, bombona_ids, **campos):
+        """
+        Um único UPDATE nas bombonas informadas (ex.: status=Bombona.status_por_peso())
+        update() não dispara signals: o estado no Redis e a versão das facetas são
+        atualizados aqui. Retorna o número de bombonas atualizadas.
+        """
+        from core.facetas import nova_versao
+        from . import estado
+        
+        bombona_ids = list(bombona_ids)
+        atualizadas = cls.objects.filter(id__in=bombona_ids).update(updated_at=timezone.now(), **campos)
+        if atualizadas:
+            estado.sincronizar_bombonas(bombona_ids)
+            nova_versao(cls)
+        return atualizadas
+    
+    def descontar_peso(self, peso):
+        """
+        Desconta o peso coletado em um único UPDATE, sem ler e regravar a bombona
+        Coletas e leituras simultâneas não sobrescrevem o peso uma da outra. Só desconta
+        se o peso atual for suficiente; retorna se a bombona foi atualizada.
+        """
+        from core.facetas import nova_versao
+        from . import estado
+        
+        novo_peso = F('peso_atual') - peso
+        atualizadas = Bombona.objects.filter(pk=self.pk, peso_atual__gte=peso).update(
+            peso_atual=novo_peso,
+            status=Bombona.status_por_peso(novo_peso),
+            updated_at=timezone.now(),
+        )
+        if not atualizadas:
+            return False
+        
+        # update() não dispara signals
+        estado.sincronizar_bombonas([self.pk])
+        nova_versao(Bombona)
+        self.refresh_from_db(fields=['peso_atual', 'status', 'updated_at'])
+        return True
 
 
 class LeituraSensor(models.Model):
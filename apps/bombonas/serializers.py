@@ -1,11 +1,21 @@
 from rest_framework import serializers
 from .models import Bombona, LeituraSensor
 from apps.empresas.serializers import EmpresaListSerializer
+from core.serializacao import (
+    CamposDinamicosMixin, SerializerRapido, calculado, coluna, decimal, percentual_ocupacao, rotulo
+)
 
 
-class BombonaSerializer(serializers.ModelSerializer):
+class BombonaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer completo para Bombona"""
     
+    expansiveis = {'empresa': 'empresa_detalhes'}
+    dependencias = {
+        'percentual_ocupacao': ('peso_atual', 'capacidade'),
+        'necessita_coleta': ('peso_atual', 'capacidade', 'empresa', 'tipo_residuo'),
+        'status_color': ('status',),
+    }
+    
     empresa_detalhes = EmpresaListSerializer(source='empresa', read_only=True)
     percentual_ocupacao = serializers.ReadOnlyField()
     necessita_coleta = serializers.ReadOnlyField()
@@ -79,6 +89,52 @@ class BombonaMapSerializer(serializers.ModelSerializer):
         ]
 
 
+class BombonaListRapidoSerializer(SerializerRapido):
+    """Mesma saída do BombonaListSerializer a partir de values()"""
+    
+    campos = {
+        'id': coluna('id'),
+        'identificacao': coluna('identificacao'),
+        'empresa_nome': coluna('empresa__nome'),
+        'status': coluna('status'),
+        'status_display': rotulo('status', Bombona.STATUS_CHOICES),
+        'status_color': rotulo('status', Bombona.STATUS_CORES, padrao='gray'),
+        'tipo_residuo': coluna('tipo_residuo'),
+        'tipo_residuo_display': rotulo('tipo_residuo', Bombona.TIPO_RESIDUO_CHOICES),
+        'peso_atual': decimal('peso_atual', 2),
+        'capacidade': decimal('capacidade', 2),
+        'percentual_ocupacao': calculado(
+            ('peso_atual', 'capacidade'),
+            lambda linha: percentual_ocupacao(linha['peso_atual'], linha['capacidade'])
+        ),
+        'latitude': decimal('latitude', 6),
+        'longitude': decimal('longitude', 6),
+        'is_active': coluna('is_active'),
+    }
+
+
+class BombonaMapRapidoSerializer(SerializerRapido):
+    """Mesma saída do BombonaMapSerializer a partir de values()"""
+    
+    campos = {
+        'id': coluna('id'),
+        'identificacao': coluna('identificacao'),
+        'latitude': decimal('latitude', 6),
+        'longitude': decimal('longitude', 6),
+        'status': coluna('status'),
+        'status_color': rotulo('status', Bombona.STATUS_CORES, padrao='gray'),
+        'tipo_residuo': coluna('tipo_residuo'),
+        'peso_atual': decimal('peso_atual', 2),
+        'capacidade': decimal('capacidade', 2),
+        'percentual_ocupacao': calculado(
+            ('peso_atual', 'capacidade'),
+            lambda linha: percentual_ocupacao(linha['peso_atual'], linha['capacidade'])
+        ),
+        'empresa_nome': coluna('empresa__nome'),
+        'endereco_instalacao': coluna('endereco_instalacao'),
+    }
+
+
 class LeituraSensorSerializer(serializers.ModelSerializer):
     """Serializer para leituras de sensores"""
     
@@ -0,0 +1,28 @@
+"""
+Mantém o estado atual das bombonas no Redis sincronizado com o banco
+As gravações acontecem após o commit, para o store nunca expor dados desfeitos
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+
+from . import estado
+from .models import Bombona
+
+
+def bombona_salva(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= set(estado.CAMPOS_LEITURA):
+        # Leitura de sensor/status: não precisa reler a bombona nem a empresa
+        campos = tuple(update_fields)
+        transaction.on_commit(lambda: estado.gravar_leitura(instance, campos))
+    else:
+        transaction.on_commit(lambda: estado.gravar_bombona(instance))
+
+
+def bombona_removida(sender, instance, **kwargs):
+    bombona_id = instance.pk
+    transaction.on_commit(lambda: estado.remover_bombona(bombona_id))
+
+
+def conectar():
+    post_save.connect(bombona_salva, sender=Bombona, dispatch_uid='estado_bombona_salva')
+    post_delete.connect(bombona_removida, sender=Bombona, dispatch_uid='estado_bombona_removida')
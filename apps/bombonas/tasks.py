@@ -0,0 +1,10 @@
+from celery import shared_task
+
+
+@shared_task(ignore_result=True)
+def reconciliar_estado_bombonas():
+    """Corrige divergências entre o estado atual no Redis e o PostgreSQL"""
+    from .estado import reconciliar_estado
+    
+    resultado = reconciliar_estado()
+    return f"Estado das bombonas reconciliado: {resultado}"
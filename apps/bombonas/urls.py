@@ -1,6 +1,6 @@
 from django.urls import path
 from .views import (
-    BombonaListCreateView, BombonaDetailView,
+    BombonaListCreateView, BombonaDetailView, BombonaFacetasView,
     bombonas_mapa, bombonas_estatisticas,
     atualizar_status_bombona, LeituraSensorListView,
     historico_bombona
@@ -9,6 +9,7 @@ from .views import (
 urlpatterns = [
     path('', BombonaListCreateView.as_view(), name='bombona-list-create'),
     path('<int:pk>/', BombonaDetailView.as_view(), name='bombona-detail'),
+    path('facetas/', BombonaFacetasView.as_view(), name='bombonas-facetas'),
     path('mapa/', bombonas_mapa, name='bombonas-mapa'),
     path('estatisticas/', bombonas_estatisticas, name='bombonas-estatisticas'),
     path('<int:pk>/atualizar-status/', atualizar_status_bombona, name='atualizar-status-bombona'),
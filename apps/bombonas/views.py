@@ -4,20 +4,27 @@ from rest_framework.response import Response
 from django.db.models import Sum, Avg, Count, Q
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from . import estado
 from .models import Bombona, LeituraSensor
 from .serializers import (
-    BombonaSerializer, BombonaListSerializer, BombonaMapSerializer,
+    BombonaSerializer, BombonaListSerializer,
+    BombonaListRapidoSerializer, BombonaMapRapidoSerializer,
     LeituraSensorSerializer, BombonaEstatsticasSerializer
 )
+from core.busca import BuscaTrigramaFilter
+from core.facetas import FacetasViewMixin
+from core.serializacao import CamposDinamicosViewMixin, ListagemRapidaMixin, campos_da_requisicao
 from apps.authentication.permissions import IsAdminOrReadOnly, IsOperadorOrAdmin
+from apps.empresas.models import Empresa
 
 
-class BombonaListCreateView(generics.ListCreateAPIView):
+class BombonaListCreateView(ListagemRapidaMixin, generics.ListCreateAPIView):
     """View para listar e criar bombonas"""
     
     queryset = Bombona.objects.select_related('empresa').all()
+    serializer_rapido_class = BombonaListRapidoSerializer
     permission_classes = [permissions.IsAuthenticated, IsOperadorOrAdmin]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BuscaTrigramaFilter]
     filterset_fields = ['status', 'tipo_residuo', 'empresa', 'is_active']
     search_fields = ['identificacao', 'endereco_instalacao', 'empresa__nome']
     ordering_fields = ['created_at', 'peso_atual', 'capacidade', 'percentual_ocupacao']
@@ -29,7 +36,18 @@ class BombonaListCreateView(generics.ListCreateAPIView):
         return BombonaSerializer
 
 
-class BombonaDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BombonaFacetasView(FacetasViewMixin, BombonaListCreateView):
+    """Contagens por status, tipo de resíduo e empresa das bombonas filtradas"""
+    
+    facetas = {
+        'status': 'status',
+        'tipo_residuo': 'tipo_residuo',
+        'empresa': ('empresa', 'empresa__nome'),
+    }
+    facetas_modelos = (Bombona, Empresa)
+
+
+class BombonaDetailView(CamposDinamicosViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """View para detalhes, atualização e exclusão de bombona"""
     
     queryset = Bombona.objects.select_related('empresa').all()
@@ -42,13 +60,22 @@ class BombonaDetailView(generics.RetrieveUpdateDestroyAPIView):
 def bombonas_mapa(request):
     """Endpoint otimizado para exibição no mapa"""
     
-    queryset = Bombona.objects.filter(is_active=True).select_related('empresa')
-    
     # Filtros opcionais
     status_filter = request.query_params.get('status')
     tipo_filter = request.query_params.get('tipo_residuo')
     empresa_filter = request.query_params.get('empresa')
     
+    campos, _ = campos_da_requisicao(request)
+    
+    # Estado atual no Redis; o banco é usado quando o store não está disponível
+    dados = estado.mapa(status_filter, tipo_filter, empresa_filter)
+    if dados is not None:
+        if campos is not None:
+            dados = [{nome: valor for nome, valor in item.items() if nome in campos} for item in dados]
+        return Response(dados)
+    
+    queryset = Bombona.objects.filter(is_active=True)
+    
     if status_filter:
         queryset = queryset.filter(status=status_filter)
     if tipo_filter:
@@ -56,8 +83,8 @@ def bombonas_mapa(request):
     if empresa_filter:
         queryset = queryset.filter(empresa_id=empresa_filter)
     
-    serializer = BombonaMapSerializer(queryset, many=True)
-    return Response(serializer.data)
+    queryset = BombonaMapRapidoSerializer.valores(queryset, campos)
+    return Response(BombonaMapRapidoSerializer(queryset, campos=campos).data)
 
 
 @api_view(['GET'])
@@ -161,6 +188,9 @@ def historico_bombona(request, pk):
             status=status.HTTP_404_NOT_FOUND
         )
     
+    # Última leitura do store (o GET pode ter sido servido por uma réplica atrasada)
+    estado.aplicar_leitura(bombona)
+    
     # Leituras recentes
     leituras = LeituraSensor.objects.filter(bombona=bombona).order_by('-data_leitura')[:50]
     
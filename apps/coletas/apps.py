@@ -5,3 +5,9 @@ class ColetasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.coletas'
     verbose_name = 'Coletas'
+
+    def ready(self):
+        # Versão dos dados das contagens por faceta
+        from core.facetas import registrar_versao
+        from .models import Coleta
+        registrar_versao(Coleta)
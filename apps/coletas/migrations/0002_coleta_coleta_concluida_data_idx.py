@@ -0,0 +1,21 @@
+# Generated by Django 4.2.9 on 2026-10-19 12:56
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Índices criados sem bloquear escritas nas tabelas
+    atomic = False
+
+    dependencies = [
+        ('coletas', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='coleta',
+            index=models.Index(condition=models.Q(('status', 'concluida')), fields=['-data_coleta'], include=('peso_coletado', 'bombona'), name='coleta_concluida_data_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-19 13:26
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    # Índices criados sem bloquear escritas nas tabelas
+    atomic = False
+
+    dependencies = [
+        ('coletas', '0002_coleta_coleta_concluida_data_idx'),
+        ('empresas', '0002_empresa_busca_trgm'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='coleta',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('destino'), name='gin_trgm_ops'), name='coleta_destino_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='coleta',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('numero_manifesto'), name='gin_trgm_ops'), name='coleta_manifesto_trgm'),
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import models, transaction
+from django.db.models.functions import Upper
 from django.contrib.auth import get_user_model
 from apps.bombonas.models import Bombona
 
@@ -87,6 +89,16 @@ class Coleta(models.Model):
             models.Index(fields=['bombona']),
             models.Index(fields=['operador']),
             models.Index(fields=['status']),
+            # Coletas concluídas por período: somas de peso nos relatórios (index-only scan)
+            models.Index(
+                fields=['-data_coleta'],
+                include=['peso_coletado', 'bombona'],
+                condition=models.Q(status='concluida'),
+                name='coleta_concluida_data_idx',
+            ),
+            # Busca (?search=) por trigramas
+            GinIndex(OpClass(Upper('destino'), name='gin_trgm_ops'), name='coleta_destino_trgm'),
+            GinIndex(OpClass(Upper('numero_manifesto'), name='gin_trgm_ops'), name='coleta_manifesto_trgm'),
         ]
     
     def __str__(self):
@@ -95,10 +107,15 @@ class Coleta(models.Model):
     def save(self, *args, **kwargs):
         """Atualizar peso da bombona após coleta concluída"""
         is_new = self.pk is None
-        super().save(*args, **kwargs)
-        
-        if self.status == 'concluida' and not is_new:
-            # Reduzir peso da bombona
-            if self.bombona.peso_atual >= self.peso_coletado:
-                self.bombona.peso_atual -= self.peso_coletado
-                self.bombona.atualizar_status()
+        with transaction.atomic():
+            # Só a transição para concluída desconta o peso: salvar de novo (ou duas
+            # requisições concluindo a mesma coleta) não desconta outra vez
+            concluida_agora = (
+                self.status == 'concluida' and not is_new and
+                Coleta.objects.filter(pk=self.pk).exclude(status='concluida').update(status='concluida')
+            )
+            super().save(*args, **kwargs)
+            
+            if concluida_agora:
+                # Reduzir peso da bombona (UPDATE atômico, sem sobrescrever leituras simultâneas)
+                self.bombona.descontar_peso(self.peso_coletado)
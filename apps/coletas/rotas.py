@@ -0,0 +1,91 @@
+"""
+Registro em lote das coletas de uma rota concluída
+Tudo acontece em uma transação: as coletas entram com bulk_create, o peso das
+bombonas é descontado em um único UPDATE e os alertas de nível que deixaram de
+valer são resolvidos em outro, sem os efeitos colaterais de Coleta.save por linha.
+"""
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Q, Value, When
+from django.utils import timezone
+
+from apps.alertas.models import Alerta
+from apps.bombonas import estado
+from apps.bombonas.models import Bombona
+from core.facetas import nova_versao
+from .models import Coleta
+
+
+class PesoAlterado(Exception):
+    """O peso de alguma bombona caiu entre a validação e o desconto (coleta ou ajuste simultâneo)"""
+
+
+def totais_por_bombona(coletas):
+    """Peso total por bombona das coletas (dicts com bombona e peso_coletado)"""
+    totais = {}
+    for coleta in coletas:
+        totais[coleta['bombona']] = totais.get(coleta['bombona'], 0) + coleta['peso_coletado']
+    return totais
+
+
+def _resolver_alertas_nivel(bombona_ids, agora):
+    """Resolve os alertas de nível que não correspondem mais ao status das bombonas"""
+    return Alerta.objects.filter(bombona_id__in=bombona_ids, resolvido=False).filter(
+        Q(tipo='nivel_critico') & ~Q(bombona__status='cheia') |
+        Q(tipo='nivel_alto') & ~Q(bombona__status__in=['cheia', 'quase_cheia'])
+    ).update(
+        resolvido=True,
+        data_resolucao=agora,
+        observacoes_resolucao='Bombona coletada na rota',
+        updated_at=agora,
+    )
+
+
+def concluir_rota(coletas, operador):
+    """
+    Registra as coletas (já validadas por RotaSerializer) como concluídas
+    Retorna (coletas criadas, bombonas atualizadas, número de alertas resolvidos)
+    """
+    totais = totais_por_bombona(coletas)
+    desconto = Case(
+        *[When(pk=bombona_id, then=Value(total)) for bombona_id, total in totais.items()],
+        output_field=DecimalField(max_digits=8, decimal_places=2),
+    )
+    novo_peso = F('peso_atual') - desconto
+    agora = timezone.now()
+
+    with transaction.atomic():
+        # O peso é conferido de novo no próprio UPDATE: sem lock entre a validação e o
+        # desconto, e nenhuma bombona fica com peso negativo
+        atualizadas = Bombona.objects.filter(id__in=totais, peso_atual__gte=desconto).update(
+            peso_atual=novo_peso,
+            status=Bombona.status_por_peso(novo_peso),
+            updated_at=agora,
+        )
+        if atualizadas != len(totais):
+            raise PesoAlterado()
+
+        criadas = Coleta.objects.bulk_create([
+            Coleta(
+                bombona_id=coleta['bombona'],
+                operador=operador,
+                data_coleta=coleta['data_coleta'],
+                peso_coletado=coleta['peso_coletado'],
+                destino=coleta['destino'],
+                empresa_destino=coleta.get('empresa_destino'),
+                numero_manifesto=coleta.get('numero_manifesto'),
+                observacoes=coleta.get('observacoes'),
+                status='concluida',
+            )
+            for coleta in coletas
+        ])
+
+        alertas_resolvidos = _resolver_alertas_nivel(list(totais), agora)
+        bombonas = list(
+            Bombona.objects.filter(id__in=totais).order_by('id').values('id', 'peso_atual', 'status')
+        )
+
+        # update() e bulk_create não disparam signals
+        estado.sincronizar_bombonas(totais)
+        nova_versao(Coleta, Bombona, Alerta)
+
+    return criadas, bombonas, alertas_resolvidos
@@ -1,12 +1,20 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Coleta
+from .rotas import totais_por_bombona
+from apps.bombonas.models import Bombona
 from apps.bombonas.serializers import BombonaListSerializer
 from apps.authentication.serializers import UserSerializer
+from core.serializacao import (
+    CamposDinamicosMixin, SerializerRapido, calculado, coluna, data_hora, decimal, rotulo
+)
 
 
-class ColetaSerializer(serializers.ModelSerializer):
+class ColetaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer completo para Coleta"""
     
+    expansiveis = {'bombona': 'bombona_detalhes'}
+    
     bombona_detalhes = BombonaListSerializer(source='bombona', read_only=True)
     operador_nome = serializers.CharField(source='operador.get_full_name', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -53,3 +61,94 @@ class ColetaListSerializer(serializers.ModelSerializer):
             'data_coleta', 'peso_coletado', 'destino',
             'status', 'status_display'
         ]
+
+
+class ColetaListRapidoSerializer(SerializerRapido):
+    """Mesma saída do ColetaListSerializer a partir de values()"""
+    
+    campos = {
+        'id': coluna('id'),
+        'bombona_identificacao': coluna('bombona__identificacao'),
+        'operador_nome': calculado(
+            ('operador_id', 'operador__first_name', 'operador__last_name'),
+            lambda linha: f"{linha['operador__first_name']} {linha['operador__last_name']}".strip()
+        ),
+        'data_coleta': data_hora('data_coleta'),
+        'peso_coletado': decimal('peso_coletado', 2),
+        'destino': coluna('destino'),
+        'status': coluna('status'),
+        'status_display': rotulo('status', Coleta.STATUS_CHOICES),
+    }
+    
+    def representar(self, linha):
+        dados = super().representar(linha)
+        # Sem operador o DRF omite o campo (source operador.get_full_name)
+        if 'operador_nome' in dados and linha['operador_id'] is None:
+            del dados['operador_nome']
+        return dados
+
+
+# Número máximo de coletas por rota em uma requisição
+MAXIMO_COLETAS_ROTA = 500
+
+# Dados da rota usados nas coletas que não os informam
+CAMPOS_ROTA = ['data_coleta', 'destino', 'empresa_destino', 'numero_manifesto']
+
+
+class ColetaRotaSerializer(serializers.Serializer):
+    """Coleta de uma rota (a bombona é validada em lote por RotaSerializer)"""
+    
+    bombona = serializers.IntegerField(min_value=1)
+    peso_coletado = serializers.DecimalField(max_digits=8, decimal_places=2)
+    data_coleta = serializers.DateTimeField(required=False)
+    destino = serializers.CharField(max_length=300, required=False)
+    empresa_destino = serializers.CharField(max_length=200, required=False, allow_blank=True, allow_null=True)
+    numero_manifesto = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    observacoes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    
+    def validate_peso_coletado(self, value):
+        if value <= 0:
+            raise serializers.ValidationError('O peso coletado deve ser maior que zero.')
+        return value
+
+
+class RotaSerializer(serializers.Serializer):
+    """Coletas de uma rota concluída, validadas contra o peso atual das bombonas em uma consulta"""
+    
+    data_coleta = serializers.DateTimeField(required=False)
+    destino = serializers.CharField(max_length=300, required=False)
+    empresa_destino = serializers.CharField(max_length=200, required=False, allow_blank=True, allow_null=True)
+    numero_manifesto = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    coletas = ColetaRotaSerializer(many=True, allow_empty=False, max_length=MAXIMO_COLETAS_ROTA)
+    
+    def validate(self, attrs):
+        """Completa as coletas com os dados da rota e confere o peso de cada bombona"""
+        padrao = {campo: attrs[campo] for campo in CAMPOS_ROTA if campo in attrs}
+        padrao.setdefault('data_coleta', timezone.now())
+        coletas = [{**padrao, **coleta} for coleta in attrs['coletas']]
+        
+        # Mais de uma coleta da mesma bombona na rota: o peso atual cobre a soma
+        # (a mesma soma descontada por concluir_rota)
+        totais = totais_por_bombona(coletas)
+        pesos = dict(Bombona.objects.filter(id__in=totais).values_list('id', 'peso_atual'))
+        
+        erros = []
+        for coleta in coletas:
+            erro = {}
+            bombona = coleta['bombona']
+            if bombona not in pesos:
+                erro['bombona'] = [f'Bombona {bombona} não encontrada.']
+            elif totais[bombona] > pesos[bombona]:
+                erro['peso_coletado'] = [
+                    f'O peso coletado ({totais[bombona]} kg) não pode ser maior que o peso atual '
+                    f'da bombona ({pesos[bombona]} kg).'
+                ]
+            if not coleta.get('destino'):
+                erro['destino'] = ['Informe o destino na rota ou na coleta.']
+            erros.append(erro)
+        
+        if any(erros):
+            raise serializers.ValidationError({'coletas': erros})
+        
+        attrs['coletas'] = coletas
+        return attrs
@@ -1,8 +1,13 @@
 from django.urls import path
-from .views import ColetaListCreateView, ColetaDetailView, coletas_estatisticas
+from .views import (
+    ColetaListCreateView, ColetaDetailView, ColetaFacetasView,
+    coletas_estatisticas, concluir_rota_coletas
+)
 
 urlpatterns = [
     path('', ColetaListCreateView.as_view(), name='coleta-list-create'),
     path('<int:pk>/', ColetaDetailView.as_view(), name='coleta-detail'),
+    path('facetas/', ColetaFacetasView.as_view(), name='coletas-facetas'),
     path('estatisticas/', coletas_estatisticas, name='coletas-estatisticas'),
+    path('rota/', concluir_rota_coletas, name='coletas-rota'),
 ]
@@ -1,20 +1,27 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.db.models import Sum, Count
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from .models import Coleta
-from .serializers import ColetaSerializer, ColetaListSerializer
+from .rotas import PesoAlterado, concluir_rota
+from .serializers import ColetaSerializer, ColetaListSerializer, ColetaListRapidoSerializer, RotaSerializer
+from core.busca import BuscaTrigramaFilter
+from core.facetas import FacetasViewMixin
+from core.serializacao import CamposDinamicosViewMixin, ListagemRapidaMixin, decimal_drf
 from apps.authentication.permissions import IsOperadorOrAdmin
+from apps.bombonas.models import Bombona
+from apps.empresas.models import Empresa
 
 
-class ColetaListCreateView(generics.ListCreateAPIView):
+class ColetaListCreateView(ListagemRapidaMixin, generics.ListCreateAPIView):
     """View para listar e criar coletas"""
     
     queryset = Coleta.objects.select_related('bombona', 'operador').all()
+    serializer_rapido_class = ColetaListRapidoSerializer
     permission_classes = [permissions.IsAuthenticated, IsOperadorOrAdmin]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BuscaTrigramaFilter]
     filterset_fields = ['status', 'bombona', 'operador']
     search_fields = ['bombona__identificacao', 'destino', 'numero_manifesto']
     ordering_fields = ['data_coleta', 'peso_coletado']
@@ -33,7 +40,18 @@ class ColetaListCreateView(generics.ListCreateAPIView):
             serializer.save()
 
 
-class ColetaDetailView(generics.RetrieveUpdateDestroyAPIView):
+class ColetaFacetasView(FacetasViewMixin, ColetaListCreateView):
+    """Contagens por status, tipo de resíduo e empresa das coletas filtradas"""
+    
+    facetas = {
+        'status': 'status',
+        'tipo_residuo': 'bombona__tipo_residuo',
+        'empresa': ('bombona__empresa', 'bombona__empresa__nome'),
+    }
+    facetas_modelos = (Coleta, Bombona, Empresa)
+
+
+class ColetaDetailView(CamposDinamicosViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """View para detalhes, atualização e exclusão de coleta"""
     
     queryset = Coleta.objects.select_related('bombona', 'operador').all()
@@ -61,3 +79,37 @@ def coletas_estatisticas(request):
     }
     
     return Response(stats)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated, IsOperadorOrAdmin])
+def concluir_rota_coletas(request):
+    """Registrar de uma vez as coletas de uma rota concluída"""
+    
+    serializer = RotaSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    
+    try:
+        coletas, bombonas, alertas_resolvidos = concluir_rota(
+            serializer.validated_data['coletas'], request.user
+        )
+    except PesoAlterado:
+        return Response(
+            {'error': 'O peso de uma ou mais bombonas mudou durante o registro. Nenhuma coleta foi registrada; envie a rota novamente.'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    return Response({
+        'coletas_registradas': len(coletas),
+        'coletas': [coleta.id for coleta in coletas],
+        'peso_total_coletado': decimal_drf(sum(coleta.peso_coletado for coleta in coletas), 2),
+        'alertas_resolvidos': alertas_resolvidos,
+        'bombonas': [
+            {
+                'id': bombona['id'],
+                'peso_atual': decimal_drf(bombona['peso_atual'], 2),
+                'status': bombona['status'],
+            }
+            for bombona in bombonas
+        ],
+    }, status=status.HTTP_201_CREATED)
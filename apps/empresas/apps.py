@@ -5,3 +5,9 @@ class EmpresasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.empresas'
     verbose_name = 'Empresas'
+
+    def ready(self):
+        # Versão dos dados das contagens por faceta e dos totais de empresas
+        from core.facetas import registrar_versao
+        from .models import Empresa
+        registrar_versao(Empresa)
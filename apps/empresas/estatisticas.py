@@ -0,0 +1,51 @@
+"""
+Contagens de bombonas por empresa e totais gerais de empresas
+As contagens por empresa são subconsultas correlacionadas: o banco as avalia só para
+as linhas da página e o COUNT da paginação não precisa agrupar as bombonas.
+"""
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from apps.bombonas.models import Bombona
+from core.coalescencia import coalescer
+from core.facetas import versao_dados
+from .models import Empresa
+
+
+CHAVE_ESTATISTICAS = 'empresas_estatisticas'
+
+
+def _contagem_bombonas(**filtros):
+    bombonas = Bombona.objects.filter(empresa=OuterRef('pk'), **filtros).order_by().values('empresa')
+    return Coalesce(Subquery(bombonas.annotate(total=Count('id')).values('total')), 0)
+
+
+def anotar_contagens(queryset):
+    """Anota total_bombonas e bombonas_ativas (lidas pelos serializers de empresa)"""
+    return queryset.annotate(
+        total_bombonas=_contagem_bombonas(),
+        bombonas_ativas=_contagem_bombonas(is_active=True),
+    )
+
+
+def _calcular_estatisticas():
+    totais = Empresa.objects.aggregate(
+        total=Count('id'),
+        ativas=Count('id', filter=Q(is_active=True)),
+    )
+    return {
+        'total_empresas': totais['total'],
+        'empresas_ativas': totais['ativas'],
+        'empresas_inativas': totais['total'] - totais['ativas'],
+    }
+
+
+def estatisticas_empresas():
+    """Totais de empresas em uma consulta, compartilhados no cache até a próxima alteração"""
+    versao = versao_dados([Empresa])
+    if versao is None:
+        return _calcular_estatisticas()
+
+    # A versão de Empresa muda após o commit de cada save/delete (registrar_versao):
+    # a chave muda junto, e um cálculo que começou antes não sobrescreve o novo
+    return coalescer(CHAVE_ESTATISTICAS, _calcular_estatisticas, parametros=versao)
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-19 13:26
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    # Índices criados sem bloquear escritas nas tabelas
+    atomic = False
+
+    dependencies = [
+        ('empresas', '0001_initial'),
+    ]
+
+    operations = [
+        # pg_trgm: usado pelos índices de busca de todos os apps
+        TrigramExtension(),
+        AddIndexConcurrently(
+            model_name='empresa',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('nome'), name='gin_trgm_ops'), name='empresa_nome_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='empresa',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('cnpj'), name='gin_trgm_ops'), name='empresa_cnpj_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='empresa',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('razao_social'), name='gin_trgm_ops'), name='empresa_razao_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='empresa',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('cidade'), name='gin_trgm_ops'), name='empresa_cidade_trgm'),
+        ),
+        AddIndexConcurrently(
+            model_name='empresa',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('responsavel'), name='gin_trgm_ops'), name='empresa_responsavel_trgm'),
+        ),
+    ]
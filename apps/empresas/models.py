@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.core.validators import RegexValidator
 
 
@@ -59,6 +61,12 @@ class Empresa(models.Model):
         indexes = [
             models.Index(fields=['nome']),
             models.Index(fields=['cnpj']),
+            # Busca (?search=) por trigramas: mesma expressão do icontains (UPPER(campo) LIKE '%TERMO%')
+            GinIndex(OpClass(Upper('nome'), name='gin_trgm_ops'), name='empresa_nome_trgm'),
+            GinIndex(OpClass(Upper('cnpj'), name='gin_trgm_ops'), name='empresa_cnpj_trgm'),
+            GinIndex(OpClass(Upper('razao_social'), name='gin_trgm_ops'), name='empresa_razao_trgm'),
+            GinIndex(OpClass(Upper('cidade'), name='gin_trgm_ops'), name='empresa_cidade_trgm'),
+            GinIndex(OpClass(Upper('responsavel'), name='gin_trgm_ops'), name='empresa_responsavel_trgm'),
         ]
     
     def __str__(self):
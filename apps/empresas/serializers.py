@@ -1,10 +1,17 @@
 from rest_framework import serializers
 from .models import Empresa
+from core.serializacao import CamposDinamicosMixin
 
 
-class EmpresaSerializer(serializers.ModelSerializer):
+# Colunas usadas pela propriedade Empresa.endereco_completo
+COLUNAS_ENDERECO = ('endereco', 'numero', 'complemento', 'bairro', 'cidade', 'estado', 'cep')
+
+
+class EmpresaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer completo para o modelo Empresa"""
     
+    dependencias = {'endereco_completo': COLUNAS_ENDERECO}
+    
     endereco_completo = serializers.ReadOnlyField()
     bombonas_count = serializers.SerializerMethodField()
     bombonas_ativas = serializers.SerializerMethodField()
@@ -24,11 +31,14 @@ class EmpresaSerializer(serializers.ModelSerializer):
     
     def get_bombonas_count(self, obj):
         """Retorna o número total de bombonas da empresa"""
-        return obj.bombonas.count()
+        # Anotado pelas views (anotar_contagens); instâncias avulsas consultam o banco
+        total = getattr(obj, 'total_bombonas', None)
+        return total if total is not None else obj.bombonas.count()
     
     def get_bombonas_ativas(self, obj):
         """Retorna o número de bombonas ativas da empresa"""
-        return obj.bombonas.filter(is_active=True).count()
+        ativas = getattr(obj, 'bombonas_ativas', None)
+        return ativas if ativas is not None else obj.bombonas.filter(is_active=True).count()
     
     def validate_cnpj(self, value):
         """Validar formato do CNPJ"""
@@ -60,9 +70,11 @@ class EmpresaSerializer(serializers.ModelSerializer):
         return value
 
 
-class EmpresaListSerializer(serializers.ModelSerializer):
+class EmpresaListSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
     """Serializer simplificado para listagem de empresas"""
     
+    dependencias = {'endereco_completo': COLUNAS_ENDERECO}
+    
     bombonas_count = serializers.SerializerMethodField()
     endereco_completo = serializers.ReadOnlyField()
     
@@ -76,7 +88,9 @@ class EmpresaListSerializer(serializers.ModelSerializer):
     
     def get_bombonas_count(self, obj):
         """Retorna o número total de bombonas da empresa"""
-        return obj.bombonas.count()
+        # Anotado pelas views (anotar_contagens); instâncias avulsas consultam o banco
+        total = getattr(obj, 'total_bombonas', None)
+        return total if total is not None else obj.bombonas.count()
 
 
 class EmpresaCreateSerializer(serializers.ModelSerializer):
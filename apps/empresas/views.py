@@ -2,18 +2,21 @@ from rest_framework import generics, permissions, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Q
+from django.db.models import Count
 from .models import Empresa
+from .estatisticas import anotar_contagens, estatisticas_empresas
 from .serializers import EmpresaSerializer, EmpresaListSerializer, EmpresaCreateSerializer
+from core.busca import BuscaTrigramaFilter
+from core.serializacao import CamposDinamicosViewMixin
 from apps.authentication.permissions import IsAdminOrReadOnly
 
 
-class EmpresaListCreateView(generics.ListCreateAPIView):
+class EmpresaListCreateView(CamposDinamicosViewMixin, generics.ListCreateAPIView):
     """View para listar e criar empresas"""
     
     queryset = Empresa.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, BuscaTrigramaFilter]
     filterset_fields = ['estado', 'cidade', 'is_active']
     search_fields = ['nome', 'cnpj', 'razao_social', 'cidade', 'responsavel']
     ordering_fields = ['nome', 'created_at', 'cidade']
@@ -28,38 +31,26 @@ class EmpresaListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         """Personalizar queryset com anotações"""
-        queryset = super().get_queryset()
-        
-        # Adicionar contagem de bombonas
-        queryset = queryset.annotate(
-            total_bombonas=Count('bombonas'),
-            bombonas_ativas=Count('bombonas', filter=Q(bombonas__is_active=True))
-        )
-        
-        return queryset
+        # Contagem de bombonas por empresa (sem uma query por empresa no serializer)
+        return anotar_contagens(super().get_queryset())
     
     def list(self, request, *args, **kwargs):
         """Customizar resposta da listagem com estatísticas"""
         response = super().list(request, *args, **kwargs)
         
-        # Adicionar estatísticas gerais
-        total_empresas = self.get_queryset().count()
-        empresas_ativas = self.get_queryset().filter(is_active=True).count()
+        # Estatísticas gerais (uma consulta, em cache até a próxima alteração)
+        estatisticas = estatisticas_empresas()
         
         response.data = {
-            'count': response.data.get('count', total_empresas),
+            'count': response.data.get('count', estatisticas['total_empresas']),
             'results': response.data.get('results', response.data),
-            'statistics': {
-                'total_empresas': total_empresas,
-                'empresas_ativas': empresas_ativas,
-                'empresas_inativas': total_empresas - empresas_ativas,
-            }
+            'statistics': estatisticas,
         }
         
         return response
 
 
-class EmpresaDetailView(generics.RetrieveUpdateDestroyAPIView):
+class EmpresaDetailView(CamposDinamicosViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """View para detalhes, atualização e exclusão de empresa"""
     
     queryset = Empresa.objects.all()
@@ -67,8 +58,8 @@ class EmpresaDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
     
     def get_queryset(self):
-        """Adicionar prefetch de bombonas relacionadas"""
-        return super().get_queryset().prefetch_related('bombonas')
+        """Adicionar contagens de bombonas relacionadas"""
+        return anotar_contagens(super().get_queryset())
     
     def destroy(self, request, *args, **kwargs):
         """Soft delete - desativar ao invés de excluir"""
@@ -94,8 +85,9 @@ class EmpresaStatsView(generics.GenericAPIView):
         from apps.coletas.models import Coleta
         
         # Estatísticas básicas
-        total_empresas = Empresa.objects.count()
-        empresas_ativas = Empresa.objects.filter(is_active=True).count()
+        estatisticas = estatisticas_empresas()
+        total_empresas = estatisticas['total_empresas']
+        empresas_ativas = estatisticas['empresas_ativas']
         
         # Estatísticas por estado
         empresas_por_estado = list(
@@ -0,0 +1 @@
+# Monitoramento não precisa de admin
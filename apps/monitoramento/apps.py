@@ -0,0 +1,17 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class MonitoramentoConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.monitoramento'
+    verbose_name = 'Monitoramento de Desempenho'
+
+    def ready(self):
+        if getattr(settings, 'MONITORAMENTO_ATIVO', False):
+            from .instrumentacao import instrumentar_serializers
+            instrumentar_serializers()
+
+        if getattr(settings, 'MONITORAMENTO_METRICAS_ATIVO', False):
+            from . import signals
+            signals.conectar()
@@ -0,0 +1,636 @@
+"""
+Suite de benchmark dos endpoints da API
+Popula uma base dimensionada e mede tempo, número de queries e tempo de SQL por endpoint
+"""
+import json
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.models import Count
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_databases, setup_test_environment,
+    teardown_databases, teardown_test_environment,
+)
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.alertas.models import Alerta
+from apps.authentication.models import User
+from apps.bombonas.models import Bombona, LeituraSensor
+from apps.coletas.models import Coleta
+from apps.empresas.models import Empresa
+
+
+# Cache isolado: o benchmark não lê nem publica resultados no cache real
+CACHES_BENCHMARK = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'iowaste-benchmark',
+    }
+}
+
+
+
+@contextmanager
+def banco_de_teste(**configuracoes):
+    """
+    Banco de teste isolado para benchmarks e verificações: nunca lê nem altera os dados reais
+    setup_databases também aponta as réplicas (TEST MIRROR) para o banco de teste, e o
+    roteamento para réplicas fica desligado: as queries são medidas na conexão principal.
+    Durante o bloco valem o cache em memória (CACHES_BENCHMARK) e as configurações informadas.
+    """
+    from core.paralelo import encerrar_conexoes
+
+    setup_test_environment()
+    try:
+        bancos = setup_databases(verbosity=0, interactive=False, serialized_aliases=set())
+        try:
+            with override_settings(CACHES=CACHES_BENCHMARK, DATABASE_REPLICAS=[], **configuracoes):
+                yield
+        finally:
+            # Conexões abertas pelas threads do pool impediriam a remoção do banco de teste
+            encerrar_conexoes()
+            connections.close_all()
+            teardown_databases(bancos, verbosity=0)
+    finally:
+        teardown_test_environment()
+
+
+# Escalas padrão (número de bombonas)
+ESCALAS_PADRAO = [10, 100, 1000]
+
+# Proporções usadas para dimensionar a base a partir do número de bombonas
+BOMBONAS_POR_EMPRESA = 10
+COLETAS_POR_BOMBONA = 5
+LEITURAS_POR_BOMBONA = 10
+ALERTAS_POR_BOMBONA = 1
+
+# Endpoints medidos: (nome, método, nome da rota, usa pk de bombona, dados)
+ENDPOINTS = [
+    # Bombonas
+    ('bombonas_lista', 'get', 'bombona-list-create', False, None),
+    ('bombonas_detalhe', 'get', 'bombona-detail', True, None),
+    ('bombonas_mapa', 'get', 'bombonas-mapa', False, None),
+    ('bombonas_estatisticas', 'get', 'bombonas-estatisticas', False, None),
+    ('bombonas_historico', 'get', 'historico-bombona', True, None),
+    ('bombonas_leituras', 'get', 'leituras-sensores', False, None),
+
+    # Coletas
+    ('coletas_lista', 'get', 'coleta-list-create', False, None),
+    ('coletas_estatisticas', 'get', 'coletas-estatisticas', False, None),
+
+    # Alertas
+    ('alertas_lista', 'get', 'alerta-list-create', False, None),
+    ('alertas_estatisticas', 'get', 'alertas-estatisticas', False, None),
+
+    # Empresas
+    ('empresas_lista', 'get', 'empresa-list-create', False, None),
+    ('empresas_stats', 'get', 'empresa-stats', False, None),
+
+    # Relatórios
+    ('relatorio_mensal', 'get', 'relatorio-mensal', False, None),
+    ('relatorio_por_tipo', 'get', 'relatorio-por-tipo', False, None),
+    ('relatorio_por_empresa', 'get', 'relatorio-por-empresa', False, None),
+    ('relatorio_evolucao', 'get', 'relatorio-evolucao', False, None),
+    ('dashboard_kpis', 'get', 'dashboard-kpis', False, None),
+    ('dashboard_graficos', 'get', 'dashboard-graficos', False, None),
+    ('relatorio_exportacao', 'get', 'relatorio-exportacao', False, None),
+
+    # Simulador
+    ('simulador_status', 'get', 'status-simulador', False, None),
+    ('simulador_iniciar', 'post', 'iniciar-simulacao', False, {}),
+    ('simulador_bombona', 'post', 'simular-bombona', True, {}),
+    ('simulador_resetar', 'post', 'resetar-bombona', True, {}),
+]
+
+
+def popular_base_benchmark(escala, semente=42):
+    """Popula a base com um volume proporcional à escala informada"""
+
+    rng = random.Random(semente)
+    agora = timezone.now()
+
+    total_empresas = max(1, escala // BOMBONAS_POR_EMPRESA)
+    empresas = Empresa.objects.bulk_create([
+        Empresa(
+            nome=f'Empresa Benchmark {i:05d}',
+            cnpj=f'{i // 1000000:02d}.{(i // 1000) % 1000:03d}.{i % 1000:03d}/0001-{i % 100:02d}',
+            razao_social=f'Empresa Benchmark {i:05d} LTDA',
+            endereco='Av. Brasil',
+            numero=str(i),
+            bairro='Centro',
+            cidade='Maringá',
+            estado='PR',
+            cep='87013-000',
+            telefone='(44) 3000-0000',
+            email=f'empresa{i}@benchmark.com.br',
+            responsavel='Responsável Benchmark',
+            is_active=i % 10 != 0,
+        )
+        for i in range(total_empresas)
+    ])
+
+    tipos = [tipo for tipo, _ in Bombona.TIPO_RESIDUO_CHOICES]
+    status_bombona = [status for status, _ in Bombona.STATUS_CHOICES]
+    bombonas = []
+    for i in range(escala):
+        capacidade = Decimal('200.00')
+        peso = Decimal(rng.uniform(0, 200)).quantize(Decimal('0.01'))
+        bombonas.append(Bombona(
+            identificacao=f'BMK-{i:07d}',
+            empresa=empresas[i % total_empresas],
+            latitude=Decimal(rng.uniform(-24.5, -22.5)).quantize(Decimal('0.000001')),
+            longitude=Decimal(rng.uniform(-54.0, -51.0)).quantize(Decimal('0.000001')),
+            endereco_instalacao=f'Rua Benchmark, {i}',
+            capacidade=capacidade,
+            tipo_residuo=tipos[i % len(tipos)],
+            status=rng.choice(status_bombona),
+            peso_atual=peso,
+            temperatura=Decimal(rng.uniform(20, 45)).quantize(Decimal('0.01')),
+            ultima_leitura=agora,
+            data_instalacao=agora.date(),
+            is_active=i % 20 != 0,
+        ))
+    bombonas = Bombona.objects.bulk_create(bombonas)
+
+    operador = User.objects.create_user(
+        username='operador_benchmark',
+        email='operador@benchmark.com.br',
+        password='benchmark123',
+        tipo_usuario='operador',
+    )
+
+    status_coleta = [status for status, _ in Coleta.STATUS_CHOICES]
+    Coleta.objects.bulk_create([
+        Coleta(
+            bombona=bombona,
+            operador=operador,
+            data_coleta=agora - timedelta(days=rng.randint(0, 400)),
+            peso_coletado=Decimal(rng.uniform(1, 50)).quantize(Decimal('0.01')),
+            destino='Aterro Industrial Benchmark',
+            status=rng.choice(status_coleta),
+        )
+        for bombona in bombonas
+        for _ in range(COLETAS_POR_BOMBONA)
+    ], batch_size=5000)
+
+    LeituraSensor.objects.bulk_create([
+        LeituraSensor(
+            bombona=bombona,
+            peso=bombona.peso_atual,
+            temperatura=bombona.temperatura,
+        )
+        for bombona in bombonas
+        for _ in range(LEITURAS_POR_BOMBONA)
+    ], batch_size=5000)
+
+    tipos_alerta = [tipo for tipo, _ in Alerta.TIPO_CHOICES]
+    niveis = [nivel for nivel, _ in Alerta.NIVEL_CHOICES]
+    Alerta.objects.bulk_create([
+        Alerta(
+            bombona=bombona,
+            tipo=rng.choice(tipos_alerta),
+            nivel=rng.choice(niveis),
+            descricao=f'Alerta de benchmark da bombona {bombona.identificacao}',
+            resolvido=rng.random() < 0.5,
+        )
+        for bombona in bombonas
+        for _ in range(ALERTAS_POR_BOMBONA)
+    ], batch_size=5000)
+
+    return {
+        'empresas': total_empresas,
+        'bombonas': escala,
+        'coletas': escala * COLETAS_POR_BOMBONA,
+        'leituras': escala * LEITURAS_POR_BOMBONA,
+        'alertas': escala * ALERTAS_POR_BOMBONA,
+    }
+
+
+def criar_cliente_benchmark():
+    """Cria um cliente autenticado como administrador"""
+
+    admin = User.objects.create_user(
+        username='admin_benchmark',
+        email='admin@benchmark.com.br',
+        password='benchmark123',
+        tipo_usuario='admin',
+    )
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    # Registrar erros 500 como resultado ao invés de interromper a suite
+    client.raise_request_exception = False
+    return client
+
+
+def medir_endpoint(client, metodo, url, dados=None, repeticoes=5):
+    """Executa um endpoint várias vezes e retorna as medianas de tempo e SQL"""
+
+    tempos = []
+    tempos_sql = []
+    queries = []
+    status_code = None
+
+    for _ in range(repeticoes):
+        # Mede o cálculo de cada endpoint, não um resultado coalescido/em cache
+        cache.clear()
+        with CaptureQueriesContext(connection) as contexto:
+            inicio = time.perf_counter()
+            if metodo == 'post':
+                response = client.post(url, dados or {}, format='json')
+            else:
+                response = client.get(url)
+            fim = time.perf_counter()
+
+        status_code = response.status_code
+        tempos.append((fim - inicio) * 1000)
+        tempos_sql.append(sum(float(q['time']) for q in contexto.captured_queries) * 1000)
+        queries.append(len(contexto.captured_queries))
+
+    return {
+        'status': status_code,
+        'tempo_ms': round(statistics.median(tempos), 3),
+        'tempo_sql_ms': round(statistics.median(tempos_sql), 3),
+        'queries': int(statistics.median(queries)),
+    }
+
+
+def executar_benchmark(escala, repeticoes=5, filtro=None):
+    """Popula a base na escala informada e mede todos os endpoints"""
+
+    volume = popular_base_benchmark(escala)
+    client = criar_cliente_benchmark()
+    bombona_id = Bombona.objects.filter(is_active=True).values_list('id', flat=True).first()
+
+    resultados = {}
+    with override_settings(CACHES=CACHES_BENCHMARK):
+        for nome, metodo, rota, usa_pk, dados in ENDPOINTS:
+            if filtro and not any(f in nome for f in filtro):
+                continue
+            url = reverse(rota, kwargs={'pk': bombona_id}) if usa_pk else reverse(rota)
+            resultados[nome] = medir_endpoint(client, metodo, url, dados, repeticoes)
+
+    return {
+        'volume': volume,
+        'endpoints': resultados,
+    }
+
+
+# Endpoints com consultas independentes executadas em paralelo (core.paralelo)
+ENDPOINTS_DASHBOARD = [
+    ('dashboard_kpis', 'dashboard-kpis'),
+    ('dashboard_graficos', 'dashboard-graficos'),
+]
+
+
+def executar_benchmark_dashboard(escala, repeticoes=5):
+    """
+    Mede os endpoints do dashboard com as consultas em sequência e em paralelo
+    Apenas o tempo total é comparado: as queries das threads do pool não passam
+    pela conexão capturada por CaptureQueriesContext
+    """
+
+    volume = popular_base_benchmark(escala)
+    client = criar_cliente_benchmark()
+
+    resultados = {}
+    with override_settings(CACHES=CACHES_BENCHMARK):
+        for nome, rota in ENDPOINTS_DASHBOARD:
+            url = reverse(rota)
+            modos = {}
+            for modo, paralelo in (('sequencial', False), ('paralelo', True)):
+                with override_settings(CONSULTAS_PARALELAS_ATIVO=paralelo):
+                    medicao = medir_endpoint(client, 'get', url, repeticoes=repeticoes)
+                modos[modo] = {'status': medicao['status'], 'tempo_ms': medicao['tempo_ms']}
+            sequencial = modos['sequencial']['tempo_ms']
+            paralelo = modos['paralelo']['tempo_ms']
+            modos['ganho'] = round(sequencial / paralelo, 2) if paralelo else None
+            resultados[nome] = modos
+
+    return {
+        'volume': volume,
+        'endpoints': resultados,
+    }
+
+
+def executar_benchmark_serializacao(escala, repeticoes=5):
+    """
+    Mede no mapa de bombonas o tempo de renderização do JSON (DRF x orjson)
+    e os bytes transferidos sem compressão, com gzip e com brotli
+    """
+    from rest_framework.renderers import JSONRenderer
+    from core.middleware import brotli
+    from core.renderers import ORJSONRenderer
+
+    volume = popular_base_benchmark(escala)
+    client = criar_cliente_benchmark()
+    url = reverse('bombonas-mapa')
+
+    with override_settings(CACHES=CACHES_BENCHMARK):
+        dados = client.get(url).data
+
+        renderizacao = {}
+        saidas = {}
+        for nome, renderer in (('drf', JSONRenderer()), ('orjson', ORJSONRenderer())):
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                saidas[nome] = renderer.render(dados)
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            renderizacao[nome] = round(statistics.median(tempos), 3)
+
+        codificacoes = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+        transferencia = {}
+        for codificacao in codificacoes:
+            response = client.get(url, HTTP_ACCEPT_ENCODING=codificacao)
+            transferencia[codificacao] = len(response.content)
+
+    return {
+        'volume': volume,
+        'itens': len(dados),
+        'renderizacao_ms': renderizacao,
+        'saidas_equivalentes': json.loads(saidas['drf']) == json.loads(saidas['orjson']),
+        'bytes': transferencia,
+    }
+
+
+def _listagens_serializers():
+    """(nome, queryset, serializer DRF, serializer rápido) das listagens medidas"""
+    from apps.alertas.serializers import AlertaListSerializer, AlertaListRapidoSerializer
+    from apps.bombonas.serializers import (
+        BombonaListSerializer, BombonaListRapidoSerializer,
+        BombonaMapSerializer, BombonaMapRapidoSerializer,
+    )
+    from apps.coletas.serializers import ColetaListSerializer, ColetaListRapidoSerializer
+
+    return [
+        ('bombonas_lista', Bombona.objects.select_related('empresa'),
+         BombonaListSerializer, BombonaListRapidoSerializer),
+        ('bombonas_mapa', Bombona.objects.filter(is_active=True).select_related('empresa'),
+         BombonaMapSerializer, BombonaMapRapidoSerializer),
+        ('coletas_lista', Coleta.objects.select_related('bombona', 'operador').order_by('-data_coleta'),
+         ColetaListSerializer, ColetaListRapidoSerializer),
+        ('alertas_lista', Alerta.objects.select_related('bombona'),
+         AlertaListSerializer, AlertaListRapidoSerializer),
+    ]
+
+
+def executar_benchmark_serializers(escala, linhas=10000, repeticoes=3):
+    """
+    Compara os serializers DRF das listagens com os serializers rápidos (values())
+    O tempo inclui a consulta; as saídas renderizadas devem ser idênticas byte a byte
+    """
+    from core.renderers import ORJSONRenderer
+
+    volume = popular_base_benchmark(escala)
+    renderer = ORJSONRenderer()
+
+    resultados = {}
+    for nome, queryset, serializer_drf, serializer_rapido in _listagens_serializers():
+        queryset = queryset[:linhas]
+        modos = {}
+        saidas = {}
+        for modo, serializar in (
+            ('drf', lambda: serializer_drf(queryset.all(), many=True).data),
+            ('rapido', lambda: serializer_rapido(serializer_rapido.valores(queryset.all())).data),
+        ):
+            tempos = []
+            for _ in range(repeticoes):
+                inicio = time.perf_counter()
+                dados = serializar()
+                tempos.append((time.perf_counter() - inicio) * 1000)
+            saidas[modo] = renderer.render(dados)
+            modos[modo] = round(statistics.median(tempos), 3)
+
+        resultados[nome] = {
+            'linhas': len(dados),
+            'tempo_ms': modos,
+            'ganho': round(modos['drf'] / modos['rapido'], 2) if modos['rapido'] else None,
+            'saidas_identicas': saidas['drf'] == saidas['rapido'],
+        }
+
+    return {
+        'volume': volume,
+        'listagens': resultados,
+    }
+
+
+# Queries por requisição dos endpoints de empresas, com o cache vazio
+# (não devem crescer com o número de empresas)
+ORCAMENTO_QUERIES_EMPRESAS = {
+    'empresas_lista': 3,      # COUNT da paginação, página com as contagens e totais gerais
+    'empresas_detalhe': 1,    # empresa com as contagens de bombonas
+    'empresas_stats': 4,      # totais gerais, por estado, top bombonas e top coletas
+}
+
+
+def verificar_orcamento_empresas(escala, repeticoes=3):
+    """Mede as queries dos endpoints de empresas e compara com ORCAMENTO_QUERIES_EMPRESAS"""
+
+    volume = popular_base_benchmark(escala)
+    client = criar_cliente_benchmark()
+    empresa_id = Empresa.objects.values_list('id', flat=True).first()
+    urls = {
+        'empresas_lista': reverse('empresa-list-create'),
+        'empresas_detalhe': reverse('empresa-detail', kwargs={'pk': empresa_id}),
+        'empresas_stats': reverse('empresa-stats'),
+    }
+
+    resultados = {}
+    with override_settings(CACHES=CACHES_BENCHMARK):
+        for nome, url in urls.items():
+            medicao = medir_endpoint(client, 'get', url, repeticoes=repeticoes)
+            medicao['orcamento'] = ORCAMENTO_QUERIES_EMPRESAS[nome]
+            resultados[nome] = medicao
+
+    return {
+        'volume': volume,
+        'endpoints': resultados,
+    }
+
+
+def comparar_resultados(baseline, atual, limite=0.2):
+    """Compara dois resultados e retorna as regressões acima do limite relativo"""
+
+    regressoes = []
+    for escala, dados_atuais in atual.get('escalas', {}).items():
+        dados_base = baseline.get('escalas', {}).get(escala)
+        if not dados_base:
+            continue
+
+        for nome, medicao in dados_atuais['endpoints'].items():
+            base = dados_base['endpoints'].get(nome)
+            if not base:
+                continue
+
+            for metrica in ('tempo_ms', 'tempo_sql_ms', 'queries'):
+                valor_base = base[metrica]
+                valor_atual = medicao[metrica]
+                if metrica == 'queries':
+                    regrediu = valor_atual > valor_base
+                else:
+                    regrediu = valor_atual > valor_base * (1 + limite)
+
+                if regrediu:
+                    regressoes.append({
+                        'escala': escala,
+                        'endpoint': nome,
+                        'metrica': metrica,
+                        'baseline': valor_base,
+                        'atual': valor_atual,
+                    })
+
+    return regressoes
+
+
+def executar_stress_peso(bombonas=5, threads=8, leituras=50, coletas=10, semente=42):
+    """
+    Leituras do simulador e conclusões de coletas em paralelo sobre as mesmas bombonas
+    Confere se o peso final de cada bombona é exatamente inicial + leituras - coletas
+    (nenhuma atualização perdida) e se cada coleta, concluída por duas threads ao
+    mesmo tempo, descontou o peso uma única vez
+    """
+    import threading
+    from django.db import connections
+    from apps.simulator.simulator import IoTSimulator
+
+    rng = random.Random(semente)
+    popular_base_benchmark(bombonas, semente)
+
+    # Capacidade e peso altos: nenhuma leitura é limitada pela capacidade e toda coleta cabe no peso
+    peso_inicial = Decimal('100000.00')
+    peso_coleta = Decimal('2.00')
+    ids = list(Bombona.objects.order_by('id').values_list('id', flat=True)[:bombonas])
+    Bombona.objects.filter(id__in=ids).update(
+        capacidade=Decimal('900000.00'), peso_atual=peso_inicial, status='normal', is_active=True,
+    )
+    operador = User.objects.get(username='operador_benchmark')
+    coletas_ids = [
+        coleta.id for coleta in Coleta.objects.bulk_create([
+            Coleta(
+                bombona_id=bombona_id,
+                operador=operador,
+                data_coleta=timezone.now(),
+                peso_coletado=peso_coleta,
+                destino='Aterro Industrial Benchmark',
+                status='pendente',
+            )
+            for bombona_id in ids
+            for _ in range(coletas)
+        ])
+    ]
+
+    # Incremento fixo de 1 kg por leitura: o peso esperado não depende do sorteio
+    simulador = IoTSimulator()
+    simulador.peso_incremento_min = simulador.peso_incremento_max = 1.0
+
+    operacoes = [('leitura', bombona_id) for bombona_id in ids for _ in range(leituras)]
+    operacoes += [('coleta', coleta_id) for coleta_id in coletas_ids for _ in range(2)]
+    rng.shuffle(operacoes)
+
+    def contar_leituras():
+        return dict(
+            LeituraSensor.objects.filter(bombona_id__in=ids)
+            .values('bombona_id').annotate(total=Count('id')).values_list('bombona_id', 'total')
+        )
+
+    leituras_antes = contar_leituras()
+    erros = []
+
+    def executar(lote):
+        try:
+            for tipo, pk in lote:
+                if tipo == 'leitura':
+                    simulador.simular_leitura_bombona(Bombona.objects.get(pk=pk))
+                else:
+                    coleta = Coleta.objects.select_related('bombona').get(pk=pk)
+                    coleta.status = 'concluida'
+                    coleta.save()
+        except Exception as e:
+            erros.append(repr(e))
+        finally:
+            connections.close_all()
+
+    trabalhadores = [
+        threading.Thread(target=executar, args=(operacoes[indice::threads],))
+        for indice in range(threads)
+    ]
+    inicio = time.perf_counter()
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    duracao = time.perf_counter() - inicio
+
+    esperado = peso_inicial + leituras * Decimal('1.00') - coletas * peso_coleta
+    pesos = dict(Bombona.objects.filter(id__in=ids).values_list('id', 'peso_atual'))
+    leituras_depois = contar_leituras()
+    leituras_gravadas = {
+        bombona_id: leituras_depois.get(bombona_id, 0) - leituras_antes.get(bombona_id, 0)
+        for bombona_id in ids
+    }
+    divergencias = [
+        {
+            'bombona': bombona_id,
+            'esperado': str(esperado),
+            'obtido': str(pesos[bombona_id]),
+            'leituras': leituras_gravadas[bombona_id],
+        }
+        for bombona_id in ids
+        if pesos[bombona_id] != esperado or leituras_gravadas[bombona_id] != leituras
+    ]
+
+    return {
+        'bombonas': len(ids),
+        'threads': threads,
+        'operacoes': len(operacoes),
+        'tempo_s': round(duracao, 3),
+        'operacoes_por_segundo': round(len(operacoes) / duracao, 1) if duracao else None,
+        'divergencias': divergencias,
+        'erros': erros,
+    }
+
+
+def verificar_criacao_alertas():
+    """
+    Alerta.criar_em_lote com e sem conflito na constraint de alerta aberto por bombona/tipo
+    Cobre o INSERT de um único alerta em conflito (caminho de uma leitura avulsa do
+    simulador) e lotes com alertas já abertos e repetidos. Retorna as falhas encontradas.
+    """
+    popular_base_benchmark(2)
+    Alerta.objects.update(resolvido=True)
+    primeira, segunda = Bombona.objects.order_by('id')[:2]
+
+    def novo(bombona, tipo='nivel_critico'):
+        return Alerta(bombona=bombona, tipo=tipo, nivel='critico', descricao='Alerta de verificação')
+
+    casos = [
+        ('um alerta novo', [novo(primeira)], 1),
+        ('um alerta em conflito', [novo(primeira)], 0),
+        ('lote em conflito', [novo(primeira), novo(primeira)], 0),
+        ('lote misto', [novo(primeira), novo(segunda), novo(segunda), novo(primeira, 'temperatura_alta')], 2),
+    ]
+    falhas = []
+    for nome, alertas, esperado in casos:
+        try:
+            criados = Alerta.criar_em_lote(alertas)
+        except Exception as e:
+            falhas.append(f'{nome}: {e!r}')
+            continue
+        if len(criados) != esperado or any(alerta.pk is None for alerta in criados):
+            falhas.append(f'{nome}: esperado {esperado} alerta(s), criado(s) {len(criados)}')
+
+    duplicados = (
+        Alerta.objects.filter(resolvido=False).values('bombona_id', 'tipo')
+        .annotate(total=Count('id')).filter(total__gt=1).count()
+    )
+    if duplicados:
+        falhas.append(f'{duplicados} bombona(s)/tipo(s) com mais de um alerta aberto')
+    return {'casos': len(casos), 'falhas': falhas}
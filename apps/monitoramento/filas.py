@@ -0,0 +1,55 @@
+"""
+Benchmark de filas do Celery
+Mede o atraso até o início de uma tarefa da fila do simulador enquanto a fila de
+manutenção está ocupada, com as filas separadas e com tudo em uma única fila
+(comportamento anterior à separação). Requer o broker e os workers em execução.
+"""
+import statistics
+import time
+
+from .tasks import sonda_fila, carga_manutencao
+
+
+MODOS = {
+    # modo: (fila da carga, fila da sonda)
+    'separadas': ('manutencao', 'ingestao'),
+    'compartilhada': ('manutencao', 'manutencao'),
+}
+
+
+def _percentil(valores, percentil):
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(percentil / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def medir_modo(modo, tarefas_carga, duracao_carga, sondas, intervalo, timeout):
+    fila_carga, fila_sonda = MODOS[modo]
+
+    for _ in range(tarefas_carga):
+        carga_manutencao.apply_async(args=[duracao_carga], queue=fila_carga)
+
+    resultados = []
+    for _ in range(sondas):
+        resultados.append(sonda_fila.apply_async(args=[time.time()], queue=fila_sonda))
+        time.sleep(intervalo)
+
+    atrasos = [resultado.get(timeout=timeout) * 1000 for resultado in resultados]
+    return {
+        'fila_carga': fila_carga,
+        'fila_sonda': fila_sonda,
+        'atraso_mediana_ms': round(statistics.median(atrasos), 1),
+        'atraso_p95_ms': round(_percentil(atrasos, 95), 1),
+        'atraso_max_ms': round(max(atrasos), 1),
+    }
+
+
+def executar_benchmark_filas(modos, tarefas_carga=8, duracao_carga=2.0, sondas=10, intervalo=0.5):
+    # Tempo máximo de espera: toda a carga em um único processo, mais uma folga
+    timeout = tarefas_carga * duracao_carga + sondas * intervalo + 30
+    resultados = {}
+    for modo in modos:
+        resultados[modo] = medir_modo(modo, tarefas_carga, duracao_carga, sondas, intervalo, timeout)
+        # Aguarda a carga do modo anterior terminar antes do próximo
+        time.sleep(tarefas_carga * duracao_carga)
+    return resultados
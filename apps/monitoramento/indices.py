@@ -0,0 +1,141 @@
+"""
+Benchmark dos índices parciais/cobrindo
+Compara o plano de execução das consultas quentes com e sem cada índice (PostgreSQL)
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Sum, Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.alertas.models import Alerta
+from apps.bombonas.models import Bombona
+from apps.coletas.models import Coleta
+
+
+class _Rollback(Exception):
+    pass
+
+
+# (nome, índice avaliado, consulta no formato usado pelas views)
+CONSULTAS = [
+    (
+        'alerta_aberto_existente',
+        'alerta_aberto_bomb_tipo_uniq',
+        lambda bombona_id: Alerta.objects.filter(
+            bombona_id=bombona_id, tipo='nivel_critico', resolvido=False
+        ).exists(),
+    ),
+    (
+        'alertas_criticos_abertos',
+        'alerta_aberto_nivel_tipo_idx',
+        lambda bombona_id: Alerta.objects.filter(nivel='critico', resolvido=False).count(),
+    ),
+    (
+        'alertas_abertos_por_tipo',
+        'alerta_aberto_nivel_tipo_idx',
+        lambda bombona_id: list(
+            Alerta.objects.filter(resolvido=False).values('tipo').annotate(quantidade=Count('*'))
+        ),
+    ),
+    (
+        'bombonas_ativas_cheias',
+        'bombona_ativa_status_idx',
+        lambda bombona_id: Bombona.objects.filter(is_active=True, status='cheia').count(),
+    ),
+    (
+        'bombonas_ativas_peso_total',
+        'bombona_ativa_status_idx',
+        lambda bombona_id: Bombona.objects.filter(is_active=True).aggregate(total=Sum('peso_atual')),
+    ),
+    (
+        'bombonas_ativas_por_tipo',
+        'bombona_ativa_tipo_idx',
+        lambda bombona_id: list(
+            Bombona.objects.filter(is_active=True).values('tipo_residuo').annotate(
+                quantidade=Count('*'), peso=Sum('peso_atual')
+            )
+        ),
+    ),
+    (
+        'coletas_concluidas_periodo',
+        'coleta_concluida_data_idx',
+        lambda bombona_id: Coleta.objects.filter(
+            status='concluida', data_coleta__gte=timezone.now() - timedelta(days=30)
+        ).aggregate(total=Sum('peso_coletado'), coletas=Count('*')),
+    ),
+]
+
+
+def _sql_da_consulta(consulta, bombona_id):
+    with CaptureQueriesContext(connection) as contexto:
+        consulta(bombona_id)
+    return contexto.captured_queries[-1]['sql']
+
+
+def _resumir_plano(plano):
+    """Extrai os nós, índices usados e o tempo de execução de um EXPLAIN (FORMAT JSON)"""
+    nos = []
+
+    def percorrer(no):
+        descricao = no['Node Type']
+        if 'Index Name' in no:
+            descricao += f' ({no["Index Name"]})'
+        nos.append(descricao)
+        for filho in no.get('Plans', []):
+            percorrer(filho)
+
+    raiz = plano[0]
+    percorrer(raiz['Plan'])
+    return {
+        'nos': nos,
+        'tempo_ms': raiz['Execution Time'],
+        'buffers': raiz['Plan'].get('Shared Hit Blocks', 0) + raiz['Plan'].get('Shared Read Blocks', 0),
+    }
+
+
+def _explicar(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}')
+        plano = cursor.fetchone()[0]
+    return _resumir_plano(plano)
+
+
+def comparar_planos(sql, indice):
+    """Plano com o índice e, dentro de uma transação desfeita, sem ele"""
+    com_indice = _explicar(sql)
+
+    sem_indice = None
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP INDEX {connection.ops.quote_name(indice)}')
+            sem_indice = _explicar(sql)
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+    return {'com_indice': com_indice, 'sem_indice': sem_indice}
+
+
+def executar_benchmark_indices():
+    if connection.vendor != 'postgresql':
+        raise RuntimeError('O benchmark de índices requer PostgreSQL')
+
+    # Atualiza estatísticas e o visibility map (necessário para index-only scans)
+    with connection.cursor() as cursor:
+        for modelo in (Alerta, Bombona, Coleta):
+            cursor.execute(f'VACUUM ANALYZE {connection.ops.quote_name(modelo._meta.db_table)}')
+
+    bombona_id = Bombona.objects.filter(is_active=True).values_list('id', flat=True).first()
+
+    resultados = {}
+    for nome, indice, consulta in CONSULTAS:
+        sql = _sql_da_consulta(consulta, bombona_id)
+        resultados[nome] = {
+            'indice': indice,
+            'sql': sql,
+            **comparar_planos(sql, indice),
+        }
+    return resultados
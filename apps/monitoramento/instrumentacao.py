@@ -0,0 +1,94 @@
+"""
+Instrumentação por requisição
+Acumula número de queries, tempo de SQL e tempo de serialização da requisição corrente
+"""
+import threading
+import time
+from contextvars import ContextVar
+
+
+# Medição da requisição corrente (None quando a requisição não foi amostrada)
+medicao_atual = ContextVar('medicao_atual', default=None)
+
+
+class Medicao:
+    """Contadores de uma requisição instrumentada"""
+
+    __slots__ = (
+        'inicio', 'inicio_view', 'fim_view', 'queries', 'tempo_sql',
+        'tempo_serializer', 'profundidade_serializer', 'view', 'lock',
+    )
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.inicio_view = None
+        self.fim_view = None
+        self.queries = 0
+        self.tempo_sql = 0.0
+        self.tempo_serializer = 0.0
+        self.profundidade_serializer = 0
+        self.view = None
+        # Consultas paralelas (core.paralelo) registram de várias threads
+        self.lock = threading.Lock()
+
+    def registrar_sql(self, execute, sql, params, many, context):
+        """Wrapper de execução (connection.execute_wrapper) que mede cada query"""
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracao = time.perf_counter() - inicio
+            with self.lock:
+                self.queries += 1
+                self.tempo_sql += duracao
+
+    def como_dict(self, total):
+        tempo_view = None
+        if self.inicio_view is not None:
+            fim_view = self.fim_view if self.fim_view is not None else time.perf_counter()
+            tempo_view = (fim_view - self.inicio_view) * 1000
+
+        return {
+            'view': self.view,
+            'queries': self.queries,
+            'sql_ms': round(self.tempo_sql * 1000, 3),
+            'serializer_ms': round(self.tempo_serializer * 1000, 3),
+            'view_ms': round(tempo_view, 3) if tempo_view is not None else None,
+            'total_ms': round(total * 1000, 3),
+        }
+
+
+def nome_view(view_func):
+    """Nome legível da view (APIView, @api_view ou função simples)"""
+    cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if cls is not None:
+        return cls.__name__
+    return getattr(view_func, '__name__', view_func.__class__.__name__)
+
+
+def instrumentar_serializers():
+    """Mede o tempo gasto em Serializer.data dentro da requisição corrente"""
+
+    from rest_framework.serializers import BaseSerializer
+
+    propriedade_original = BaseSerializer.data
+    if getattr(propriedade_original.fget, 'instrumentado', False):
+        return
+
+    def data(self):
+        medicao = medicao_atual.get()
+        if medicao is None:
+            return propriedade_original.fget(self)
+
+        # Serializers aninhados não devem ser contados em dobro
+        medicao.profundidade_serializer += 1
+        inicio = time.perf_counter()
+        try:
+            return propriedade_original.fget(self)
+        finally:
+            medicao.profundidade_serializer -= 1
+            if medicao.profundidade_serializer == 0:
+                medicao.tempo_serializer += time.perf_counter() - inicio
+
+    data.instrumentado = True
+    BaseSerializer.data = property(data)
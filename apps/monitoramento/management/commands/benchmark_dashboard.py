@@ -0,0 +1,62 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from apps.monitoramento.benchmark import ESCALAS_PADRAO, banco_de_teste, executar_benchmark_dashboard
+import json
+
+
+class Command(BaseCommand):
+    help = 'Compara os endpoints do dashboard com consultas em sequência e em paralelo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escalas',
+            type=str,
+            default=','.join(str(e) for e in ESCALAS_PADRAO),
+            help='Número de bombonas de cada escala, separado por vírgula'
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Número de execuções por endpoint e modo (usa a mediana)'
+        )
+        parser.add_argument(
+            '--saida',
+            type=str,
+            help='Arquivo JSON onde o resultado será gravado'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            escalas = [int(e) for e in options['escalas'].split(',') if e.strip()]
+        except ValueError:
+            raise CommandError('Escalas devem ser números inteiros separados por vírgula')
+
+        if connection.vendor == 'sqlite':
+            raise CommandError('O banco de teste do SQLite fica em memória e não é compartilhado entre threads')
+
+        resultado = {
+            'timestamp': timezone.now().isoformat(),
+            'repeticoes': options['repeticoes'],
+            'escalas': {},
+        }
+
+        with banco_de_teste():
+            for escala in escalas:
+                self.stdout.write(self.style.SUCCESS(f'Escala {escala} bombonas'))
+                call_command('flush', interactive=False, verbosity=0)
+                dados = executar_benchmark_dashboard(escala, options['repeticoes'])
+                resultado['escalas'][str(escala)] = dados
+                for nome, modos in dados['endpoints'].items():
+                    self.stdout.write(
+                        f'  {nome:<20} sequencial {modos["sequencial"]["tempo_ms"]:>9.2f} ms | '
+                        f'paralelo {modos["paralelo"]["tempo_ms"]:>9.2f} ms | '
+                        f'ganho {modos["ganho"]}x'
+                    )
+
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(resultado, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Resultado gravado em {options["saida"]}'))
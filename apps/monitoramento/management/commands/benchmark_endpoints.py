@@ -0,0 +1,105 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.monitoramento.benchmark import (
+    ESCALAS_PADRAO, banco_de_teste, executar_benchmark, comparar_resultados
+)
+import json
+
+
+class Command(BaseCommand):
+    help = 'Executa o benchmark dos endpoints da API em uma base de teste dimensionada'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escalas',
+            type=str,
+            default=','.join(str(e) for e in ESCALAS_PADRAO),
+            help='Número de bombonas de cada escala, separado por vírgula'
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Número de execuções por endpoint (usa a mediana)'
+        )
+        parser.add_argument(
+            '--endpoints',
+            type=str,
+            default='',
+            help='Mede apenas endpoints cujo nome contém um dos termos (separados por vírgula)'
+        )
+        parser.add_argument(
+            '--saida',
+            type=str,
+            help='Arquivo JSON onde o resultado será gravado'
+        )
+        parser.add_argument(
+            '--comparar',
+            type=str,
+            help='Arquivo JSON de baseline para detectar regressões'
+        )
+        parser.add_argument(
+            '--limite',
+            type=float,
+            default=0.2,
+            help='Aumento relativo tolerado de tempo antes de acusar regressão (0.2 = 20%%)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            escalas = [int(e) for e in options['escalas'].split(',') if e.strip()]
+        except ValueError:
+            raise CommandError('Escalas devem ser números inteiros separados por vírgula')
+
+        filtro = [f.strip() for f in options['endpoints'].split(',') if f.strip()]
+
+        baseline = None
+        if options['comparar']:
+            with open(options['comparar']) as arquivo:
+                baseline = json.load(arquivo)
+
+        resultado = {
+            'timestamp': timezone.now().isoformat(),
+            'repeticoes': options['repeticoes'],
+            'escalas': {},
+        }
+
+        with banco_de_teste():
+            for escala in escalas:
+                self.stdout.write(self.style.SUCCESS(f'Escala {escala} bombonas'))
+                call_command('flush', interactive=False, verbosity=0)
+                dados = executar_benchmark(escala, options['repeticoes'], filtro)
+                resultado['escalas'][str(escala)] = dados
+                self.exibir_escala(dados)
+
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(resultado, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Resultado gravado em {options["saida"]}'))
+        else:
+            self.stdout.write(json.dumps(resultado, indent=2))
+
+        if baseline is not None:
+            regressoes = comparar_resultados(baseline, resultado, options['limite'])
+            if regressoes:
+                for r in regressoes:
+                    self.stdout.write(self.style.ERROR(
+                        f'  [{r["escala"]}] {r["endpoint"]} {r["metrica"]}: '
+                        f'{r["baseline"]} -> {r["atual"]}'
+                    ))
+                raise CommandError(f'{len(regressoes)} regressões detectadas')
+            self.stdout.write(self.style.SUCCESS('Nenhuma regressão detectada'))
+
+    def exibir_escala(self, dados):
+        for nome, medicao in dados['endpoints'].items():
+            linha = (
+                f'  {nome:<28} {medicao["status"]:>3} | '
+                f'{medicao["tempo_ms"]:>9.2f} ms | '
+                f'{medicao["queries"]:>5} queries | '
+                f'{medicao["tempo_sql_ms"]:>9.2f} ms SQL'
+            )
+            if medicao['status'] >= 500:
+                self.stdout.write(self.style.ERROR(linha))
+            else:
+                self.stdout.write(linha)
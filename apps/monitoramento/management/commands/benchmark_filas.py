@@ -0,0 +1,78 @@
+from celery.exceptions import TimeoutError
+from django.core.management.base import BaseCommand, CommandError
+from apps.monitoramento.filas import MODOS, executar_benchmark_filas
+import json
+
+
+class Command(BaseCommand):
+    help = 'Mede o atraso do tick do simulador com a fila de manutenção sob carga (requer workers)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modos',
+            type=str,
+            default=','.join(MODOS),
+            help='Modos medidos: separadas (filas atuais) e/ou compartilhada (fila única)'
+        )
+        parser.add_argument(
+            '--tarefas-carga',
+            type=int,
+            default=8,
+            help='Número de tarefas longas enviadas para a fila de manutenção'
+        )
+        parser.add_argument(
+            '--duracao-carga',
+            type=float,
+            default=2.0,
+            help='Duração (s) de cada tarefa de carga'
+        )
+        parser.add_argument(
+            '--sondas',
+            type=int,
+            default=10,
+            help='Número de tarefas de sonda enviadas durante a carga'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=0.5,
+            help='Intervalo (s) entre as sondas'
+        )
+        parser.add_argument(
+            '--saida',
+            type=str,
+            help='Arquivo JSON onde o resultado será gravado'
+        )
+
+    def handle(self, *args, **options):
+        modos = [m.strip() for m in options['modos'].split(',') if m.strip()]
+        invalidos = [m for m in modos if m not in MODOS]
+        if invalidos:
+            raise CommandError(f'Modos inválidos: {", ".join(invalidos)}')
+
+        try:
+            resultados = executar_benchmark_filas(
+                modos,
+                tarefas_carga=options['tarefas_carga'],
+                duracao_carga=options['duracao_carga'],
+                sondas=options['sondas'],
+                intervalo=options['intervalo'],
+            )
+        except TimeoutError:
+            raise CommandError(
+                'Sondas sem resposta: verifique se há workers consumindo as filas ingestao e manutencao'
+            )
+
+        for modo, dados in resultados.items():
+            self.stdout.write(self.style.SUCCESS(
+                f'{modo:<14} carga em {dados["fila_carga"]}, sonda em {dados["fila_sonda"]}'
+            ))
+            self.stdout.write(
+                f'  atraso até o início: mediana {dados["atraso_mediana_ms"]} ms | '
+                f'p95 {dados["atraso_p95_ms"]} ms | máx {dados["atraso_max_ms"]} ms'
+            )
+
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(resultados, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\nResultado gravado em {options["saida"]}'))
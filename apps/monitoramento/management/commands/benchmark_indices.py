@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from apps.monitoramento.benchmark import banco_de_teste, popular_base_benchmark
+from apps.monitoramento.indices import executar_benchmark_indices
+import json
+
+
+class Command(BaseCommand):
+    help = 'Compara os planos das consultas quentes com e sem os índices parciais (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escala',
+            type=int,
+            default=20000,
+            help='Número de bombonas da base de teste'
+        )
+        parser.add_argument(
+            '--saida',
+            type=str,
+            help='Arquivo JSON onde o resultado será gravado'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('O benchmark de índices requer PostgreSQL')
+
+        with banco_de_teste():
+            self.stdout.write(self.style.SUCCESS(f'Populando base com {options["escala"]} bombonas...'))
+            popular_base_benchmark(options['escala'])
+            resultados = executar_benchmark_indices()
+
+        for nome, dados in resultados.items():
+            self.stdout.write(self.style.SUCCESS(f'\n{nome} [{dados["indice"]}]'))
+            for rotulo, chave in (('sem índice', 'sem_indice'), ('com índice', 'com_indice')):
+                plano = dados[chave]
+                self.stdout.write(
+                    f'  {rotulo:<11} {plano["tempo_ms"]:>9.3f} ms | '
+                    f'{plano["buffers"]:>6} buffers | {" > ".join(plano["nos"])}'
+                )
+
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(resultados, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\nResultado gravado em {options["saida"]}'))
@@ -0,0 +1,64 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.monitoramento.benchmark import banco_de_teste, executar_benchmark_serializacao
+import json
+
+
+class Command(BaseCommand):
+    help = 'Mede a renderização JSON e os bytes transferidos do mapa de bombonas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escalas',
+            type=str,
+            default='1000,10000',
+            help='Número de bombonas de cada escala, separado por vírgula'
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=5,
+            help='Número de renderizações por renderer (usa a mediana)'
+        )
+        parser.add_argument(
+            '--saida',
+            type=str,
+            help='Arquivo JSON onde o resultado será gravado'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            escalas = [int(e) for e in options['escalas'].split(',') if e.strip()]
+        except ValueError:
+            raise CommandError('Escalas devem ser números inteiros separados por vírgula')
+
+        resultado = {
+            'timestamp': timezone.now().isoformat(),
+            'repeticoes': options['repeticoes'],
+            'escalas': {},
+        }
+
+        with banco_de_teste():
+            for escala in escalas:
+                self.stdout.write(self.style.SUCCESS(f'Escala {escala} bombonas'))
+                call_command('flush', interactive=False, verbosity=0)
+                dados = executar_benchmark_serializacao(escala, options['repeticoes'])
+                resultado['escalas'][str(escala)] = dados
+                self.exibir_escala(dados)
+
+        if options['saida']:
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(resultado, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Resultado gravado em {options["saida"]}'))
+
+    def exibir_escala(self, dados):
+        renderizacao = dados['renderizacao_ms']
+        self.stdout.write(
+            f'  {dados["itens"]} bombonas no mapa | renderização drf {renderizacao["drf"]:.2f} ms, '
+            f'orjson {renderizacao["orjson"]:.2f} ms'
+        )
+        bytes_por_codificacao = ', '.join(f'{nome} {total}' for nome, total in dados['bytes'].items())
+        self.stdout.write(f'  bytes: {bytes_por_codificacao}')
+        if not dados['saidas_equivalentes']:
+            self.stdout.write(self.style.ERROR('  As saídas dos renderers divergem'))
@@ -0,0 +1,64 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.monitoramento.benchmark import banco_de_teste, executar_benchmark_serializers
+import json
+
+
+class Command(BaseCommand):
+    help = 'Compara os serializers DRF das listagens com os serializers rápidos (values())'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escala',
+            type=int,
+            default=10000,
+            help='Número de bombonas da base de teste'
+        )
+        parser.add_argument(
+            '--linhas',
+            type=int,
+            default=10000,
+            help='Número máximo de linhas serializadas por listagem'
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=3,
+            help='Número de execuções por serializer (usa a mediana)'
+        )
+        parser.add_argument(
+            '--saida',
+            type=str,
+            help='Arquivo JSON onde o resultado será gravado'
+        )
+
+    def handle(self, *args, **options):
+        with banco_de_teste():
+            call_command('flush', interactive=False, verbosity=0)
+            dados = executar_benchmark_serializers(
+                options['escala'], options['linhas'], options['repeticoes']
+            )
+
+        divergentes = []
+        for nome, medicao in dados['listagens'].items():
+            linha = (
+                f'  {nome:<16} {medicao["linhas"]:>6} linhas | '
+                f'drf {medicao["tempo_ms"]["drf"]:>9.2f} ms | '
+                f'rápido {medicao["tempo_ms"]["rapido"]:>9.2f} ms | '
+                f'ganho {medicao["ganho"]}x'
+            )
+            if medicao['saidas_identicas']:
+                self.stdout.write(linha)
+            else:
+                divergentes.append(nome)
+                self.stdout.write(self.style.ERROR(linha + ' | saídas divergentes'))
+
+        if options['saida']:
+            resultado = {'timestamp': timezone.now().isoformat(), **dados}
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(resultado, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Resultado gravado em {options["saida"]}'))
+
+        if divergentes:
+            raise CommandError(f'Saídas divergentes: {", ".join(divergentes)}')
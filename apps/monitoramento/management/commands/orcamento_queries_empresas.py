@@ -0,0 +1,55 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from apps.monitoramento.benchmark import BOMBONAS_POR_EMPRESA, banco_de_teste, verificar_orcamento_empresas
+
+
+class Command(BaseCommand):
+    help = 'Verifica se os endpoints de empresas respeitam o orçamento de queries em várias escalas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--empresas',
+            type=str,
+            default='10,1000',
+            help='Número de empresas de cada escala, separado por vírgula'
+        )
+        parser.add_argument(
+            '--repeticoes',
+            type=int,
+            default=3,
+            help='Número de execuções por endpoint (usa a mediana)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            escalas = [int(e) for e in options['empresas'].split(',') if e.strip()]
+        except ValueError:
+            raise CommandError('Escalas devem ser números inteiros separados por vírgula')
+
+        falhas = []
+        queries_por_endpoint = {}
+        with banco_de_teste():
+            for empresas in escalas:
+                self.stdout.write(self.style.SUCCESS(f'Escala {empresas} empresas'))
+                call_command('flush', interactive=False, verbosity=0)
+                dados = verificar_orcamento_empresas(empresas * BOMBONAS_POR_EMPRESA, options['repeticoes'])
+                for nome, medicao in dados['endpoints'].items():
+                    linha = (
+                        f'  {nome:<18} {medicao["status"]:>3} | {medicao["queries"]:>3} queries '
+                        f'(orçamento {medicao["orcamento"]}) | {medicao["tempo_ms"]:>9.2f} ms'
+                    )
+                    queries_por_endpoint.setdefault(nome, set()).add(medicao['queries'])
+                    if medicao['status'] != 200 or medicao['queries'] > medicao['orcamento']:
+                        falhas.append(f'{nome} com {empresas} empresas')
+                        self.stdout.write(self.style.ERROR(linha))
+                    else:
+                        self.stdout.write(linha)
+
+        # O número de queries não pode depender do número de empresas
+        for nome, totais in queries_por_endpoint.items():
+            if len(totais) > 1:
+                falhas.append(f'{nome} varia com a escala ({sorted(totais)} queries)')
+
+        if falhas:
+            raise CommandError(f'Orçamento de queries excedido: {"; ".join(falhas)}')
+        self.stdout.write(self.style.SUCCESS('Orçamento de queries respeitado em todas as escalas'))
@@ -0,0 +1,73 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from apps.monitoramento.benchmark import banco_de_teste, executar_stress_peso
+import json
+
+
+class Command(BaseCommand):
+    help = 'Leituras e coletas simultâneas nas mesmas bombonas: verifica se nenhuma atualização de peso é perdida'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--bombonas',
+            type=int,
+            default=5,
+            help='Número de bombonas disputadas pelas threads'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=8,
+            help='Número de threads (cada uma com sua conexão)'
+        )
+        parser.add_argument(
+            '--leituras',
+            type=int,
+            default=50,
+            help='Leituras do simulador por bombona'
+        )
+        parser.add_argument(
+            '--coletas',
+            type=int,
+            default=10,
+            help='Coletas concluídas por bombona (cada uma por duas threads ao mesmo tempo)'
+        )
+        parser.add_argument(
+            '--saida',
+            type=str,
+            help='Arquivo JSON onde o resultado será gravado'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            raise CommandError('O banco de teste do SQLite fica em memória e não é compartilhado entre threads')
+
+        with banco_de_teste(ESTADO_ATUAL_ATIVO=False):
+            call_command('flush', interactive=False, verbosity=0)
+            dados = executar_stress_peso(
+                options['bombonas'], options['threads'], options['leituras'], options['coletas']
+            )
+
+        self.stdout.write(
+            f'  {dados["operacoes"]} operações em {dados["threads"]} threads | '
+            f'{dados["tempo_s"]:.3f} s | {dados["operacoes_por_segundo"]} operações/s'
+        )
+        for divergencia in dados['divergencias']:
+            self.stdout.write(self.style.ERROR(
+                f'  bombona {divergencia["bombona"]}: esperado {divergencia["esperado"]} kg, '
+                f'obtido {divergencia["obtido"]} kg ({divergencia["leituras"]} leituras gravadas)'
+            ))
+        for erro in dados['erros']:
+            self.stdout.write(self.style.ERROR(f'  erro: {erro}'))
+
+        if options['saida']:
+            resultado = {'timestamp': timezone.now().isoformat(), **dados}
+            with open(options['saida'], 'w') as arquivo:
+                json.dump(resultado, arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Resultado gravado em {options["saida"]}'))
+
+        if dados['divergencias'] or dados['erros']:
+            raise CommandError('Atualizações de peso perdidas ou duplicadas sob concorrência')
+        self.stdout.write(self.style.SUCCESS('Nenhuma atualização de peso perdida'))
@@ -0,0 +1,19 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from apps.monitoramento.benchmark import banco_de_teste, verificar_criacao_alertas
+
+
+class Command(BaseCommand):
+    help = 'Verifica a criação de alertas em lote com conflitos na constraint de alerta aberto'
+
+    def handle(self, *args, **options):
+        with banco_de_teste(ESTADO_ATUAL_ATIVO=False):
+            call_command('flush', interactive=False, verbosity=0)
+            dados = verificar_criacao_alertas()
+
+        for falha in dados['falhas']:
+            self.stdout.write(self.style.ERROR(f'  {falha}'))
+
+        if dados['falhas']:
+            raise CommandError('Criação de alertas em lote falhou com conflitos')
+        self.stdout.write(self.style.SUCCESS(f'{dados["casos"]} casos de criação de alertas conferidos'))
@@ -0,0 +1,254 @@
+"""
+Métricas no formato de exposição do Prometheus
+Contadores e histogramas acumulados em memória e agregados no Redis entre processos
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from core.redis import cliente_redis
+
+
+logger = logging.getLogger('iowaste.metricas')
+
+# Chave do hash do Redis que agrega os valores de todos os workers
+CHAVE_REDIS = 'iowaste:metricas'
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_TAREFAS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+BUCKETS_LEITURAS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+# nome: (tipo, descrição, buckets)
+METRICAS = {
+    'iowaste_http_request_duration_seconds': (
+        'histogram', 'Latência das requisições por view', BUCKETS_LATENCIA
+    ),
+    'iowaste_simulador_tick_duration_seconds': (
+        'histogram', 'Duração de cada execução do simulador IoT', BUCKETS_TAREFAS
+    ),
+    'iowaste_simulador_leituras_por_tick': (
+        'histogram', 'Leituras geradas por execução do simulador IoT', BUCKETS_LEITURAS
+    ),
+    'iowaste_alertas_criados_total': (
+        'counter', 'Alertas criados por tipo', None
+    ),
+    'iowaste_celery_task_duration_seconds': (
+        'histogram', 'Tempo de execução das tarefas Celery', BUCKETS_TAREFAS
+    ),
+    'iowaste_cache_requests_total': (
+        'counter', 'Consultas ao cache por resultado (hit/miss)', None
+    ),
+    'iowaste_db_conexoes_criadas_total': (
+        'counter', 'Conexões físicas abertas com o PostgreSQL por tipo de processo', None
+    ),
+}
+
+
+def _formatar_labels(labels):
+    if not labels:
+        return ''
+    partes = []
+    for chave in sorted(labels):
+        valor = str(labels[chave]).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{chave}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _formatar_le(limite):
+    return '+Inf' if limite == float('inf') else repr(float(limite))
+
+
+class RegistroMetricas:
+    """
+    Acumula séries no processo e, no backend Redis, envia os incrementos em lote
+    a cada MONITORAMENTO_METRICAS_INTERVALO segundos (nenhuma escrita no banco)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._valores = defaultdict(float)
+        self._pendentes = defaultdict(float)
+        self._ultimo_envio = time.monotonic()
+
+    @property
+    def usa_redis(self):
+        return getattr(settings, 'MONITORAMENTO_METRICAS_BACKEND', 'memoria') == 'redis'
+
+    def cliente_redis(self):
+        return cliente_redis(settings.MONITORAMENTO_METRICAS_REDIS_URL)
+
+    def _somar(self, serie, valor):
+        if self.usa_redis:
+            self._pendentes[serie] += valor
+        else:
+            self._valores[serie] += valor
+
+    def incrementar(self, nome, valor=1, **labels):
+        with self._lock:
+            self._somar(f'{nome}{_formatar_labels(labels)}', valor)
+        self._talvez_enviar()
+
+    def observar(self, nome, valor, **labels):
+        buckets = METRICAS[nome][2]
+        with self._lock:
+            for limite in buckets + (float('inf'),):
+                if valor <= limite:
+                    serie = f'{nome}_bucket{_formatar_labels({**labels, "le": _formatar_le(limite)})}'
+                    self._somar(serie, 1)
+            self._somar(f'{nome}_sum{_formatar_labels(labels)}', valor)
+            self._somar(f'{nome}_count{_formatar_labels(labels)}', 1)
+        self._talvez_enviar()
+
+    def _talvez_enviar(self):
+        if not self.usa_redis:
+            return
+        intervalo = getattr(settings, 'MONITORAMENTO_METRICAS_INTERVALO', 10)
+        if time.monotonic() - self._ultimo_envio >= intervalo:
+            self.enviar()
+
+    def enviar(self):
+        """Envia os incrementos pendentes para o Redis em um único pipeline"""
+        with self._lock:
+            if not self._pendentes:
+                self._ultimo_envio = time.monotonic()
+                return
+            pendentes = self._pendentes
+            self._pendentes = defaultdict(float)
+            self._ultimo_envio = time.monotonic()
+
+        try:
+            pipe = self.cliente_redis().pipeline(transaction=False)
+            for serie, valor in pendentes.items():
+                pipe.hincrbyfloat(CHAVE_REDIS, serie, valor)
+            pipe.execute()
+        except Exception as e:
+            # Redis indisponível: devolve os incrementos para o próximo envio
+            logger.warning(f'Falha ao enviar métricas para o Redis: {e}')
+            with self._lock:
+                for serie, valor in pendentes.items():
+                    self._pendentes[serie] += valor
+
+    def valores(self):
+        """Valores agregados de todas as séries"""
+        if not self.usa_redis:
+            with self._lock:
+                return dict(self._valores)
+
+        self.enviar()
+        try:
+            brutos = self.cliente_redis().hgetall(CHAVE_REDIS)
+        except Exception as e:
+            logger.warning(f'Falha ao ler métricas do Redis: {e}')
+            return {}
+        return {serie.decode(): float(valor) for serie, valor in brutos.items()}
+
+
+registro = RegistroMetricas()
+atexit.register(registro.enviar)
+
+
+def incrementar(nome, valor=1, **labels):
+    """Incrementa um contador"""
+    registro.incrementar(nome, valor, **labels)
+
+
+def observar(nome, valor, **labels):
+    """Registra uma observação em um histograma"""
+    registro.observar(nome, valor, **labels)
+
+
+def registrar_cache(cache, acerto):
+    """Registra um hit/miss de cache para o cálculo da taxa de acerto"""
+    registro.incrementar('iowaste_cache_requests_total', cache=cache, resultado='hit' if acerto else 'miss')
+
+
+def _nome_base(serie):
+    nome = serie.split('{', 1)[0]
+    for sufixo in ('_bucket', '_sum', '_count'):
+        if nome.endswith(sufixo) and nome[:-len(sufixo)] in METRICAS:
+            return nome[:-len(sufixo)]
+    return nome
+
+
+def _metricas_banco():
+    """Conexões abertas no PostgreSQL (consultado apenas no scrape)"""
+    from django.db import connection
+
+    linhas = []
+    if connection.vendor != 'postgresql':
+        return linhas
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(NULLIF(application_name, ''), 'desconhecida'), "
+            "COALESCE(state, 'desconhecido'), count(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() GROUP BY 1, 2"
+        )
+        por_estado = cursor.fetchall()
+        cursor.execute("SHOW max_connections")
+        maximo = cursor.fetchone()[0]
+
+    linhas.append('# HELP iowaste_db_conexoes Conexões abertas no PostgreSQL por aplicação e estado')
+    linhas.append('# TYPE iowaste_db_conexoes gauge')
+    for aplicacao, estado, total in por_estado:
+        labels = _formatar_labels({'aplicacao': aplicacao, 'estado': estado})
+        linhas.append(f'iowaste_db_conexoes{labels} {total}')
+    linhas.append('# HELP iowaste_db_conexoes_max Limite de conexões do PostgreSQL')
+    linhas.append('# TYPE iowaste_db_conexoes_max gauge')
+    linhas.append(f'iowaste_db_conexoes_max {maximo}')
+    return linhas
+
+
+def _taxa_acerto_cache(valores):
+    totais = defaultdict(lambda: {'hit': 0.0, 'miss': 0.0})
+    prefixo = 'iowaste_cache_requests_total{'
+    for serie, valor in valores.items():
+        if not serie.startswith(prefixo):
+            continue
+        labels = dict(
+            parte.split('=', 1) for parte in serie[len(prefixo):-1].split(',')
+        )
+        cache = labels['cache'].strip('"')
+        totais[cache][labels['resultado'].strip('"')] += valor
+
+    linhas = []
+    if totais:
+        linhas.append('# HELP iowaste_cache_hit_ratio Taxa de acerto acumulada por cache')
+        linhas.append('# TYPE iowaste_cache_hit_ratio gauge')
+        for cache, total in sorted(totais.items()):
+            consultas = total['hit'] + total['miss']
+            taxa = total['hit'] / consultas if consultas else 0
+            linhas.append(f'iowaste_cache_hit_ratio{_formatar_labels({"cache": cache})} {round(taxa, 4)}')
+    return linhas
+
+
+def exportar():
+    """Renderiza todas as métricas no formato texto do Prometheus"""
+
+    valores = registro.valores()
+    por_metrica = defaultdict(list)
+    for serie, valor in valores.items():
+        por_metrica[_nome_base(serie)].append((serie, valor))
+
+    linhas = []
+    for nome, (tipo, descricao, _) in METRICAS.items():
+        series = por_metrica.get(nome)
+        if not series:
+            continue
+        linhas.append(f'# HELP {nome} {descricao}')
+        linhas.append(f'# TYPE {nome} {tipo}')
+        for serie, valor in sorted(series):
+            linhas.append(f'{serie} {int(valor) if valor.is_integer() else repr(valor)}')
+
+    linhas.extend(_taxa_acerto_cache(valores))
+
+    try:
+        linhas.extend(_metricas_banco())
+    except Exception as e:
+        logger.warning(f'Falha ao coletar métricas do banco: {e}')
+
+    return '\n'.join(linhas) + '\n'
@@ -0,0 +1,165 @@
+"""
+Middleware de instrumentação de desempenho
+Expõe queries, tempo de SQL, serialização e view no header Server-Timing
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .instrumentacao import Medicao, medicao_atual, nome_view
+from .metricas import observar
+from .profiler import PerfilRequisicao
+
+
+logger = logging.getLogger('iowaste.desempenho')
+
+
+class DesempenhoMiddleware:
+    """Coleta métricas por requisição para uma fração amostrada do tráfego"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'MONITORAMENTO_ATIVO', False):
+            # Removido da cadeia de middlewares: custo zero quando desativado
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.amostragem = getattr(settings, 'MONITORAMENTO_AMOSTRAGEM', 1.0)
+        self.limite_lento = getattr(settings, 'MONITORAMENTO_LIMITE_LENTO_MS', 500) / 1000
+
+    def __call__(self, request):
+        if self.amostragem < 1.0 and random.random() >= self.amostragem:
+            return self.get_response(request)
+
+        medicao = Medicao()
+        token = medicao_atual.set(medicao)
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(medicao.registrar_sql))
+                response = self.get_response(request)
+        finally:
+            medicao_atual.reset(token)
+
+        total = time.perf_counter() - medicao.inicio
+        dados = medicao.como_dict(total)
+        request.desempenho = dados
+
+        response['Server-Timing'] = self.formatar_server_timing(dados)
+
+        if total >= self.limite_lento:
+            logger.warning(json.dumps({
+                'evento': 'requisicao_lenta',
+                'metodo': request.method,
+                'caminho': request.path,
+                'status': response.status_code,
+                **dados,
+            }))
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        medicao = medicao_atual.get()
+        if medicao is not None:
+            medicao.view = nome_view(view_func)
+            medicao.inicio_view = time.perf_counter()
+        return None
+
+    def process_template_response(self, request, response):
+        # Respostas do DRF são renderizadas depois da view: marca o fim da view aqui
+        medicao = medicao_atual.get()
+        if medicao is not None and medicao.fim_view is None:
+            medicao.fim_view = time.perf_counter()
+        return response
+
+    def formatar_server_timing(self, dados):
+        metricas = [
+            f'db;dur={dados["sql_ms"]};desc="{dados["queries"]} queries"',
+            f'serializer;dur={dados["serializer_ms"]}',
+        ]
+        if dados['view_ms'] is not None:
+            metricas.append(f'view;dur={dados["view_ms"]}')
+        metricas.append(f'total;dur={dados["total_ms"]}')
+        return ', '.join(metricas)
+
+
+class MetricasMiddleware:
+    """Registra o histograma de latência por view para o endpoint de métricas"""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'MONITORAMENTO_METRICAS_ATIVO', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inicio = time.perf_counter()
+        response = self.get_response(request)
+        view = getattr(request, '_metricas_view', None)
+
+        # Requisições sem view resolvida (404 de roteamento, estáticos) não geram séries
+        if view is not None:
+            observar(
+                'iowaste_http_request_duration_seconds',
+                time.perf_counter() - inicio,
+                view=view,
+                metodo=request.method,
+                status=response.status_code,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._metricas_view = nome_view(view_func)
+        return None
+
+
+class ProfilerMiddleware:
+    """
+    Perfila a requisição quando o header X-Profile é enviado por um administrador
+    O id do perfil gravado é devolvido no header X-Profile-Id
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'MONITORAMENTO_PROFILER_ATIVO', False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if 'HTTP_X_PROFILE' not in request.META:
+            return self.get_response(request)
+
+        usuario = self.usuario_admin(request)
+        if usuario is None:
+            return self.get_response(request)
+
+        request._profiler_usuario = usuario.email
+        perfil = PerfilRequisicao()
+        response = perfil.executar(self.get_response, request)
+
+        try:
+            perfil.salvar(request, response)
+            response['X-Profile-Id'] = perfil.id
+        except Exception as e:
+            logger.warning(f'Falha ao gravar perfil da requisição {request.path}: {e}')
+
+        return response
+
+    def usuario_admin(self, request):
+        """Autentica via sessão ou JWT e retorna o usuário apenas se for administrador"""
+        usuario = getattr(request, 'user', None)
+
+        if usuario is None or not usuario.is_authenticated:
+            from rest_framework_simplejwt.authentication import JWTAuthentication
+            try:
+                resultado = JWTAuthentication().authenticate(request)
+            except Exception:
+                return None
+            usuario = resultado[0] if resultado else None
+
+        if usuario is not None and usuario.is_authenticated and getattr(usuario, 'is_admin', False):
+            return usuario
+        return None
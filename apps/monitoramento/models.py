@@ -0,0 +1 @@
+# Este app não possui models próprios, apenas ferramentas de medição de desempenho
@@ -0,0 +1,175 @@
+"""
+Profiler sob demanda
+Executa a requisição sob cProfile, captura cada SQL com seu plano (EXPLAIN ANALYZE)
+e grava o resultado em disco para download pelos administradores
+"""
+import cProfile
+import io
+import json
+import pstats
+import re
+import shutil
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+
+ID_VALIDO = re.compile(r'^[0-9a-f]{32}$')
+
+
+def diretorio_perfis():
+    diretorio = Path(settings.MONITORAMENTO_PROFILER_DIR)
+    diretorio.mkdir(parents=True, exist_ok=True)
+    return diretorio
+
+
+class PerfilRequisicao:
+    """Coleta o profile Python e as queries de uma requisição"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.profile = cProfile.Profile()
+        self.queries = []
+        self.inicio = None
+        self.duracao = None
+
+    def _capturar(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            inicio = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.queries.append({
+                    'banco': alias,
+                    'sql': sql,
+                    'params': params if not many else None,
+                    'many': many,
+                    'duracao_ms': round((time.perf_counter() - inicio) * 1000, 3),
+                })
+        return wrapper
+
+    def executar(self, funcao, *args):
+        """Executa a função sob cProfile capturando o SQL emitido"""
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self._capturar(alias)))
+
+            self.inicio = time.perf_counter()
+            self.profile.enable()
+            try:
+                return funcao(*args)
+            finally:
+                self.profile.disable()
+                self.duracao = time.perf_counter() - self.inicio
+
+    def explicar_queries(self):
+        """Reexecuta os SELECTs capturados com EXPLAIN ANALYZE (apenas PostgreSQL)"""
+        limite = getattr(settings, 'MONITORAMENTO_PROFILER_MAX_EXPLAIN', 50)
+        planos = {}
+
+        for query in self.queries:
+            query['plano'] = None
+            sql = query['sql']
+            if query['many'] or not sql.lstrip().upper().startswith('SELECT'):
+                continue
+
+            conexao = connections[query['banco']]
+            if conexao.vendor != 'postgresql':
+                continue
+
+            chave = (query['banco'], sql, repr(query['params']))
+            if chave not in planos:
+                if len(planos) >= limite:
+                    continue
+                try:
+                    # Savepoint: um EXPLAIN com erro não invalida a transação corrente
+                    with transaction.atomic(using=query['banco']):
+                        with conexao.cursor() as cursor:
+                            cursor.execute(
+                                f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}',
+                                query['params']
+                            )
+                            planos[chave] = cursor.fetchone()[0]
+                except Exception as e:
+                    planos[chave] = {'erro': str(e)}
+            query['plano'] = planos[chave]
+
+    def resumo_profile(self, limite=60):
+        saida = io.StringIO()
+        estatisticas = pstats.Stats(self.profile, stream=saida)
+        estatisticas.sort_stats('cumulative').print_stats(limite)
+        return saida.getvalue()
+
+    def salvar(self, request, response):
+        """Grava o profile (.prof), o SQL com planos e o resumo em disco"""
+        self.explicar_queries()
+
+        destino = diretorio_perfis() / self.id
+        destino.mkdir()
+        self.profile.dump_stats(destino / 'profile.prof')
+
+        dados = {
+            'id': self.id,
+            'data': timezone.now().isoformat(),
+            'metodo': request.method,
+            'caminho': request.get_full_path(),
+            'status': response.status_code,
+            'usuario': getattr(request, '_profiler_usuario', None),
+            'duracao_ms': round(self.duracao * 1000, 3),
+            'total_queries': len(self.queries),
+            'tempo_sql_ms': round(sum(q['duracao_ms'] for q in self.queries), 3),
+            'queries': self.queries,
+            'profile': self.resumo_profile(),
+        }
+        with open(destino / 'perfil.json', 'w') as arquivo:
+            json.dump(dados, arquivo, indent=2, default=str)
+
+        remover_perfis_antigos()
+        return dados
+
+
+def remover_perfis_antigos():
+    maximo = getattr(settings, 'MONITORAMENTO_PROFILER_MAX', 50)
+    perfis = sorted(
+        (p for p in diretorio_perfis().iterdir() if p.is_dir()),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True
+    )
+    for antigo in perfis[maximo:]:
+        shutil.rmtree(antigo, ignore_errors=True)
+
+
+def caminho_perfil(perfil_id):
+    if not ID_VALIDO.match(perfil_id):
+        return None
+    caminho = diretorio_perfis() / perfil_id
+    return caminho if caminho.is_dir() else None
+
+
+def listar_perfis():
+    perfis = []
+    for caminho in diretorio_perfis().iterdir():
+        arquivo = caminho / 'perfil.json'
+        if not arquivo.exists():
+            continue
+        with open(arquivo) as f:
+            dados = json.load(f)
+        perfis.append({
+            chave: dados[chave]
+            for chave in ('id', 'data', 'metodo', 'caminho', 'status',
+                          'usuario', 'duracao_ms', 'total_queries', 'tempo_sql_ms')
+        })
+    return sorted(perfis, key=lambda p: p['data'], reverse=True)
+
+
+def carregar_perfil(perfil_id):
+    caminho = caminho_perfil(perfil_id)
+    if caminho is None:
+        return None
+    with open(caminho / 'perfil.json') as arquivo:
+        return json.load(arquivo)
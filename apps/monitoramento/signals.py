@@ -0,0 +1,54 @@
+"""
+Receivers que alimentam as métricas de alertas, tarefas Celery e conexões
+"""
+import time
+
+from celery.signals import task_prerun, task_postrun
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save
+
+from .metricas import incrementar, observar
+
+
+_inicio_tarefas = {}
+
+
+def alerta_criado(sender, instance, created, **kwargs):
+    if created:
+        incrementar('iowaste_alertas_criados_total', tipo=instance.tipo)
+
+
+def tarefa_iniciada(sender=None, task_id=None, **kwargs):
+    _inicio_tarefas[task_id] = time.perf_counter()
+
+
+def tarefa_finalizada(sender=None, task_id=None, task=None, state=None, **kwargs):
+    inicio = _inicio_tarefas.pop(task_id, None)
+    if inicio is None:
+        return
+    entrega = getattr(task.request, 'delivery_info', None) if task is not None else None
+    observar(
+        'iowaste_celery_task_duration_seconds',
+        time.perf_counter() - inicio,
+        task=task.name if task is not None else 'desconhecida',
+        fila=(entrega or {}).get('routing_key') or 'desconhecida',
+        estado=state or 'desconhecido',
+    )
+
+
+def conexao_criada(sender, connection, **kwargs):
+    incrementar(
+        'iowaste_db_conexoes_criadas_total',
+        processo=getattr(settings, 'PROCESSO', 'web'),
+        banco=connection.alias,
+    )
+
+
+def conectar():
+    from apps.alertas.models import Alerta
+
+    post_save.connect(alerta_criado, sender=Alerta, dispatch_uid='metricas_alerta_criado')
+    task_prerun.connect(tarefa_iniciada, dispatch_uid='metricas_tarefa_iniciada')
+    task_postrun.connect(tarefa_finalizada, dispatch_uid='metricas_tarefa_finalizada')
+    connection_created.connect(conexao_criada, dispatch_uid='metricas_conexao_criada')
@@ -0,0 +1,18 @@
+"""
+Tarefas usadas pelo benchmark de filas (benchmark_filas)
+"""
+import time
+
+from celery import shared_task
+
+
+@shared_task
+def sonda_fila(enviado_em):
+    """Retorna quantos segundos a tarefa esperou na fila até começar a executar"""
+    return time.time() - enviado_em
+
+
+@shared_task(ignore_result=True)
+def carga_manutencao(segundos):
+    """Ocupa um processo do worker como uma limpeza/exportação longa"""
+    time.sleep(segundos)
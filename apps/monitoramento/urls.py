@@ -0,0 +1,9 @@
+from django.urls import path
+from .views import metricas, perfis_lista, perfil_detalhe, perfil_download
+
+urlpatterns = [
+    path('metricas/', metricas, name='metricas'),
+    path('perfis/', perfis_lista, name='perfis-lista'),
+    path('perfis/<str:perfil_id>/', perfil_detalhe, name='perfil-detalhe'),
+    path('perfis/<str:perfil_id>/download/', perfil_download, name='perfil-download'),
+]
@@ -0,0 +1,70 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, FileResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework import permissions, status
+from apps.authentication.permissions import IsAdmin
+from .metricas import exportar
+from .profiler import listar_perfis, carregar_perfil, caminho_perfil
+
+
+def metricas(request):
+    """Endpoint de métricas no formato texto do Prometheus"""
+
+    # Sem token configurado o endpoint não é exposto (nunca aberto a clientes anônimos)
+    token = getattr(settings, 'MONITORAMENTO_METRICAS_TOKEN', '')
+    if not getattr(settings, 'MONITORAMENTO_METRICAS_ATIVO', False) or not token:
+        return HttpResponse(status=404)
+
+    autorizacao = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(autorizacao.encode(), f'Bearer {token}'.encode()):
+        return HttpResponse(status=401)
+
+    return HttpResponse(
+        exportar(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdmin])
+def perfis_lista(request):
+    """Lista os perfis de requisição gravados"""
+    
+    return Response(listar_perfis())
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdmin])
+def perfil_detalhe(request, perfil_id):
+    """Resumo do cProfile e SQL com planos de execução de um perfil"""
+    
+    perfil = carregar_perfil(perfil_id)
+    if perfil is None:
+        return Response(
+            {'error': 'Perfil não encontrado'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    return Response(perfil)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdmin])
+def perfil_download(request, perfil_id):
+    """Download do arquivo .prof (pstats/snakeviz)"""
+    
+    caminho = caminho_perfil(perfil_id)
+    if caminho is None:
+        return Response(
+            {'error': 'Perfil não encontrado'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    return FileResponse(
+        open(caminho / 'profile.prof', 'rb'),
+        as_attachment=True,
+        filename=f'perfil-{perfil_id}.prof'
+    )
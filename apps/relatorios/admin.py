@@ -1 +1,16 @@
-# Relatórios não precisam de admin
+from django.contrib import admin
+from .models import ExportacaoRelatorio
+
+
+@admin.register(ExportacaoRelatorio)
+class ExportacaoRelatorioAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'formato', 'data_inicial', 'data_final', 'empresa',
+        'status', 'progresso', 'total_linhas', 'solicitado_por', 'created_at'
+    ]
+    list_filter = ['formato', 'status', 'created_at']
+    readonly_fields = [
+        'chave', 'versao_dados', 'progresso', 'total_linhas', 'arquivo', 'origem',
+        'erro', 'created_at', 'concluida_em'
+    ]
+    ordering = ['-created_at']
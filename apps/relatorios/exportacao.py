@@ -0,0 +1,351 @@
+"""
+Exportação das coletas em CSV, Excel (xlsx) e PDF
+As coletas são lidas em lotes (values_list + iterator) e escritas linha a linha,
+para que exportações de vários anos rodem com memória limitada.
+Exportações grandes são geradas por um worker (ExportacaoRelatorio) e reaproveitadas
+enquanto período, formato, empresa e versão dos dados forem os mesmos.
+"""
+import csv
+import hashlib
+import io
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.http import StreamingHttpResponse, FileResponse
+from django.utils import timezone
+
+from apps.bombonas.models import Bombona
+from apps.coletas.models import Coleta
+from .periodos import filtro_periodo
+
+
+COLUNAS = ['Data', 'Bombona', 'Empresa', 'Tipo de Resíduo', 'Peso Coletado (kg)', 'Responsável']
+
+FORMATOS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'excel': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'pdf': ('application/pdf', 'pdf'),
+}
+
+TAMANHO_LOTE = 2000
+
+TIPOS_RESIDUO = dict(Bombona.TIPO_RESIDUO_CHOICES)
+
+
+def coletas_do_periodo(inicio, fim, empresa_id=None):
+    coletas = Coleta.objects.filter(
+        filtro_periodo('data_coleta', inicio, fim),
+        status='concluida'
+    )
+    if empresa_id:
+        coletas = coletas.filter(bombona__empresa_id=empresa_id)
+    return coletas.order_by('-data_coleta')
+
+
+def linhas_coletas(inicio, fim, empresa_id=None, progresso=None):
+    """
+    Gera (data, bombona, empresa, tipo, peso, responsável) sem instanciar modelos
+    `progresso(linhas)` é chamado a cada lote lido
+    """
+    colunas = (
+        'data_coleta', 'bombona__identificacao', 'bombona__empresa__nome',
+        'bombona__tipo_residuo', 'peso_coletado', 'operador__first_name', 'operador__last_name',
+    )
+    # Com server-side cursors (PostgreSQL) cada lote é buscado sob demanda
+    consulta = coletas_do_periodo(inicio, fim, empresa_id).values_list(*colunas).iterator(
+        chunk_size=TAMANHO_LOTE
+    )
+    for indice, (data, bombona, empresa, tipo, peso, nome, sobrenome) in enumerate(consulta, 1):
+        if progresso is not None and indice % TAMANHO_LOTE == 0:
+            progresso(indice)
+        yield (
+            timezone.localtime(data).strftime('%d/%m/%Y %H:%M'),
+            bombona,
+            empresa,
+            TIPOS_RESIDUO.get(tipo, tipo),
+            peso,
+            f'{nome or ""} {sobrenome or ""}'.strip(),
+        )
+
+
+def _ultimo_instante(fim):
+    # O intervalo é semiaberto: o último dia incluído termina antes de `fim`
+    return timezone.localtime(fim - timedelta(microseconds=1))
+
+
+def nome_arquivo(inicio, fim, formato):
+    inicio = timezone.localtime(inicio).strftime('%Y%m%d')
+    fim = _ultimo_instante(fim).strftime('%Y%m%d')
+    return f'coletas_{inicio}_{fim}.{FORMATOS[formato][1]}'
+
+
+class _Eco:
+    """Buffer que devolve o que recebe (csv.writer escrevendo direto na resposta)"""
+
+    def write(self, valor):
+        return valor
+
+
+def gerar_csv(inicio, fim, empresa_id=None, progresso=None):
+    escritor = csv.writer(_Eco())
+    # BOM para o Excel reconhecer o UTF-8
+    yield '\ufeff' + escritor.writerow(COLUNAS)
+    for linha in linhas_coletas(inicio, fim, empresa_id, progresso):
+        yield escritor.writerow(linha)
+
+
+def escrever_csv(inicio, fim, arquivo, empresa_id=None, progresso=None):
+    texto = io.TextIOWrapper(arquivo, encoding='utf-8', newline='')
+    for trecho in gerar_csv(inicio, fim, empresa_id, progresso):
+        texto.write(trecho)
+    texto.flush()
+    texto.detach()
+
+
+def escrever_excel(inicio, fim, arquivo, empresa_id=None, progresso=None):
+    """Workbook write-only: as linhas vão para disco conforme são adicionadas"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    planilha = workbook.create_sheet('Coletas')
+    planilha.column_dimensions['A'].width = 18
+    planilha.column_dimensions['B'].width = 18
+    planilha.column_dimensions['C'].width = 40
+    planilha.column_dimensions['D'].width = 36
+    planilha.column_dimensions['E'].width = 20
+    planilha.column_dimensions['F'].width = 28
+
+    cabecalho = []
+    for coluna in COLUNAS:
+        celula = WriteOnlyCell(planilha, value=coluna)
+        celula.font = Font(bold=True)
+        cabecalho.append(celula)
+    planilha.append(cabecalho)
+
+    for linha in linhas_coletas(inicio, fim, empresa_id, progresso):
+        planilha.append(linha)
+
+    workbook.save(arquivo)
+
+
+def escrever_pdf(inicio, fim, arquivo, empresa_id=None, progresso=None):
+    """
+    PDF desenhado página a página no canvas (sem montar uma tabela em memória)
+    Limitado a RELATORIOS_EXPORTACAO_PDF_MAX_LINHAS; volumes maiores devem usar CSV/Excel
+    """
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.units import cm
+    from reportlab.pdfgen import canvas
+
+    maximo = getattr(settings, 'RELATORIOS_EXPORTACAO_PDF_MAX_LINHAS', 50000)
+    largura, altura = landscape(A4)
+    margem = 1.5 * cm
+    altura_linha = 0.55 * cm
+    posicoes = [margem, margem + 3.2 * cm, margem + 6.4 * cm, margem + 14 * cm, margem + 20.5 * cm, margem + 23.5 * cm]
+
+    pdf = canvas.Canvas(arquivo, pagesize=(largura, altura), pageCompression=1)
+    pdf.setTitle('Relatório de Coletas')
+    periodo = (
+        f'{timezone.localtime(inicio).strftime("%d/%m/%Y")} a '
+        f'{_ultimo_instante(fim).strftime("%d/%m/%Y")}'
+    )
+    pagina = 0
+
+    def nova_pagina():
+        nonlocal pagina
+        pagina += 1
+        pdf.setFont('Helvetica-Bold', 13)
+        pdf.drawString(margem, altura - margem, f'Relatório de Coletas - {periodo}')
+        pdf.setFont('Helvetica', 8)
+        pdf.drawRightString(largura - margem, margem / 2, f'Página {pagina}')
+        pdf.setFont('Helvetica-Bold', 9)
+        y = altura - margem - 1 * cm
+        for x, coluna in zip(posicoes, COLUNAS):
+            pdf.drawString(x, y, coluna)
+        pdf.setFont('Helvetica', 8)
+        return y - altura_linha
+
+    y = nova_pagina()
+    total_linhas = 0
+    total_peso = 0
+    truncado = False
+    for linha in linhas_coletas(inicio, fim, empresa_id, progresso):
+        if total_linhas >= maximo:
+            truncado = True
+            break
+        if y < margem:
+            pdf.showPage()
+            y = nova_pagina()
+        for x, valor in zip(posicoes, linha):
+            pdf.drawString(x, y, str(valor)[:60])
+        total_linhas += 1
+        total_peso += linha[4]
+        y -= altura_linha
+
+    if y < margem + altura_linha:
+        pdf.showPage()
+        y = nova_pagina()
+    pdf.setFont('Helvetica-Bold', 9)
+    resumo = f'Total: {total_linhas} coletas, {total_peso} kg'
+    if truncado:
+        resumo += f' (limitado às {maximo} mais recentes; use CSV ou Excel para o período completo)'
+    pdf.drawString(margem, y - altura_linha, resumo)
+    pdf.save()
+
+
+ESCRITORES = {
+    'csv': escrever_csv,
+    'excel': escrever_excel,
+    'pdf': escrever_pdf,
+}
+
+
+def resposta_exportacao(inicio, fim, formato):
+    """Resposta com o arquivo de exportação das coletas do período"""
+    tipo_conteudo, _ = FORMATOS[formato]
+    nome = nome_arquivo(inicio, fim, formato)
+
+    if formato == 'csv':
+        # Os bytes começam a ser enviados antes de todas as coletas serem lidas
+        resposta = StreamingHttpResponse(gerar_csv(inicio, fim), content_type=tipo_conteudo)
+        resposta['Content-Disposition'] = f'attachment; filename="{nome}"'
+        return resposta
+
+    # xlsx e PDF só ficam válidos ao final: são gerados em arquivo temporário e enviados em blocos
+    arquivo = tempfile.TemporaryFile()
+    ESCRITORES[formato](inicio, fim, arquivo)
+    arquivo.seek(0)
+    return FileResponse(arquivo, as_attachment=True, filename=nome, content_type=tipo_conteudo)
+
+
+def versao_dados(inicio, fim, empresa_id=None):
+    """
+    Muda sempre que uma coleta do período é criada, alterada ou removida, ou quando
+    muda um dado exportado de outra tabela (bombona, tipo, empresa ou responsável)
+    """
+    coletas = coletas_do_periodo(inicio, fim, empresa_id).order_by()
+    resumo = coletas.aggregate(
+        total=Count('id'), alteracao=Max('updated_at'), operadores=Max('operador__updated_at')
+    )
+    alteracao = resumo['alteracao'].isoformat() if resumo['alteracao'] else '-'
+    
+    # updated_at das bombonas muda a cada leitura: o que entra na versão são os
+    # próprios rótulos exportados das bombonas do período
+    rotulos = hashlib.sha256(str(resumo['operadores']).encode())
+    bombonas = Bombona.objects.filter(id__in=coletas.values('bombona_id')).order_by('id').values_list(
+        'id', 'identificacao', 'tipo_residuo', 'empresa__nome'
+    )
+    for linha in bombonas.iterator(chunk_size=TAMANHO_LOTE):
+        rotulos.update(repr(linha).encode())
+    return f"{resumo['total']}:{alteracao}:{rotulos.hexdigest()[:16]}"
+
+
+def chave_exportacao(formato, inicio, fim, empresa_id, versao):
+    partes = f'{formato}|{inicio.isoformat()}|{fim.isoformat()}|{empresa_id or "*"}|{versao}'
+    return hashlib.sha256(partes.encode()).hexdigest()
+
+
+def solicitar_exportacao(usuario, formato, inicio, fim, empresa_id=None):
+    """
+    Reaproveita uma exportação equivalente (pronta ou em andamento) ou cria uma
+    nova e a envia para a fila de relatórios. Retorna (exportacao, criada)
+    A exportação equivalente de outro usuário ganha uma cópia do solicitante, que
+    aponta para o mesmo arquivo (ou para a geração em andamento, via `origem`).
+    """
+    from .models import ExportacaoRelatorio
+    from .tasks import gerar_exportacao
+
+    versao = versao_dados(inicio, fim, empresa_id)
+    chave = chave_exportacao(formato, inicio, fim, empresa_id, versao)
+
+    existentes = ExportacaoRelatorio.objects.filter(
+        chave=chave, status__in=['pendente', 'processando', 'concluida']
+    ).order_by('-created_at')
+    # As do próprio usuário primeiro (a ordenação é estável)
+    for exportacao in sorted(existentes, key=lambda existente: existente.solicitado_por_id != usuario.pk):
+        if exportacao.status != 'concluida' or exportacao.arquivo.storage.exists(exportacao.arquivo.name):
+            if exportacao.solicitado_por_id == usuario.pk:
+                return exportacao, False
+            return _copia_para_usuario(exportacao, usuario), False
+
+    exportacao = ExportacaoRelatorio.objects.create(
+        chave=chave,
+        formato=formato,
+        data_inicial=inicio,
+        data_final=fim,
+        empresa_id=empresa_id,
+        versao_dados=versao,
+        solicitado_por=usuario,
+    )
+    transaction.on_commit(lambda: gerar_exportacao.delay(exportacao.id))
+    return exportacao, True
+
+
+def _copia_para_usuario(fonte, usuario):
+    """Exportação do usuário com o arquivo (ou a geração em andamento) de outra"""
+    from .models import ExportacaoRelatorio
+
+    return ExportacaoRelatorio.objects.create(
+        chave=fonte.chave,
+        formato=fonte.formato,
+        data_inicial=fonte.data_inicial,
+        data_final=fonte.data_final,
+        empresa_id=fonte.empresa_id,
+        versao_dados=fonte.versao_dados,
+        status=fonte.status,
+        progresso=fonte.progresso,
+        total_linhas=fonte.total_linhas,
+        arquivo=fonte.arquivo.name or None,
+        concluida_em=fonte.concluida_em,
+        origem_id=fonte.origem_id or fonte.pk,
+        solicitado_por=usuario,
+    )
+
+
+def exportacao_e_copias(exportacao_id):
+    """A exportação e as cópias que aguardam o arquivo dela"""
+    from .models import ExportacaoRelatorio
+
+    return ExportacaoRelatorio.objects.filter(Q(pk=exportacao_id) | Q(origem_id=exportacao_id))
+
+
+def gerar_arquivo_exportacao(exportacao):
+    """Gera o arquivo da exportação atualizando o progresso a cada lote"""
+    from .models import ExportacaoRelatorio
+
+    inicio, fim, empresa_id = exportacao.data_inicial, exportacao.data_final, exportacao.empresa_id
+    total = coletas_do_periodo(inicio, fim, empresa_id).count()
+    if exportacao.formato == 'pdf':
+        total = min(total, getattr(settings, 'RELATORIOS_EXPORTACAO_PDF_MAX_LINHAS', 50000))
+
+    def progresso(linhas):
+        percentual = min(99, int(linhas * 100 / total)) if total else 99
+        exportacao_e_copias(exportacao.pk).update(progresso=percentual)
+
+    exportacao_e_copias(exportacao.pk).update(status='processando', progresso=0)
+
+    with tempfile.TemporaryFile() as arquivo:
+        ESCRITORES[exportacao.formato](inicio, fim, arquivo, empresa_id, progresso)
+        arquivo.seek(0)
+        exportacao.arquivo.save(nome_arquivo(inicio, fim, exportacao.formato), File(arquivo), save=False)
+
+    exportacao.status = 'concluida'
+    exportacao.progresso = 100
+    exportacao.total_linhas = total
+    exportacao.concluida_em = timezone.now()
+    exportacao.erro = None
+    exportacao.save()
+    ExportacaoRelatorio.objects.filter(origem=exportacao).exclude(status='concluida').update(
+        status='concluida',
+        progresso=100,
+        total_linhas=total,
+        arquivo=exportacao.arquivo.name,
+        concluida_em=exportacao.concluida_em,
+        erro=None,
+    )
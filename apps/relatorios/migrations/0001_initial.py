@@ -0,0 +1,44 @@
+# Generated by Django 4.2.9 on 2026-10-19 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('empresas', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportacaoRelatorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chave', models.CharField(max_length=64, verbose_name='Chave')),
+                ('formato', models.CharField(choices=[('csv', 'CSV'), ('excel', 'Excel'), ('pdf', 'PDF')], max_length=10, verbose_name='Formato')),
+                ('data_inicial', models.DateTimeField(verbose_name='Data Inicial')),
+                ('data_final', models.DateTimeField(verbose_name='Data Final')),
+                ('versao_dados', models.CharField(max_length=100, verbose_name='Versão dos Dados')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluida', 'Concluída'), ('erro', 'Erro')], default='pendente', max_length=20, verbose_name='Status')),
+                ('progresso', models.PositiveSmallIntegerField(default=0, verbose_name='Progresso (%)')),
+                ('total_linhas', models.PositiveIntegerField(blank=True, null=True, verbose_name='Total de Linhas')),
+                ('arquivo', models.FileField(blank=True, null=True, upload_to='exportacoes/', verbose_name='Arquivo')),
+                ('erro', models.TextField(blank=True, null=True, verbose_name='Erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('concluida_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluída em')),
+                ('empresa', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='exportacoes', to='empresas.empresa', verbose_name='Empresa')),
+                ('solicitado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exportacoes', to=settings.AUTH_USER_MODEL, verbose_name='Solicitado por')),
+            ],
+            options={
+                'verbose_name': 'Exportação de Relatório',
+                'verbose_name_plural': 'Exportações de Relatórios',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['chave', 'status'], name='relatorios__chave_82fcb8_idx'), models.Index(fields=['created_at'], name='relatorios__created_bcfaf7_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.9 on 2026-10-19 14:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('relatorios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportacaorelatorio',
+            name='origem',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reaproveitamentos', to='relatorios.exportacaorelatorio', verbose_name='Origem'),
+        ),
+    ]
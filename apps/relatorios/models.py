@@ -1 +1,82 @@
-# Este app não possui models, apenas views para relatórios
+from django.db import models
+from django.conf import settings
+from apps.empresas.models import Empresa
+
+
+class ExportacaoRelatorio(models.Model):
+    """Exportação de coletas gerada em segundo plano por um worker Celery"""
+    
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('processando', 'Processando'),
+        ('concluida', 'Concluída'),
+        ('erro', 'Erro'),
+    ]
+    
+    FORMATO_CHOICES = [
+        ('csv', 'CSV'),
+        ('excel', 'Excel'),
+        ('pdf', 'PDF'),
+    ]
+    
+    # Identifica exportações equivalentes (período, formato, empresa e versão dos dados)
+    chave = models.CharField(max_length=64, verbose_name='Chave')
+    
+    # Parâmetros
+    formato = models.CharField(max_length=10, choices=FORMATO_CHOICES, verbose_name='Formato')
+    data_inicial = models.DateTimeField(verbose_name='Data Inicial')
+    data_final = models.DateTimeField(verbose_name='Data Final')
+    empresa = models.ForeignKey(
+        Empresa,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='exportacoes',
+        verbose_name='Empresa'
+    )
+    versao_dados = models.CharField(max_length=100, verbose_name='Versão dos Dados')
+    
+    # Andamento
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pendente',
+        verbose_name='Status'
+    )
+    progresso = models.PositiveSmallIntegerField(default=0, verbose_name='Progresso (%)')
+    total_linhas = models.PositiveIntegerField(null=True, blank=True, verbose_name='Total de Linhas')
+    arquivo = models.FileField(upload_to='exportacoes/', blank=True, null=True, verbose_name='Arquivo')
+    erro = models.TextField(blank=True, null=True, verbose_name='Erro')
+    
+    # Reaproveitamento: exportação equivalente de outro usuário que gera o arquivo desta
+    origem = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reaproveitamentos',
+        verbose_name='Origem'
+    )
+    
+    # Controle
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='exportacoes',
+        verbose_name='Solicitado por'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    concluida_em = models.DateTimeField(null=True, blank=True, verbose_name='Concluída em')
+    
+    class Meta:
+        verbose_name = 'Exportação de Relatório'
+        verbose_name_plural = 'Exportações de Relatórios'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['chave', 'status']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Exportação {self.id} - {self.get_formato_display()} ({self.get_status_display()})"
@@ -0,0 +1,117 @@
+"""
+Períodos dos relatórios
+Converte mês/ano/dias em intervalos semiabertos [inicio, fim) no fuso configurado,
+para que os filtros usem os índices de data (range scan) ao invés de EXTRACT(...)
+"""
+from datetime import date, datetime, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+
+def _inicio_do_mes(ano, mes):
+    return datetime(ano, mes, 1, tzinfo=timezone.get_current_timezone())
+
+
+def _somar_meses(ano, mes, meses):
+    total = ano * 12 + (mes - 1) + meses
+    return total // 12, total % 12 + 1
+
+
+def intervalo_mes(ano, mes):
+    """Intervalo [primeiro dia do mês, primeiro dia do mês seguinte)"""
+    proximo_ano, proximo_mes = _somar_meses(ano, mes, 1)
+    return _inicio_do_mes(ano, mes), _inicio_do_mes(proximo_ano, proximo_mes)
+
+
+def intervalo_mes_atual():
+    agora = timezone.localtime()
+    return intervalo_mes(agora.year, agora.month)
+
+
+def intervalo_ultimos_meses(meses):
+    """Do início do mês de (meses - 1) meses atrás até o início do próximo mês"""
+    agora = timezone.localtime()
+    ano_inicial, mes_inicial = _somar_meses(agora.year, agora.month, -(meses - 1))
+    _, fim = intervalo_mes(agora.year, agora.month)
+    return _inicio_do_mes(ano_inicial, mes_inicial), fim
+
+
+def intervalo_ultimos_dias(dias):
+    """Últimos N dias até agora"""
+    agora = timezone.now()
+    return agora - timedelta(days=dias), agora
+
+
+def intervalo_dia(data):
+    """Intervalo [00:00 do dia, 00:00 do dia seguinte) no fuso configurado"""
+    inicio = datetime(data.year, data.month, data.day, tzinfo=timezone.get_current_timezone())
+    return inicio, inicio + timedelta(days=1)
+
+
+def filtro_periodo(campo, inicio, fim=None):
+    """Q com o intervalo semiaberto aplicado ao campo de data"""
+    filtro = Q(**{f'{campo}__gte': inicio})
+    if fim is not None:
+        filtro &= Q(**{f'{campo}__lt': fim})
+    return filtro
+
+
+def _parametro_data(params, nome):
+    valor = params.get(nome)
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(str(valor))
+    except ValueError:
+        raise ValidationError({nome: 'Informe a data no formato AAAA-MM-DD.'})
+
+
+def _parametro_inteiro(params, nome, padrao, minimo=None, maximo=None):
+    valor = params.get(nome, padrao)
+    try:
+        valor = int(valor)
+    except (TypeError, ValueError):
+        raise ValidationError({nome: 'Informe um número inteiro.'})
+    if (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo):
+        raise ValidationError({nome: f'Valor fora do intervalo permitido ({minimo}-{maximo}).'})
+    return valor
+
+
+def mes_da_requisicao(request):
+    """Lê ano/mes dos parâmetros (padrão: mês atual) e retorna (ano, mes, inicio, fim)"""
+    agora = timezone.localtime()
+    ano = _parametro_inteiro(request.query_params, 'ano', agora.year, 1900, 9999)
+    mes = _parametro_inteiro(request.query_params, 'mes', agora.month, 1, 12)
+    inicio, fim = intervalo_mes(ano, mes)
+    return ano, mes, inicio, fim
+
+
+def inteiro_da_requisicao(request, nome, padrao, minimo=1, maximo=None):
+    """Lê um parâmetro inteiro (ex.: meses, periodo em dias) validando o intervalo"""
+    return _parametro_inteiro(request.query_params, nome, padrao, minimo, maximo)
+
+
+def dias_da_requisicao(params, padrao=30):
+    """
+    Intervalo em dias inteiros: data_inicial/data_final (AAAA-MM-DD, inclusivas)
+    ou os últimos `periodo` dias até o fim de hoje. Períodos iguais geram o mesmo
+    intervalo ao longo do dia (usado como chave das exportações reaproveitadas)
+    """
+    data_inicial = _parametro_data(params, 'data_inicial')
+    data_final = _parametro_data(params, 'data_final')
+
+    if data_inicial or data_final:
+        if not (data_inicial and data_final):
+            raise ValidationError({'data_final': 'Informe data_inicial e data_final.'})
+        if data_final < data_inicial:
+            raise ValidationError({'data_final': 'A data final deve ser posterior à inicial.'})
+    else:
+        periodo = _parametro_inteiro(params, 'periodo', padrao, 1, 3660)
+        data_final = timezone.localdate()
+        data_inicial = data_final - timedelta(days=periodo)
+
+    inicio, _ = intervalo_dia(data_inicial)
+    _, fim = intervalo_dia(data_final)
+    return inicio, fim
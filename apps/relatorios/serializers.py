@@ -0,0 +1,28 @@
+from rest_framework import serializers
+from django.urls import reverse
+from .models import ExportacaoRelatorio
+
+
+class ExportacaoRelatorioSerializer(serializers.ModelSerializer):
+    """Serializer para acompanhamento das exportações"""
+    
+    formato_display = serializers.CharField(source='get_formato_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    empresa_nome = serializers.CharField(source='empresa.nome', read_only=True, default=None)
+    url_download = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ExportacaoRelatorio
+        fields = [
+            'id', 'formato', 'formato_display', 'data_inicial', 'data_final',
+            'empresa', 'empresa_nome', 'status', 'status_display', 'progresso',
+            'total_linhas', 'url_download', 'erro', 'created_at', 'concluida_em'
+        ]
+        read_only_fields = fields
+    
+    def get_url_download(self, obj):
+        if obj.status != 'concluida':
+            return None
+        url = reverse('relatorio-exportacao-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
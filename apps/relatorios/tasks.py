@@ -0,0 +1,46 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from .exportacao import exportacao_e_copias, gerar_arquivo_exportacao
+from .models import ExportacaoRelatorio
+
+
+logger = logging.getLogger('iowaste.relatorios')
+
+
+@shared_task(ignore_result=True, acks_late=True)
+def gerar_exportacao(exportacao_id):
+    """Gera o arquivo de uma exportação de coletas (fila relatorios)"""
+    try:
+        exportacao = ExportacaoRelatorio.objects.get(pk=exportacao_id)
+    except ExportacaoRelatorio.DoesNotExist:
+        return
+    
+    # Mensagem reentregue (acks_late) de uma exportação já gerada
+    if exportacao.status == 'concluida':
+        return
+    
+    try:
+        gerar_arquivo_exportacao(exportacao)
+    except Exception as e:
+        logger.exception(f'Falha ao gerar a exportação {exportacao_id}')
+        exportacao_e_copias(exportacao_id).update(status='erro', erro=str(e))
+
+
+@shared_task(ignore_result=True)
+def remover_exportacoes_antigas():
+    """Remove exportações (e arquivos) mais antigas que o período de retenção"""
+    limite = timezone.now() - timedelta(days=settings.RELATORIOS_EXPORTACAO_RETENCAO_DIAS)
+    removidas = 0
+    for exportacao in ExportacaoRelatorio.objects.filter(created_at__lt=limite).iterator():
+        # Cópias reaproveitadas compartilham o arquivo: só a última a sair o remove
+        compartilhado = ExportacaoRelatorio.objects.filter(arquivo=exportacao.arquivo.name).exclude(pk=exportacao.pk)
+        if exportacao.arquivo and not compartilhado.exists():
+            exportacao.arquivo.delete(save=False)
+        exportacao.delete()
+        removidas += 1
+    return f'Removidas {removidas} exportações antigas'
@@ -2,7 +2,8 @@ from django.urls import path
 from .views import (
     relatorio_mensal, relatorio_por_tipo_residuo,
     relatorio_por_empresa, relatorio_evolucao_coletas,
-    dashboard_kpis, dashboard_graficos, relatorio_exportacao
+    dashboard_kpis, dashboard_graficos, relatorio_exportacao,
+    exportacoes, exportacao_detalhe, exportacao_download
 )
 
 urlpatterns = [
@@ -13,4 +14,7 @@ urlpatterns = [
     path('dashboard-kpis/', dashboard_kpis, name='dashboard-kpis'),
     path('dashboard-graficos/', dashboard_graficos, name='dashboard-graficos'),
     path('exportacao/', relatorio_exportacao, name='relatorio-exportacao'),
+    path('exportacoes/', exportacoes, name='relatorio-exportacoes'),
+    path('exportacoes/<int:pk>/', exportacao_detalhe, name='relatorio-exportacao-detalhe'),
+    path('exportacoes/<int:pk>/download/', exportacao_download, name='relatorio-exportacao-download'),
 ]
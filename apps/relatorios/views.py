@@ -1,14 +1,27 @@
+import os
+from django.http import FileResponse
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework import permissions
+from rest_framework import permissions, status
 from django.db.models import Sum, Count, Avg, Q
 from django.db.models.functions import TruncMonth, TruncDate
-from datetime import datetime, timedelta
+from django.utils import timezone
+from apps.bombonas import estado
+from core.coalescencia import coalescer
+from core.paralelo import executar_em_paralelo
 from apps.bombonas.models import Bombona
 from apps.coletas.models import Coleta
 from apps.alertas.models import Alerta
 from apps.empresas.models import Empresa
-import calendar
+from .exportacao import (
+    FORMATOS as FORMATOS_EXPORTACAO, linhas_coletas, resposta_exportacao, solicitar_exportacao
+)
+from .models import ExportacaoRelatorio
+from .serializers import ExportacaoRelatorioSerializer
+from .periodos import (
+    filtro_periodo, mes_da_requisicao, inteiro_da_requisicao, dias_da_requisicao,
+    intervalo_mes_atual, intervalo_ultimos_meses, intervalo_ultimos_dias
+)
 
 
 @api_view(['GET'])
@@ -17,13 +30,11 @@ def relatorio_mensal(request):
     """Relatório mensal de resíduos"""
     
     # Obter mês e ano dos parâmetros ou usar mês atual
-    ano = int(request.query_params.get('ano', datetime.now().year))
-    mes = int(request.query_params.get('mes', datetime.now().month))
+    ano, mes, inicio, fim = mes_da_requisicao(request)
     
     # Filtrar coletas do mês
     coletas = Coleta.objects.filter(
-        data_coleta__year=ano,
-        data_coleta__month=mes,
+        filtro_periodo('data_coleta', inicio, fim),
         status='concluida'
     )
     
@@ -42,8 +53,7 @@ def relatorio_mensal(request):
     
     # Alertas do mês
     alertas_mes = Alerta.objects.filter(
-        data_alerta__year=ano,
-        data_alerta__month=mes
+        filtro_periodo('data_alerta', inicio, fim)
     ).count()
     
     return Response({
@@ -88,8 +98,11 @@ def relatorio_por_tipo_residuo(request):
 def relatorio_por_empresa(request):
     """Relatório por empresa"""
     
-    from apps.empresas.models import Empresa
-    
+    # Requisições simultâneas aguardam um único cálculo (reuniões abrem o relatório ao mesmo tempo)
+    return Response(coalescer('relatorio_por_empresa', _calcular_relatorio_por_empresa))
+
+
+def _calcular_relatorio_por_empresa():
     empresas = Empresa.objects.filter(is_active=True)
     relatorio = []
     
@@ -110,7 +123,7 @@ def relatorio_por_empresa(request):
             'alertas_abertos': alertas.filter(resolvido=False).count(),
         })
     
-    return Response(relatorio)
+    return relatorio
 
 
 @api_view(['GET'])
@@ -118,12 +131,12 @@ def relatorio_por_empresa(request):
 def relatorio_evolucao_coletas(request):
     """Relatório de evolução de coletas ao longo do tempo"""
     
-    # Período (últimos 12 meses por padrão)
-    meses = int(request.query_params.get('meses', 12))
-    data_inicial = datetime.now() - timedelta(days=30 * meses)
+    # Período (últimos 12 meses por padrão), a partir do início do mês
+    meses = inteiro_da_requisicao(request, 'meses', 12, maximo=120)
+    inicio, fim = intervalo_ultimos_meses(meses)
     
     coletas = Coleta.objects.filter(
-        data_coleta__gte=data_inicial,
+        filtro_periodo('data_coleta', inicio, fim),
         status='concluida'
     ).annotate(
         mes=TruncMonth('data_coleta')
@@ -148,179 +161,200 @@ def relatorio_evolucao_coletas(request):
 def dashboard_kpis(request):
     """KPIs principais do dashboard"""
     
-    # Bombonas
-    bombonas_ativas = Bombona.objects.filter(is_active=True)
-    total_bombonas = bombonas_ativas.count()
-    bombonas_cheias = bombonas_ativas.filter(status='cheia').count()
-    bombonas_quase_cheias = bombonas_ativas.filter(status='quase_cheia').count()
-    peso_total_armazenado = bombonas_ativas.aggregate(total=Sum('peso_atual'))['total'] or 0
-    
-    # Coletas
+    inicio_mes, fim_mes = intervalo_mes_atual()
     coletas_mes_atual = Coleta.objects.filter(
-        data_coleta__year=datetime.now().year,
-        data_coleta__month=datetime.now().month
+        filtro_periodo('data_coleta', inicio_mes, fim_mes)
     )
-    coletas_pendentes = Coleta.objects.filter(status='pendente').count()
-    coletas_concluidas_mes = coletas_mes_atual.filter(status='concluida').count()
-    peso_coletado_mes = coletas_mes_atual.filter(status='concluida').aggregate(
-        total=Sum('peso_coletado')
-    )['total'] or 0
-    
-    # Alertas
-    alertas_abertos = Alerta.objects.filter(resolvido=False).count()
-    alertas_criticos = Alerta.objects.filter(nivel='critico', resolvido=False).count()
-    alertas_mes = Alerta.objects.filter(
-        data_alerta__year=datetime.now().year,
-        data_alerta__month=datetime.now().month
-    ).count()
+    
+    # Consultas independentes executadas em paralelo (cada uma em sua conexão)
+    resultados = executar_em_paralelo({
+        'bombonas': _kpis_bombonas,
+        'coletas_pendentes': lambda: Coleta.objects.filter(status='pendente').count(),
+        'coletas_mes': lambda: coletas_mes_atual.filter(status='concluida').aggregate(
+            total=Count('id'), peso=Sum('peso_coletado')
+        ),
+        'alertas_abertos': lambda: Alerta.objects.filter(resolvido=False).count(),
+        'alertas_criticos': lambda: Alerta.objects.filter(nivel='critico', resolvido=False).count(),
+        'alertas_mes': lambda: Alerta.objects.filter(
+            filtro_periodo('data_alerta', inicio_mes, fim_mes)
+        ).count(),
+    })
+    
+    bombonas = resultados['bombonas']
+    coletas_mes = resultados['coletas_mes']
     
     return Response({
         'bombonas': {
-            'total': total_bombonas,
-            'cheias': bombonas_cheias,
-            'quase_cheias': bombonas_quase_cheias,
-            'necessitam_coleta': bombonas_cheias + bombonas_quase_cheias,
-            'peso_total_armazenado': float(peso_total_armazenado),
+            'total': bombonas['total'],
+            'cheias': bombonas['cheias'],
+            'quase_cheias': bombonas['quase_cheias'],
+            'necessitam_coleta': bombonas['cheias'] + bombonas['quase_cheias'],
+            'peso_total_armazenado': float(bombonas['peso_total_armazenado'] or 0),
         },
         'coletas': {
-            'pendentes': coletas_pendentes,
-            'concluidas_mes': coletas_concluidas_mes,
-            'peso_coletado_mes': float(peso_coletado_mes),
+            'pendentes': resultados['coletas_pendentes'],
+            'concluidas_mes': coletas_mes['total'],
+            'peso_coletado_mes': float(coletas_mes['peso'] or 0),
         },
         'alertas': {
-            'abertos': alertas_abertos,
-            'criticos': alertas_criticos,
-            'gerados_mes': alertas_mes,
+            'abertos': resultados['alertas_abertos'],
+            'criticos': resultados['alertas_criticos'],
+            'gerados_mes': resultados['alertas_mes'],
         },
     })
 
 
+def _kpis_bombonas():
+    # Estado atual no Redis, com o banco como fallback
+    estado_bombonas = estado.kpis()
+    if estado_bombonas is not None:
+        return estado_bombonas
+    
+    return Bombona.objects.filter(is_active=True).aggregate(
+        total=Count('id'),
+        cheias=Count('id', filter=Q(status='cheia')),
+        quase_cheias=Count('id', filter=Q(status='quase_cheia')),
+        peso_total_armazenado=Sum('peso_atual'),
+    )
+
+
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def dashboard_graficos(request):
     """Dados para gráficos do dashboard"""
     
+    return Response(coalescer('dashboard_graficos', _calcular_dashboard_graficos))
+
+
+def _calcular_dashboard_graficos():
     # Período dos últimos 12 meses
-    hoje = datetime.now()
-    doze_meses_atras = hoje - timedelta(days=365)
+    inicio, fim = intervalo_ultimos_meses(12)
     
-    # Evolução mensal de coletas
-    coletas_mensais = Coleta.objects.filter(
-        data_coleta__gte=doze_meses_atras,
-        status='concluida'
-    ).extra(
-        select={'mes': 'EXTRACT(month FROM data_coleta)', 'ano': 'EXTRACT(year FROM data_coleta)'}
-    ).values('mes', 'ano').annotate(
-        total_coletas=Count('id'),
-        peso_total=Sum('peso_coletado')
-    ).order_by('ano', 'mes')
+    # Consultas independentes executadas em paralelo (cada uma em sua conexão)
+    resultados = executar_em_paralelo({
+        # Evolução mensal de coletas (meses no fuso configurado)
+        'coletas_mensais': lambda: list(Coleta.objects.filter(
+            filtro_periodo('data_coleta', inicio, fim),
+            status='concluida'
+        ).annotate(
+            mes=TruncMonth('data_coleta')
+        ).values('mes').annotate(
+            total_coletas=Count('id'),
+            peso_total=Sum('peso_coletado')
+        ).order_by('mes')),
+        # Distribuição por tipo de resíduo
+        'bombonas_por_tipo': lambda: list(Bombona.objects.filter(is_active=True).values('tipo_residuo').annotate(
+            quantidade=Count('id'),
+            peso_atual=Sum('peso_atual')
+        )),
+        # Status das bombonas (uma consulta agrupada)
+        'bombonas_por_status': lambda: dict(
+            Bombona.objects.filter(is_active=True).values_list('status').annotate(total=Count('id'))
+        ),
+        # Empresas mais ativas (por número de coletas)
+        'empresas_ativas': lambda: list(Empresa.objects.annotate(
+            total_coletas=Count('bombonas__coletas', filter=Q(bombonas__coletas__status='concluida'))
+        ).filter(total_coletas__gt=0).order_by('-total_coletas').values('nome', 'total_coletas')[:5]),
+        # Alertas por tipo
+        'alertas_por_tipo': lambda: list(Alerta.objects.filter(resolvido=False).values('tipo').annotate(
+            quantidade=Count('id')
+        )),
+    })
     
     # Formatar dados para gráfico
     evolucao_mensal = []
     meses_nomes = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
                    'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
     
-    for item in coletas_mensais:
-        mes_nome = meses_nomes[int(item['mes']) - 1]
+    for item in resultados['coletas_mensais']:
+        mes_nome = meses_nomes[item['mes'].month - 1]
         evolucao_mensal.append({
-            'mes': f"{mes_nome}/{int(item['ano'])}",
+            'mes': f"{mes_nome}/{item['mes'].year}",
             'coletas': item['total_coletas'],
             'peso': float(item['peso_total'] or 0)
         })
     
-    # Distribuição por tipo de resíduo
     tipos_residuo = {}
-    bombonas = Bombona.objects.filter(is_active=True).values('tipo_residuo').annotate(
-        quantidade=Count('id'),
-        peso_atual=Sum('peso_atual')
-    )
-    
-    for item in bombonas:
+    for item in resultados['bombonas_por_tipo']:
         tipo = item['tipo_residuo']
         tipos_residuo[tipo] = {
             'bombonas': item['quantidade'],
             'peso_total': float(item['peso_atual'] or 0)
         }
     
-    # Status das bombonas
+    # Mantém a ordem de STATUS_CHOICES e omite status sem bombonas
     status_bombonas = {}
-    for status, nome in Bombona.STATUS_CHOICES:
-        count = Bombona.objects.filter(status=status, is_active=True).count()
+    for status_bombona, nome in Bombona.STATUS_CHOICES:
+        count = resultados['bombonas_por_status'].get(status_bombona, 0)
         if count > 0:
             status_bombonas[nome] = count
     
-    # Empresas mais ativas (por número de coletas)
-    empresas_ativas = []
-    empresas_data = Empresa.objects.annotate(
-        total_coletas=Count('bombonas__coletas', filter=Q(bombonas__coletas__status='concluida'))
-    ).filter(total_coletas__gt=0).order_by('-total_coletas')[:5]
+    empresas_ativas = [
+        {'nome': empresa['nome'], 'coletas': empresa['total_coletas']}
+        for empresa in resultados['empresas_ativas']
+    ]
     
-    for empresa in empresas_data:
-        empresas_ativas.append({
-            'nome': empresa.nome,
-            'coletas': empresa.total_coletas
-        })
-    
-    # Alertas por tipo
     alertas_por_tipo = {}
-    alertas_data = Alerta.objects.filter(resolvido=False).values('tipo').annotate(
-        quantidade=Count('id')
-    )
-    
-    for item in alertas_data:
+    for item in resultados['alertas_por_tipo']:
         tipo_display = dict(Alerta.TIPO_CHOICES).get(item['tipo'], item['tipo'])
         alertas_por_tipo[tipo_display] = item['quantidade']
     
-    return Response({
+    return {
         'evolucao_mensal': evolucao_mensal,
         'tipos_residuo': tipos_residuo,
         'status_bombonas': status_bombonas,
         'empresas_ativas': empresas_ativas,
         'alertas_por_tipo': alertas_por_tipo
-    })
+    }
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def relatorio_exportacao(request):
-    """Dados para exportação em PDF/Excel"""
+    """Exportação das coletas em CSV, Excel ou PDF (JSON para pré-visualização)"""
+    
+    formato = request.query_params.get('formato', 'json')  # json, csv, excel, pdf
+    periodo = inteiro_da_requisicao(request, 'periodo', 30)  # dias
     
-    formato = request.query_params.get('formato', 'json')  # json, pdf, excel
-    periodo = int(request.query_params.get('periodo', 30))  # dias
+    if formato != 'json' and formato not in FORMATOS_EXPORTACAO:
+        return Response(
+            {'error': 'Formato inválido. Use json, csv, excel ou pdf.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    data_inicial, data_final = intervalo_ultimos_dias(periodo)
     
-    data_inicial = datetime.now() - timedelta(days=periodo)
+    if formato in FORMATOS_EXPORTACAO:
+        return resposta_exportacao(data_inicial, data_final, formato)
     
     # Coletas no período
-    coletas = Coleta.objects.filter(
-        data_coleta__gte=data_inicial,
-        status='concluida'
-    ).select_related('bombona', 'bombona__empresa').order_by('-data_coleta')
-    
-    dados_coletas = []
-    for coleta in coletas:
-        dados_coletas.append({
-            'data': coleta.data_coleta.strftime('%d/%m/%Y %H:%M'),
-            'bombona': coleta.bombona.identificacao,
-            'empresa': coleta.bombona.empresa.nome,
-            'tipo_residuo': coleta.bombona.get_tipo_residuo_display(),
-            'peso_coletado': float(coleta.peso_coletado),
-            'responsavel': coleta.responsavel_coleta
-        })
+    dados_coletas = [
+        {
+            'data': data,
+            'bombona': bombona,
+            'empresa': empresa,
+            'tipo_residuo': tipo_residuo,
+            'peso_coletado': float(peso),
+            'responsavel': responsavel,
+        }
+        for data, bombona, empresa, tipo_residuo, peso, responsavel
+        in linhas_coletas(data_inicial, data_final)
+    ]
     
     # Resumo do período
     total_peso = sum(c['peso_coletado'] for c in dados_coletas)
     total_coletas = len(dados_coletas)
     
-    # Bombonas por status
-    bombonas_resumo = {}
-    for status, nome in Bombona.STATUS_CHOICES:
-        count = Bombona.objects.filter(status=status, is_active=True).count()
-        bombonas_resumo[nome] = count
+    # Bombonas por status (uma única consulta agrupada)
+    contagens = dict(
+        Bombona.objects.filter(is_active=True).values_list('status').annotate(total=Count('id'))
+    )
+    bombonas_resumo = {nome: contagens.get(status_bombona, 0) for status_bombona, nome in Bombona.STATUS_CHOICES}
     
     return Response({
         'periodo': {
-            'data_inicial': data_inicial.strftime('%d/%m/%Y'),
-            'data_final': datetime.now().strftime('%d/%m/%Y'),
+            'data_inicial': timezone.localtime(data_inicial).strftime('%d/%m/%Y'),
+            'data_final': timezone.localtime(data_final).strftime('%d/%m/%Y'),
             'dias': periodo
         },
         'resumo': {
@@ -332,3 +366,94 @@ def relatorio_exportacao(request):
         'bombonas_status': bombonas_resumo,
         'formato_solicitado': formato
     })
+
+
+def _exportacoes_visiveis(usuario):
+    """Exportações do próprio usuário (administradores veem todas)"""
+    queryset = ExportacaoRelatorio.objects.all()
+    if not usuario.is_admin:
+        queryset = queryset.filter(solicitado_por=usuario)
+    return queryset
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+def exportacoes(request):
+    """Lista as exportações do usuário ou solicita uma nova (gerada em segundo plano)"""
+    
+    if request.method == 'GET':
+        queryset = _exportacoes_visiveis(request.user).select_related('empresa')
+        serializer = ExportacaoRelatorioSerializer(queryset[:50], many=True, context={'request': request})
+        return Response(serializer.data)
+    
+    formato = request.data.get('formato')
+    if formato not in FORMATOS_EXPORTACAO:
+        return Response(
+            {'error': 'Formato inválido. Use csv, excel ou pdf.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    empresa_id = request.data.get('empresa') or None
+    if empresa_id is not None:
+        try:
+            empresa_id = int(empresa_id)
+        except (TypeError, ValueError):
+            empresa_id = None
+        if empresa_id is None or not Empresa.objects.filter(pk=empresa_id).exists():
+            return Response(
+                {'error': 'Empresa não encontrada'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    
+    data_inicial, data_final = dias_da_requisicao(request.data)
+    exportacao, criada = solicitar_exportacao(request.user, formato, data_inicial, data_final, empresa_id)
+    
+    serializer = ExportacaoRelatorioSerializer(exportacao, context={'request': request})
+    # 200 quando um arquivo equivalente já está pronto; 202 enquanto é gerado
+    codigo = status.HTTP_200_OK if exportacao.status == 'concluida' else status.HTTP_202_ACCEPTED
+    return Response(serializer.data, status=codigo)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def exportacao_detalhe(request, pk):
+    """Status e progresso de uma exportação"""
+    
+    try:
+        exportacao = _exportacoes_visiveis(request.user).select_related('empresa').get(pk=pk)
+    except ExportacaoRelatorio.DoesNotExist:
+        return Response(
+            {'error': 'Exportação não encontrada'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    serializer = ExportacaoRelatorioSerializer(exportacao, context={'request': request})
+    return Response(serializer.data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def exportacao_download(request, pk):
+    """Download do arquivo de uma exportação concluída"""
+    
+    try:
+        exportacao = _exportacoes_visiveis(request.user).get(pk=pk)
+    except ExportacaoRelatorio.DoesNotExist:
+        return Response(
+            {'error': 'Exportação não encontrada'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    if exportacao.status != 'concluida' or not exportacao.arquivo:
+        return Response(
+            {'error': 'Exportação ainda não concluída'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    tipo_conteudo, _ = FORMATOS_EXPORTACAO[exportacao.formato]
+    return FileResponse(
+        exportacao.arquivo.open('rb'),
+        as_attachment=True,
+        filename=os.path.basename(exportacao.arquivo.name),
+        content_type=tipo_conteudo
+    )
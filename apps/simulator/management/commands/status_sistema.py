@@ -5,6 +5,7 @@ from apps.coletas.models import Coleta
 from apps.alertas.models import Alerta
 from apps.empresas.models import Empresa
 from apps.authentication.models import User
+from apps.relatorios.periodos import intervalo_dia, filtro_periodo
 from django.db.models import Avg, Count, Q
 import json
 
@@ -63,8 +64,9 @@ class Command(BaseCommand):
         ocupacao_media = round(ocupacao_total / bombonas_total, 2) if bombonas_total > 0 else 0
         
         # Coletas
+        inicio_dia, fim_dia = intervalo_dia(timezone.localdate())
         coletas_hoje = Coleta.objects.filter(
-            data_coleta__date=timezone.now().date()
+            filtro_periodo('data_coleta', inicio_dia, fim_dia)
         ).count()
         
         coletas_total = Coleta.objects.count()
@@ -3,10 +3,18 @@ Simulador IoT para bombonas de resíduos
 Simula leituras de sensores de peso e temperatura
 """
 import random
+import time
 from decimal import Decimal
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Least
 from django.utils import timezone
+from apps.bombonas import estado
 from apps.bombonas.models import Bombona, LeituraSensor
 from apps.alertas.models import Alerta
+from apps.alertas.regras import avaliador
+from apps.monitoramento.metricas import observar
+from core.facetas import nova_versao
 
 
 class IoTSimulator:
@@ -18,8 +26,13 @@ class IoTSimulator:
         self.peso_incremento_min = 0.5
         self.peso_incremento_max = 3.0
     
-    def simular_leitura_bombona(self, bombona):
-        """Simula uma leitura de sensores para uma bombona específica"""
+    def simular_leitura_bombona(self, bombona, lote=None):
+        """
+        Simula uma leitura de sensores para uma bombona específica
+        Com `lote` (lista), a bombona lida é acumulada nela para que as regras de
+        alerta sejam avaliadas e os alertas inseridos de uma vez para o ciclo;
+        sem ela, os alertas da leitura são gerados logo em seguida.
+        """
         
         if not bombona.is_active:
             return None
@@ -28,132 +41,129 @@ class IoTSimulator:
         incremento_peso = Decimal(random.uniform(
             self.peso_incremento_min,
             self.peso_incremento_max
-        ))
-        
-        # Atualizar peso (não ultrapassar capacidade)
-        novo_peso = bombona.peso_atual + incremento_peso
-        if novo_peso > bombona.capacidade:
-            novo_peso = bombona.capacidade
+        )).quantize(Decimal('0.01'))
         
         # Simular temperatura com variação
         variacao = random.uniform(-self.temperatura_variacao, self.temperatura_variacao)
-        nova_temperatura = Decimal(self.temperatura_base + variacao)
-        
-        # Atualizar bombona
-        bombona.peso_atual = novo_peso
-        bombona.temperatura = nova_temperatura
-        bombona.ultima_leitura = timezone.now()
-        bombona.save()
+        nova_temperatura = Decimal(self.temperatura_base + variacao).quantize(Decimal('0.01'))
         
-        # Atualizar status automaticamente
-        bombona.atualizar_status()
-        
-        # Criar registro de leitura
-        leitura = LeituraSensor.objects.create(
-            bombona=bombona,
-            peso=novo_peso,
-            temperatura=nova_temperatura,
-            simulado=True
-        )
+        agora = timezone.now()
+        # Atualizar peso (não ultrapassar capacidade) e status em um único UPDATE:
+        # coletas e leituras simultâneas não sobrescrevem o peso uma da outra
+        novo_peso = Least(F('peso_atual') + incremento_peso, F('capacidade'))
+        # Status carregado com a bombona no ciclo: decide se as facetas mudam
+        status_anterior = bombona.status
+        with transaction.atomic():
+            atualizadas = Bombona.objects.filter(pk=bombona.pk, is_active=True).update(
+                peso_atual=novo_peso,
+                temperatura=nova_temperatura,
+                ultima_leitura=agora,
+                status=Bombona.status_por_peso(novo_peso),
+                updated_at=agora,
+            )
+            if not atualizadas:
+                return None
+            
+            # A linha fica bloqueada pelo UPDATE até o commit: lê exatamente o que foi gravado
+            bombona.refresh_from_db(fields=list(estado.CAMPOS_LEITURA))
+            
+            # Criar registro de leitura
+            leitura = LeituraSensor.objects.create(
+                bombona=bombona,
+                peso=bombona.peso_atual,
+                temperatura=bombona.temperatura,
+                simulado=True
+            )
+            
+            # update() não dispara signals
+            transaction.on_commit(lambda: estado.gravar_leitura(bombona))
+            # As facetas só dependem do status: o peso de uma leitura não muda as contagens
+            if bombona.status != status_anterior:
+                nova_versao(Bombona)
         
         # Verificar e gerar alertas
-        self.verificar_alertas(bombona)
+        if lote is None:
+            Alerta.criar_em_lote(self.verificar_alertas([bombona]))
+        else:
+            lote.append(bombona)
         
         return leitura
     
-    def verificar_alertas(self, bombona):
-        """Verifica condições e gera alertas se necessário"""
-        
-        percentual = bombona.percentual_ocupacao
-        
-        # Alerta de nível crítico (>= 95%)
-        if percentual >= 95:
-            # Verificar se já existe alerta não resolvido
-            alerta_existente = Alerta.objects.filter(
-                bombona=bombona,
-                tipo='nivel_critico',
-                resolvido=False
-            ).exists()
-            
-            if not alerta_existente:
-                Alerta.objects.create(
-                    bombona=bombona,
-                    tipo='nivel_critico',
-                    nivel='critico',
-                    descricao=f'Bombona {bombona.identificacao} atingiu {percentual:.1f}% de capacidade. Coleta urgente necessária!'
-                )
+    def verificar_alertas(self, bombonas):
+        """
+        Avalia as regras de alerta nas bombonas lidas e retorna os alertas (não salvos)
+        A deduplicação fica com o banco: Alerta.criar_em_lote descarta os de
+        bombona/tipo que já têm alerta aberto.
+        """
         
-        # Alerta de nível alto (>= 80%)
-        elif percentual >= 80:
-            alerta_existente = Alerta.objects.filter(
-                bombona=bombona,
-                tipo='nivel_alto',
-                resolvido=False
-            ).exists()
-            
-            if not alerta_existente:
-                Alerta.objects.create(
-                    bombona=bombona,
-                    tipo='nivel_alto',
-                    nivel='alto',
-                    descricao=f'Bombona {bombona.identificacao} atingiu {percentual:.1f}% de capacidade. Agendar coleta em breve.'
-                )
-        
-        # Alerta de temperatura alta (> 40°C)
-        if float(bombona.temperatura) > 40.0:
-            alerta_existente = Alerta.objects.filter(
-                bombona=bombona,
-                tipo='temperatura_alta',
-                resolvido=False
-            ).exists()
-            
-            if not alerta_existente:
-                Alerta.objects.create(
-                    bombona=bombona,
-                    tipo='temperatura_alta',
-                    nivel='medio',
-                    descricao=f'Bombona {bombona.identificacao} com temperatura elevada: {bombona.temperatura}°C'
-                )
+        return avaliador().alertas(bombonas)
     
     def simular_todas_bombonas(self):
         """Simula leituras para todas as bombonas ativas"""
         
+        inicio = time.perf_counter()
         bombonas = Bombona.objects.filter(is_active=True)
         leituras_criadas = 0
-        alertas_criados = 0
+        lidas = []
         
         for bombona in bombonas:
             # Decidir aleatoriamente se simula leitura (80% de chance)
             if random.random() < 0.8:
-                leitura = self.simular_leitura_bombona(bombona)
+                leitura = self.simular_leitura_bombona(bombona, lidas)
                 if leitura:
                     leituras_criadas += 1
         
+        # Regras avaliadas no lote do ciclo e alertas em um único INSERT
+        # (os já abertos são ignorados pelo banco)
+        alertas_criados = len(Alerta.criar_em_lote(self.verificar_alertas(lidas)))
+        
         # Contar alertas não resolvidos
-        alertas_criados = Alerta.objects.filter(resolvido=False).count()
+        alertas_abertos = Alerta.objects.filter(resolvido=False).count()
+        
+        observar('iowaste_simulador_tick_duration_seconds', time.perf_counter() - inicio)
+        observar('iowaste_simulador_leituras_por_tick', leituras_criadas)
         
         return {
             'bombonas_processadas': bombonas.count(),
             'leituras_criadas': leituras_criadas,
-            'alertas_abertos': alertas_criados,
+            'alertas_criados': alertas_criados,
+            'alertas_abertos': alertas_abertos,
         }
     
     def resetar_bombona(self, bombona):
         """Reseta uma bombona para peso zero (simula esvaziamento)"""
         
-        bombona.peso_atual = Decimal('0.0')
-        bombona.status = 'normal'
-        bombona.save()
+        self.resetar_bombonas([bombona.pk])
+        bombona.refresh_from_db(fields=estado.CAMPOS_LEITURA)
+    
+    def resetar_bombonas(self, bombona_ids):
+        """
+        Reseta as bombonas informadas em lote: um UPDATE nas bombonas (status calculado
+        no banco para o peso zero) e um nos alertas abertos delas
+        """
         
-        # Resolver alertas abertos
-        Alerta.objects.filter(
-            bombona=bombona,
-            resolvido=False
-        ).update(
-            resolvido=True,
-            data_resolucao=timezone.now(),
-            observacoes_resolucao='Bombona esvaziada - reset automático'
-        )
+        bombona_ids = list(bombona_ids)
+        agora = timezone.now()
+        with transaction.atomic():
+            resetadas = Bombona.atualizar_em_lote(
+                bombona_ids,
+                peso_atual=Decimal('0.00'),
+                status=Bombona.status_por_peso(Value(Decimal('0.00'))),
+            )
+            
+            # Resolver alertas abertos
+            resolvidos = Alerta.objects.filter(
+                bombona_id__in=bombona_ids,
+                resolvido=False
+            ).update(
+                resolvido=True,
+                data_resolucao=agora,
+                observacoes_resolucao='Bombona esvaziada - reset automático',
+                updated_at=agora
+            )
+            if resolvidos:
+                nova_versao(Alerta)
+        return resetadas
     
     def popular_dados_exemplo(self):
         """Popula o sistema com dados de exemplo para demonstração - REGIÃO DO PARANÁ"""
@@ -2,23 +2,19 @@ from celery import shared_task
 from .simulator import simulator
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def simulate_iot_readings():
     """Task Celery para simular leituras IoT periodicamente"""
     resultado = simulator.simular_todas_bombonas()
     return f"Simulação concluída: {resultado}"
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def reset_full_bombonas():
     """Task para resetar bombonas cheias automaticamente"""
     from apps.bombonas.models import Bombona
     
-    bombonas_cheias = Bombona.objects.filter(status='cheia')
-    count = 0
-    
-    for bombona in bombonas_cheias:
-        simulator.resetar_bombona(bombona)
-        count += 1
+    bombonas_cheias = Bombona.objects.filter(status='cheia').values_list('id', flat=True)
+    count = simulator.resetar_bombonas(bombonas_cheias)
     
     return f"{count} bombonas resetadas"
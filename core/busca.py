@@ -0,0 +1,76 @@
+"""
+Busca textual (?search=) com os índices de trigramas do PostgreSQL (pg_trgm)
+
+O SearchFilter padrão gera um único WHERE com `UPPER(campo) LIKE '%TERMO%'` em OR
+sobre tabelas unidas por join, o que obriga o PostgreSQL a varrer a tabela inteira.
+Aqui cada campo vira uma subconsulta própria na tabela dona do campo (onde está o
+índice GIN de trigramas) e os ids encontrados são unidos com UNION: cada parte
+usa o seu índice e só as linhas encontradas são lidas.
+Sem ?ordering= os resultados vêm ordenados por relevância (similaridade de trigramas).
+"""
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Q
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.functions import Greatest
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+
+def _condicao(modelo, campo, termo):
+    """Q do termo no campo; campos relacionados viram subconsultas na tabela relacionada"""
+    relacao, _, resto = campo.partition(LOOKUP_SEP)
+    if resto:
+        campo_modelo = modelo._meta.get_field(relacao)
+        if campo_modelo.concrete and (campo_modelo.many_to_one or campo_modelo.one_to_one):
+            relacionado = campo_modelo.related_model
+            ids = relacionado._default_manager.filter(
+                _condicao(relacionado, resto, termo)
+            ).order_by().values('pk')
+            return Q(**{f'{relacao}__in': ids})
+    return Q(**{f'{campo}__icontains': termo})
+
+
+def ids_encontrados(modelo, campos, termo):
+    """ids do modelo com o termo em algum dos campos (uma subconsulta por campo)"""
+    partes = [
+        modelo._default_manager.filter(_condicao(modelo, campo, termo)).order_by().values('pk')
+        for campo in campos
+    ]
+    if len(partes) == 1:
+        return partes[0]
+    return partes[0].union(*partes[1:])
+
+
+class BuscaTrigramaFilter(filters.SearchFilter):
+    """
+    SearchFilter para os índices de trigramas, com ordenação por relevância
+    Deve ser o último filtro da view (depois do OrderingFilter). Em outros bancos,
+    ou com prefixos de busca (^, =, @, $), usa o comportamento padrão do DRF.
+    """
+
+    def _usar_padrao(self, queryset, search_fields):
+        return (
+            connections[queryset.db].vendor != 'postgresql' or
+            any(campo[0] in self.lookup_prefixes for campo in search_fields)
+        )
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        termos = self.get_search_terms(request)
+        if not search_fields or not termos or self._usar_padrao(queryset, search_fields):
+            return super().filter_queryset(request, queryset, view)
+
+        # Todos os termos devem aparecer (em qualquer um dos campos), como no SearchFilter
+        for termo in termos:
+            queryset = queryset.filter(pk__in=ids_encontrados(queryset.model, search_fields, termo))
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+
+        texto = ' '.join(termos)
+        similaridades = [TrigramWordSimilarity(texto, campo) for campo in search_fields]
+        relevancia = similaridades[0] if len(similaridades) == 1 else Greatest(*similaridades)
+        # A ordenação da view (ou do modelo) desempata resultados com a mesma relevância
+        ordenacao = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.annotate(relevancia_busca=relevancia).order_by('-relevancia_busca', *ordenacao)
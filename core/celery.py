@@ -14,6 +14,14 @@ app.conf.beat_schedule = {
         'task': 'apps.simulator.tasks.simulate_iot_readings',
         'schedule': 300.0,  # 5 minutos
     },
+    'reconcile-bombonas-state': {
+        'task': 'apps.bombonas.tasks.reconciliar_estado_bombonas',
+        'schedule': 600.0,  # 10 minutos
+    },
+    'cleanup-old-exports-daily': {
+        'task': 'apps.relatorios.tasks.remover_exportacoes_antigas',
+        'schedule': crontab(hour=3, minute=30),
+    },
     'cleanup-old-logs-daily': {
         'task': 'apps.authentication.tasks.cleanup_old_logs',
         'schedule': crontab(hour=3, minute=0),  # Às 3h da manhã
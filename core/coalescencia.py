@@ -0,0 +1,123 @@
+"""
+Coalescência de requisições (single-flight) para relatórios caros
+Requisições idênticas e simultâneas aguardam um único cálculo e recebem o mesmo
+resultado, usando um lock no cache (Redis) e um slot compartilhado com o resultado.
+Enquanto um resultado expirado é recalculado, os demais recebem a versão anterior
+(stale-while-revalidate).
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+logger = logging.getLogger('iowaste.coalescencia')
+
+
+def _registrar(nome, acerto):
+    from apps.monitoramento.metricas import registrar_cache
+    registrar_cache(nome, acerto)
+
+
+def _obter_lock(chave_lock, token, timeout):
+    try:
+        return cache.add(chave_lock, token, timeout=timeout)
+    except Exception:
+        # Cache indisponível: calcula sem coordenação
+        return True
+
+
+def _ler(chave_slot):
+    try:
+        return cache.get(chave_slot)
+    except Exception:
+        return None
+
+
+def _liberar(chave_lock, token):
+    try:
+        if cache.get(chave_lock) == token:
+            cache.delete(chave_lock)
+    except Exception:
+        pass
+
+
+def _calcular_e_publicar(chave_slot, chave_lock, token, calcular, validade, tolerancia):
+    try:
+        valor = calcular()
+        try:
+            cache.set(chave_slot, (time.time(), valor), timeout=validade + tolerancia)
+        except Exception as e:
+            logger.warning(f'Falha ao publicar resultado de {chave_slot}: {e}')
+        return valor
+    finally:
+        _liberar(chave_lock, token)
+
+
+def coalescer(nome, calcular, parametros='', validade=None, tolerancia=None, espera=None, duracao_lock=None):
+    """
+    Retorna o resultado de `calcular()` compartilhado entre requisições idênticas
+
+    validade:   segundos em que o resultado é servido sem recálculo
+    tolerancia: segundos adicionais em que o resultado expirado ainda é servido
+                enquanto uma única requisição o recalcula
+    espera:     tempo máximo aguardando o cálculo de outra requisição
+    duracao_lock: segundos até o lock expirar se quem calcula morrer; deve superar
+                o cálculo mais lento, senão uma segunda requisição recalcula em paralelo
+    """
+    validade = validade if validade is not None else settings.COALESCENCIA_VALIDADE
+    tolerancia = tolerancia if tolerancia is not None else settings.COALESCENCIA_TOLERANCIA
+    espera = espera if espera is not None else settings.COALESCENCIA_ESPERA
+    duracao_lock = duracao_lock if duracao_lock is not None else settings.COALESCENCIA_DURACAO_LOCK
+
+    chave_slot = f'coalescencia:{nome}:{parametros}'
+    chave_lock = f'{chave_slot}:lock'
+    token = uuid.uuid4().hex
+
+    try:
+        entrada = cache.get(chave_slot)
+    except Exception as e:
+        # Sem cache não há coordenação: cada requisição calcula
+        logger.warning(f'Cache indisponível para {nome}: {e}')
+        return calcular()
+
+    if entrada is not None:
+        gerado_em, valor = entrada
+        if time.time() - gerado_em < validade:
+            _registrar(nome, True)
+            return valor
+
+        # Expirado: apenas quem obtiver o lock recalcula; os demais recebem o anterior
+        if _obter_lock(chave_lock, token, duracao_lock):
+            _registrar(nome, False)
+            return _calcular_e_publicar(chave_slot, chave_lock, token, calcular, validade, tolerancia)
+        _registrar(nome, True)
+        return valor
+
+    limite = time.monotonic() + espera
+    while True:
+        if _obter_lock(chave_lock, token, duracao_lock):
+            _registrar(nome, False)
+            return _calcular_e_publicar(chave_slot, chave_lock, token, calcular, validade, tolerancia)
+
+        # Outra requisição está calculando: aguarda o resultado no slot
+        time.sleep(0.05)
+        entrada = _ler(chave_slot)
+        if entrada is not None:
+            _registrar(nome, True)
+            return entrada[1]
+
+        if time.monotonic() >= limite:
+            logger.warning(f'Tempo de espera esgotado aguardando {nome}; calculando localmente')
+            _registrar(nome, False)
+            return calcular()
+
+
+def invalidar(nome, parametros=''):
+    """Descarta o resultado compartilhado: a próxima requisição recalcula"""
+    try:
+        cache.delete(f'coalescencia:{nome}:{parametros}')
+    except Exception as e:
+        logger.warning(f'Falha ao invalidar {nome}: {e}')
@@ -0,0 +1,208 @@
+"""
+Contagens por faceta (status, tipo de resíduo, empresa...) para os painéis de filtro
+
+As contagens usam o queryset da listagem já filtrado (mesmos filtros e busca) e são
+calculadas em uma única consulta com GROUPING SETS no PostgreSQL. O resultado fica
+em cache por versão dos dados: cada modelo tem uma versão no cache, trocada após o
+commit de cada alteração (signals, ou nova_versao() depois de um update()).
+"""
+import hashlib
+import logging
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count, F
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.signals import post_save, post_delete
+from rest_framework.response import Response
+
+from core.coalescencia import coalescer
+
+
+logger = logging.getLogger('iowaste.facetas')
+
+# Parâmetros que não mudam o conjunto de resultados
+PARAMETROS_IGNORADOS = {'page', 'page_size', 'ordering', 'fields', 'expand', 'format'}
+
+
+def _chave_versao(modelo):
+    return f'facetas:versao:{modelo._meta.label_lower}'
+
+
+def versao_dados(modelos):
+    """Versão atual dos dados dos modelos (None quando o cache está indisponível)"""
+    chaves = [_chave_versao(modelo) for modelo in modelos]
+    try:
+        versoes = cache.get_many(chaves)
+        for chave in chaves:
+            if chave not in versoes:
+                # Versão nova (nunca reaproveita um número já usado, mesmo após expulsão do cache)
+                cache.add(chave, uuid.uuid4().hex, timeout=None)
+                versoes[chave] = cache.get(chave)
+    except Exception as e:
+        logger.warning(f'Cache indisponível para as versões das facetas: {e}')
+        return None
+    return ':'.join(str(versoes[chave]) for chave in chaves)
+
+
+def nova_versao(*modelos):
+    """Troca a versão dos modelos após o commit (update() não dispara signals)"""
+    def trocar():
+        try:
+            cache.set_many({_chave_versao(modelo): uuid.uuid4().hex for modelo in modelos}, timeout=None)
+        except Exception as e:
+            logger.warning(f'Falha ao trocar a versão das facetas: {e}')
+
+    transaction.on_commit(trocar)
+
+
+def _modelo_alterado(sender, **kwargs):
+    nova_versao(sender)
+
+
+def registrar_versao(modelo):
+    """Troca a versão do modelo a cada save/delete"""
+    nome = modelo._meta.label_lower
+    post_save.connect(_modelo_alterado, sender=modelo, dispatch_uid=f'facetas_{nome}_salvo')
+    post_delete.connect(_modelo_alterado, sender=modelo, dispatch_uid=f'facetas_{nome}_removido')
+
+
+def _definicoes(facetas):
+    """{nome: caminho} ou {nome: (caminho do valor, caminho do rótulo)} -> {nome: (valor, rótulo)}"""
+    return {
+        nome: tuple(caminhos) if isinstance(caminhos, (list, tuple)) else (caminhos, None)
+        for nome, caminhos in facetas.items()
+    }
+
+
+def _rotulos_choices(modelo, caminho):
+    campo = None
+    for parte in caminho.split(LOOKUP_SEP):
+        campo = modelo._meta.get_field(parte)
+        if campo.is_relation:
+            modelo = campo.related_model
+    return dict(campo.flatchoices) if campo.choices else {}
+
+
+def _contar_grouping_sets(queryset, definicoes):
+    """Uma consulta: um conjunto de agrupamento por faceta e () para o total"""
+    conexao = connections[queryset.db]
+    nome = conexao.ops.quote_name
+    colunas, conjuntos, agrupamentos = {}, [], []
+    for indice, (valor, rotulo) in enumerate(definicoes.values()):
+        alias = f'faceta_{indice}'
+        colunas[alias] = F(valor)
+        conjunto = [nome(alias)]
+        if rotulo:
+            colunas[f'{alias}_rotulo'] = F(rotulo)
+            conjunto.append(nome(f'{alias}_rotulo'))
+        conjuntos.append(f"({', '.join(conjunto)})")
+        agrupamentos.append(f'GROUPING({nome(alias)})')
+    conjuntos.append('()')
+
+    sql, params = queryset.order_by().values(**colunas).query.sql_with_params()
+    aliases = list(colunas)
+    consulta = (
+        f"SELECT {', '.join(nome(alias) for alias in aliases)}, {', '.join(agrupamentos)}, COUNT(*) "
+        f"FROM ({sql}) AS base GROUP BY GROUPING SETS ({', '.join(conjuntos)})"
+    )
+    with conexao.cursor() as cursor:
+        cursor.execute(consulta, params)
+        linhas = cursor.fetchall()
+
+    total = 0
+    contagens = {nome_faceta: [] for nome_faceta in definicoes}
+    quantidade = len(definicoes)
+    for linha in linhas:
+        valores = dict(zip(aliases, linha))
+        agrupado = linha[len(aliases):len(aliases) + quantidade]
+        if all(agrupado):
+            total = linha[-1]
+            continue
+        indice = agrupado.index(0)
+        nome_faceta = list(definicoes)[indice]
+        contagens[nome_faceta].append(
+            (valores[f'faceta_{indice}'], valores.get(f'faceta_{indice}_rotulo'), linha[-1])
+        )
+    return total, contagens
+
+
+def _contar_separadamente(queryset, definicoes):
+    """Bancos sem GROUPING SETS: uma consulta agrupada por faceta"""
+    queryset = queryset.order_by()
+    contagens = {}
+    for nome_faceta, (valor, rotulo) in definicoes.items():
+        campos = [valor] + ([rotulo] if rotulo else [])
+        linhas = queryset.values(*campos).annotate(total_faceta=Count('pk')).order_by()
+        contagens[nome_faceta] = [
+            (linha[valor], linha[rotulo] if rotulo else None, linha['total_faceta'])
+            for linha in linhas
+        ]
+    return queryset.count(), contagens
+
+
+def contar_facetas(queryset, facetas):
+    """{'total': n, 'facetas': {nome: [{'valor', 'rotulo', 'total'}, ...]}} dos resultados do queryset"""
+    definicoes = _definicoes(facetas)
+    if connections[queryset.db].vendor == 'postgresql':
+        total, contagens = _contar_grouping_sets(queryset, definicoes)
+    else:
+        total, contagens = _contar_separadamente(queryset, definicoes)
+
+    resultado = {}
+    for nome_faceta, (valor, rotulo) in definicoes.items():
+        choices = {} if rotulo else _rotulos_choices(queryset.model, valor)
+        itens = [
+            {
+                'valor': valor_faceta,
+                'rotulo': rotulo_faceta if rotulo else choices.get(valor_faceta, valor_faceta),
+                'total': quantidade,
+            }
+            for valor_faceta, rotulo_faceta, quantidade in contagens[nome_faceta]
+        ]
+        itens.sort(key=lambda item: (-item['total'], str(item['valor'])))
+        resultado[nome_faceta] = itens
+    return {'total': total, 'facetas': resultado}
+
+
+def _parametros(request, versao):
+    parametros = sorted(
+        (chave, sorted(request.query_params.getlist(chave)))
+        for chave in request.query_params
+        if chave not in PARAMETROS_IGNORADOS
+    )
+    return hashlib.sha256(f'{versao}|{parametros}'.encode()).hexdigest()
+
+
+class FacetasViewMixin:
+    """
+    GET com as contagens por faceta dos resultados da listagem
+    Combinado com a view de listagem, reaproveita os filtros e a busca dela.
+
+    `facetas`: {nome: caminho do valor} ou {nome: (caminho do valor, caminho do rótulo)}
+    `facetas_modelos`: modelos cujas alterações mudam as contagens (versão do cache)
+    """
+
+    facetas = {}
+    facetas_modelos = ()
+    http_method_names = ['get', 'head', 'options']
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        def calcular():
+            return contar_facetas(queryset, self.facetas)
+
+        versao = versao_dados(self.facetas_modelos or (queryset.model,))
+        if versao is None:
+            return Response(calcular())
+
+        # Uma nova versão muda a chave: o resultado anterior nunca é servido após uma alteração
+        resultado = coalescer(
+            f'facetas_{queryset.model._meta.model_name}', calcular,
+            parametros=_parametros(request, versao),
+            validade=settings.FACETAS_VALIDADE, tolerancia=0,
+        )
+        return Response(resultado)
@@ -0,0 +1,128 @@
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from .routers import replicas, usar_replica
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Formatos que já são comprimidos: recomprimir só gasta CPU
+TIPOS_JA_COMPRIMIDOS = (
+    'application/pdf',
+    'application/zip',
+    'application/gzip',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'image/',
+)
+
+re_aceita_brotli = re.compile(r'\bbr\b')
+
+
+class ReplicaMiddleware:
+    """
+    Envia leituras de GET para as réplicas, exceto para usuários que escreveram
+    nos últimos REPLICA_STICKY_SEGUNDOS (read-your-writes)
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replicas():
+            return self.get_response(request)
+
+        usuario_id = self.identificar_usuario(request)
+
+        if request.method in ('GET', 'HEAD'):
+            pode_usar = (
+                request.path.startswith(tuple(settings.REPLICA_ROTAS)) and
+                not self.escreveu_recentemente(usuario_id)
+            )
+            with usar_replica(pode_usar):
+                return self.get_response(request)
+
+        response = self.get_response(request)
+
+        if usuario_id and response.status_code < 400:
+            try:
+                cache.set(self.chave_sticky(usuario_id), 1, timeout=settings.REPLICA_STICKY_SEGUNDOS)
+            except Exception:
+                pass
+
+        return response
+
+    def escreveu_recentemente(self, usuario_id):
+        if not usuario_id:
+            return False
+        try:
+            return bool(cache.get(self.chave_sticky(usuario_id)))
+        except Exception:
+            # Sem cache não há como garantir read-your-writes: usa o primário
+            return True
+
+    def chave_sticky(self, usuario_id):
+        return f'replica:sticky:{usuario_id}'
+
+    def identificar_usuario(self, request):
+        """Id do usuário a partir do JWT ou da sessão, sem consultar o banco"""
+        autorizacao = request.headers.get('Authorization', '')
+        if autorizacao.startswith('Bearer '):
+            from rest_framework_simplejwt.tokens import AccessToken
+            from rest_framework_simplejwt.settings import api_settings
+            try:
+                token = AccessToken(autorizacao.split(' ', 1)[1])
+                return token.get(api_settings.USER_ID_CLAIM)
+            except Exception:
+                return None
+
+        session = getattr(request, 'session', None)
+        if session is not None:
+            from django.contrib.auth import SESSION_KEY
+            return session.get(SESSION_KEY)
+        return None
+
+
+class CompressaoMiddleware(GZipMiddleware):
+    """
+    Comprime as respostas com brotli (se instalado e aceito pelo cliente) ou gzip
+    Respostas em streaming (CSV) usam gzip; xlsx, PDF e imagens seguem sem compressão
+    """
+
+    def process_response(self, request, response):
+        tipo = response.get('Content-Type', '')
+        if tipo.startswith(TIPOS_JA_COMPRIMIDOS):
+            return response
+
+        if not response.streaming and len(response.content) < settings.COMPRESSAO_TAMANHO_MINIMO:
+            return response
+
+        if (
+            brotli is None or
+            response.streaming or
+            response.has_header('Content-Encoding') or
+            not re_aceita_brotli.search(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        comprimido = brotli.compress(
+            response.content,
+            mode=brotli.MODE_TEXT,
+            quality=settings.COMPRESSAO_BROTLI_QUALIDADE,
+        )
+        if len(comprimido) >= len(response.content):
+            return response
+
+        response.content = comprimido
+        response.headers['Content-Length'] = str(len(comprimido))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
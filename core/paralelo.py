@@ -0,0 +1,86 @@
+"""
+Execução concorrente de consultas independentes
+Cada thread do pool usa sua própria conexão com o banco (conexões do Django são
+por thread), então consultas independentes de uma view rodam em paralelo e a
+latência se aproxima da consulta mais lenta, não da soma de todas.
+"""
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+
+
+_pool = None
+_lock = threading.Lock()
+
+
+def _obter_pool():
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=settings.CONSULTAS_PARALELAS_THREADS,
+                    thread_name_prefix='consultas',
+                )
+    return _pool
+
+
+def _executar_na_thread(funcao):
+    from apps.monitoramento.instrumentacao import medicao_atual
+
+    # Mesmo ciclo de uma requisição: descarta conexões expiradas/quebradas antes e depois
+    close_old_connections()
+    try:
+        medicao = medicao_atual.get()
+        if medicao is None:
+            return funcao()
+        # Queries das threads também entram no Server-Timing da requisição
+        with connection.execute_wrapper(medicao.registrar_sql):
+            return funcao()
+    finally:
+        close_old_connections()
+
+
+def executar_em_paralelo(tarefas):
+    """
+    Executa {nome: função} e retorna {nome: resultado}
+    As funções devem apenas ler do banco. Dentro de uma transação (atomic) executa
+    em sequência, pois outras conexões não enxergariam os dados não confirmados.
+    """
+    if (
+        not getattr(settings, 'CONSULTAS_PARALELAS_ATIVO', False) or
+        len(tarefas) < 2 or
+        connection.in_atomic_block
+    ):
+        return {nome: funcao() for nome, funcao in tarefas.items()}
+
+    pool = _obter_pool()
+    # Cada tarefa herda o contexto da requisição (roteamento para réplicas, instrumentação)
+    futuros = {
+        nome: pool.submit(contextvars.copy_context().run, _executar_na_thread, funcao)
+        for nome, funcao in tarefas.items()
+    }
+    return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+
+def encerrar_conexoes():
+    """Fecha as conexões mantidas pelas threads do pool e descarta o pool"""
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is None:
+        return
+
+    # A barreira garante que cada tarefa rode em uma thread diferente do pool
+    barreira = threading.Barrier(pool._max_workers)
+
+    def fechar():
+        barreira.wait(timeout=10)
+        connections.close_all()
+
+    for futuro in [pool.submit(fechar) for _ in range(pool._max_workers)]:
+        futuro.result()
+    pool.shutdown(wait=True)
@@ -0,0 +1,26 @@
+"""
+Clientes Redis compartilhados pelo processo (um pool de conexões por URL)
+"""
+import threading
+
+import redis
+
+
+_clientes = {}
+_lock = threading.Lock()
+
+
+def cliente_redis(url, timeout=0.5):
+    """Retorna um cliente Redis reaproveitado para a URL informada"""
+    cliente = _clientes.get(url)
+    if cliente is None:
+        with _lock:
+            cliente = _clientes.get(url)
+            if cliente is None:
+                cliente = redis.Redis.from_url(
+                    url,
+                    socket_timeout=timeout,
+                    socket_connect_timeout=timeout,
+                )
+                _clientes[url] = cliente
+    return cliente
@@ -0,0 +1,28 @@
+"""
+Renderização JSON com orjson
+Mesma saída do JSONRenderer do DRF para os tipos produzidos pelos serializers, com
+datetime/UUID/dataclasses serializados nativamente em C. Tipos que o orjson não
+conhece (Decimal, lazy strings, QuerySet, timedelta) passam pelo encoder do DRF.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+_encoder = JSONEncoder()
+
+OPCOES = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer com orjson (a API navegável continua recebendo JSON indentado)"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        opcoes = OPCOES
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            opcoes |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=_encoder.default, option=opcoes)
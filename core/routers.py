@@ -0,0 +1,53 @@
+"""
+Roteamento de leituras para réplicas do PostgreSQL
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+
+# Quando True, leituras da requisição/tarefa corrente podem ir para uma réplica
+_leitura_em_replica = ContextVar('leitura_em_replica', default=False)
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def usar_replica(ativo=True):
+    """Direciona as leituras do bloco para as réplicas (ex.: tarefas de relatório)"""
+    token = _leitura_em_replica.set(ativo)
+    try:
+        yield
+    finally:
+        _leitura_em_replica.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Leituras vão para uma réplica apenas quando o contexto permite
+    (GET de relatórios/listagens sem escrita recente do usuário); escritas sempre no primário
+    """
+
+    def db_for_read(self, model, **hints):
+        if not _leitura_em_replica.get():
+            return None
+        aliases = replicas()
+        if not aliases:
+            return None
+        return random.choice(aliases)
+
+    def db_for_write(self, model, **hints):
+        # Após qualquer escrita, o restante do contexto lê do primário
+        _leitura_em_replica.set(False)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
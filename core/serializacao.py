@@ -0,0 +1,235 @@
+"""
+Serializers rápidos de leitura e campos sob demanda (?fields= / ?expand=)
+
+Os serializers rápidos buscam apenas as colunas necessárias com values() e montam
+dicts diretamente, sem instanciar modelos nem percorrer os campos do DRF linha a
+linha. A saída é idêntica à dos serializers DRF equivalentes (mesma ordem de chaves
+e mesmos formatos).
+
+Em requisições de leitura, `?fields=id,status` limita os campos retornados e
+`?expand=empresa` inclui o objeto relacionado aninhado (ex.: empresa_detalhes).
+As consultas acompanham os campos pedidos: apenas as colunas e os joins usados.
+"""
+from decimal import Decimal
+from operator import itemgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+
+_QUANTIZADORES = {casas: Decimal('.1') ** casas for casas in range(7)}
+
+
+def decimal_drf(valor, casas):
+    """Mesmo formato do DecimalField do DRF (string com casas fixas)"""
+    if valor is None:
+        return ''
+    if not isinstance(valor, Decimal):
+        valor = Decimal(str(valor).strip())
+    return '{:f}'.format(valor.quantize(_QUANTIZADORES[casas]))
+
+
+def data_hora_drf(valor):
+    """Mesmo formato do DateTimeField do DRF (ISO 8601 no fuso atual, 'Z' para UTC)"""
+    if not valor:
+        return None
+    texto = timezone.localtime(valor).isoformat()
+    if texto.endswith('+00:00'):
+        texto = texto[:-6] + 'Z'
+    return texto
+
+
+def percentual_ocupacao(peso_atual, capacidade):
+    """Mesmo cálculo de Bombona.percentual_ocupacao"""
+    if capacidade > 0:
+        return round((float(peso_atual) / float(capacidade)) * 100, 2)
+    return 0.0
+
+
+def _lista_parametro(request, nome):
+    valor = request.query_params.get(nome, '')
+    return [parte.strip() for parte in valor.split(',') if parte.strip()]
+
+
+def campos_da_requisicao(request):
+    """
+    (campos, expandir) pedidos em ?fields= e ?expand=
+    campos é None quando o cliente não restringiu a resposta
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    campos = _lista_parametro(request, 'fields')
+    return (set(campos) if campos else None), set(_lista_parametro(request, 'expand'))
+
+
+# Definições de campos dos serializers rápidos: (colunas do values(), função(linha))
+
+def coluna(nome):
+    return (nome,), itemgetter(nome)
+
+
+def rotulo(nome, opcoes, padrao=None):
+    """Rótulo de choices ou cor a partir de um dict pré-calculado"""
+    opcoes = dict(opcoes)
+    if padrao is None:
+        return (nome,), lambda linha: opcoes.get(linha[nome], linha[nome])
+    return (nome,), lambda linha: opcoes.get(linha[nome], padrao)
+
+
+def decimal(nome, casas):
+    # values() já devolve Decimal: formata sem passar por decimal_drf a cada linha
+    quantizador = _QUANTIZADORES[casas]
+    formatar = '{:f}'.format
+
+    def valor(linha):
+        numero = linha[nome]
+        if numero is None:
+            return ''
+        return formatar(numero.quantize(quantizador))
+    return (nome,), valor
+
+
+def data_hora(nome):
+    return (nome,), lambda linha: data_hora_drf(linha[nome])
+
+
+def calculado(colunas, funcao):
+    return tuple(colunas), funcao
+
+
+class SerializerRapido:
+    """
+    Serializer somente leitura sobre linhas de values()
+    Subclasses definem `campos`: {nome na saída: (colunas, função)} na ordem da saída
+    """
+
+    campos = {}
+
+    def __init__(self, linhas, many=True, campos=None):
+        self.linhas = linhas
+        self.selecionados = [(nome, funcao) for nome, (_, funcao) in self.selecionar(campos)]
+
+    @classmethod
+    def selecionar(cls, campos=None):
+        if campos is None:
+            return list(cls.campos.items())
+        return [(nome, definicao) for nome, definicao in cls.campos.items() if nome in campos]
+
+    @classmethod
+    def valores(cls, queryset, campos=None):
+        """values() apenas com as colunas (e joins) dos campos selecionados"""
+        colunas = []
+        for _, (dependencias, _) in cls.selecionar(campos):
+            for nome in dependencias:
+                if nome not in colunas:
+                    colunas.append(nome)
+        return queryset.values(*(colunas or ['id']))
+
+    def representar(self, linha):
+        return {nome: funcao(linha) for nome, funcao in self.selecionados}
+
+    @property
+    def data(self):
+        representar = self.representar
+        return [representar(linha) for linha in self.linhas]
+
+
+class ListagemRapidaMixin:
+    """
+    Usa `serializer_rapido_class` no GET de listagem, mantendo filtros,
+    busca, ordenação e paginação da view genérica
+    """
+
+    serializer_rapido_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.serializer_rapido_class
+        campos, _ = campos_da_requisicao(request)
+        queryset = serializer_class.valores(self.filter_queryset(self.get_queryset()), campos)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page, campos=campos).data)
+
+        return Response(serializer_class(queryset, campos=campos).data)
+
+
+class CamposDinamicosMixin:
+    """
+    ModelSerializer com ?fields= e ?expand= nas requisições de leitura
+
+    `expansiveis` mapeia o nome usado em ?expand= para o campo aninhado.
+    `dependencias` lista as colunas usadas por propriedades do modelo, para que
+    a view carregue só o necessário com only().
+    Sem ?fields= a resposta é a completa (inclusive os objetos aninhados).
+    """
+
+    expansiveis = {}
+    dependencias = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Serializers aninhados não recebem contexto na criação: só o principal é filtrado
+        campos, expandir = campos_da_requisicao(self.context.get('request'))
+        if campos is None:
+            return
+        permitidos = campos | {self.expansiveis[nome] for nome in expandir if nome in self.expansiveis}
+        for nome in list(self.fields):
+            if nome not in permitidos:
+                self.fields.pop(nome)
+
+
+def otimizar_queryset(queryset, serializer):
+    """
+    select_related/only() de acordo com os campos do serializer
+    Quando algum campo não pode ser mapeado para colunas, carrega todas (sem only())
+    """
+    modelo = queryset.model
+    dependencias = getattr(serializer, 'dependencias', {})
+    relacionados = set()
+    colunas = {modelo._meta.pk.name}
+    completo = True
+
+    for nome, campo in serializer.fields.items():
+        if isinstance(campo, serializers.SerializerMethodField) or campo.source == '*':
+            continue
+        if nome in dependencias:
+            colunas.update(dependencias[nome])
+            continue
+
+        raiz = campo.source_attrs[0]
+        if raiz.startswith('get_') and raiz.endswith('_display'):
+            raiz = raiz[len('get_'):-len('_display')]
+        try:
+            campo_modelo = modelo._meta.get_field(raiz)
+        except FieldDoesNotExist:
+            completo = False
+            continue
+
+        if campo_modelo.is_relation and not campo_modelo.concrete:
+            completo = False
+            continue
+        colunas.add(campo_modelo.name)
+        if campo_modelo.is_relation and (len(campo.source_attrs) > 1 or isinstance(campo, serializers.BaseSerializer)):
+            relacionados.add(campo_modelo.name)
+
+    queryset = queryset.select_related(None)
+    if relacionados:
+        queryset = queryset.select_related(*relacionados)
+    if completo:
+        queryset = queryset.only(*colunas)
+    return queryset
+
+
+class CamposDinamicosViewMixin:
+    """Ajusta joins e colunas do queryset aos campos pedidos em ?fields="""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        campos, _ = campos_da_requisicao(self.request)
+        if campos is None:
+            return queryset
+        return otimizar_queryset(queryset, self.get_serializer())
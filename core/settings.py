@@ -44,17 +44,23 @@ INSTALLED_APPS = [
     'apps.alertas',
     'apps.relatorios',
     'apps.simulator',
+    'apps.monitoramento',
 ]
 
 MIDDLEWARE = [
+    'apps.monitoramento.middleware.MetricasMiddleware',
+    'apps.monitoramento.middleware.DesempenhoMiddleware',
+    'core.middleware.CompressaoMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.monitoramento.middleware.ProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -78,6 +84,19 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 
 
+# Tipo de processo (web, worker, beat): define o reaproveitamento de conexões
+PROCESSO = config('IOWASTE_PROCESSO', default='web')
+
+# Tempo (s) que uma conexão é mantida aberta e reaproveitada entre requisições/tarefas.
+# O web e os workers mantêm uma conexão persistente por thread/processo filho;
+# o beat quase não acessa o banco e fecha a conexão ao fim de cada uso.
+DB_CONN_MAX_AGE_PADRAO = {
+    'web': 600,
+    'worker': 300,
+    'beat': 0,
+}
+
+
 # Database
 DATABASES = {
     'default': {
@@ -87,9 +106,45 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='iowaste123'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=DB_CONN_MAX_AGE_PADRAO.get(PROCESSO, 0), cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # Necessário quando DB_HOST aponta para um PgBouncer em modo transaction
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_PGBOUNCER', default=False, cast=bool),
+        'OPTIONS': {
+            'application_name': f'iowaste-{PROCESSO}',
+            'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+            'keepalives': 1,
+            'keepalives_idle': 60,
+        },
     }
 }
 
+# Réplicas de leitura (host:porta separados por vírgula) usadas por relatórios, dashboards e listagens
+DATABASE_REPLICAS = []
+for indice, replica in enumerate(filter(None, config('DB_REPLICA_HOSTS', default='').split(',')), start=1):
+    host, _, porta = replica.strip().partition(':')
+    alias = f'replica_{indice}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': porta or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Prefixos de rotas cujos GETs podem ler das réplicas
+REPLICA_ROTAS = [
+    '/api/relatorios/',
+    '/api/bombonas/',
+    '/api/coletas/',
+    '/api/alertas/',
+    '/api/empresas/',
+]
+# Após uma escrita, o usuário lê do primário por este período (read-your-writes)
+REPLICA_STICKY_SEGUNDOS = config('REPLICA_STICKY_SEGUNDOS', default=15, cast=int)
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -133,6 +188,10 @@ AUTH_USER_MODEL = 'authentication.User'
 
 # REST Framework
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
@@ -148,6 +207,11 @@ REST_FRAMEWORK = {
 }
 
 
+# Compressão das respostas (brotli quando o pacote está instalado, senão gzip)
+COMPRESSAO_TAMANHO_MINIMO = config('COMPRESSAO_TAMANHO_MINIMO', default=1024, cast=int)
+COMPRESSAO_BROTLI_QUALIDADE = config('COMPRESSAO_BROTLI_QUALIDADE', default=5, cast=int)
+
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_LIFETIME', default=60, cast=int)),
@@ -170,14 +234,105 @@ CORS_ALLOWED_ORIGINS = config(
 CORS_ALLOW_CREDENTIALS = True
 
 
+# Redis
+REDIS_URL = f"redis://{config('REDIS_HOST', default='localhost')}:{config('REDIS_PORT', default='6379')}"
+
+
+# Cache
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': f"{REDIS_URL}/2",
+        'KEY_PREFIX': 'iowaste',
+    }
+}
+
+
+# Estado atual das bombonas (última leitura) no Redis; o PostgreSQL segue como fonte da verdade
+ESTADO_ATUAL_ATIVO = config('ESTADO_ATUAL_ATIVO', default=True, cast=bool)
+ESTADO_ATUAL_REDIS_URL = f"{REDIS_URL}/3"
+
+
+# Relatórios: o PDF é desenhado linha a linha; períodos maiores devem ser exportados em CSV/Excel
+RELATORIOS_EXPORTACAO_PDF_MAX_LINHAS = config('RELATORIOS_EXPORTACAO_PDF_MAX_LINHAS', default=50000, cast=int)
+# Exportações assíncronas: arquivos em MEDIA_ROOT/exportacoes, removidos após a retenção
+RELATORIOS_EXPORTACAO_RETENCAO_DIAS = config('RELATORIOS_EXPORTACAO_RETENCAO_DIAS', default=7, cast=int)
+
+
+# Coalescência dos relatórios caros (relatorio_por_empresa, dashboard_graficos)
+COALESCENCIA_VALIDADE = config('COALESCENCIA_VALIDADE', default=60, cast=int)  # segundos servindo sem recálculo
+COALESCENCIA_TOLERANCIA = config('COALESCENCIA_TOLERANCIA', default=600, cast=int)  # segundos servindo o anterior durante o recálculo
+COALESCENCIA_ESPERA = config('COALESCENCIA_ESPERA', default=15, cast=int)  # espera máxima pelo cálculo de outra requisição
+COALESCENCIA_DURACAO_LOCK = config('COALESCENCIA_DURACAO_LOCK', default=300, cast=int)  # validade do lock do cálculo (maior que o cálculo mais lento)
+
+# Contagens por faceta (/facetas/): em cache por versão dos dados, no máximo por este tempo
+FACETAS_VALIDADE = config('FACETAS_VALIDADE', default=300, cast=int)
+
+# Regras de alerta: segundos entre as verificações da versão das regras em cada processo
+REGRAS_ALERTA_INTERVALO = config('REGRAS_ALERTA_INTERVALO', default=5, cast=int)
+
+
+# Consultas independentes dos dashboards em paralelo (cada thread mantém sua conexão:
+# some CONSULTAS_PARALELAS_THREADS por processo web ao dimensionar max_connections/PgBouncer)
+CONSULTAS_PARALELAS_ATIVO = config('CONSULTAS_PARALELAS_ATIVO', default=True, cast=bool)
+CONSULTAS_PARALELAS_THREADS = config('CONSULTAS_PARALELAS_THREADS', default=4, cast=int)
+
+
 # Celery Configuration
-CELERY_BROKER_URL = f"redis://{config('REDIS_HOST', default='localhost')}:{config('REDIS_PORT', default='6379')}/0"
-CELERY_RESULT_BACKEND = f"redis://{config('REDIS_HOST', default='localhost')}:{config('REDIS_PORT', default='6379')}/0"
+CELERY_BROKER_URL = f"{REDIS_URL}/0"
+CELERY_RESULT_BACKEND = f"{REDIS_URL}/0"
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Filas separadas para que exportações e limpezas longas não atrasem o tick do simulador:
+# ingestao (simulação/leituras), relatorios (relatórios/exportações) e manutencao.
+# Tarefas sem rota vão para manutencao, nunca para a fila do simulador.
+CELERY_TASK_DEFAULT_QUEUE = 'manutencao'
+CELERY_TASK_ROUTES = {
+    'apps.simulator.tasks.simulate_iot_readings': {'queue': 'ingestao'},
+    'apps.simulator.tasks.reset_full_bombonas': {'queue': 'manutencao'},
+    'apps.relatorios.tasks.remover_exportacoes_antigas': {'queue': 'manutencao'},
+    'apps.relatorios.tasks.*': {'queue': 'relatorios'},
+    'apps.authentication.tasks.*': {'queue': 'manutencao'},
+    'apps.bombonas.tasks.*': {'queue': 'manutencao'},
+}
+
+# Concorrência e prefetch de cada fila. Um worker por fila informa IOWASTE_FILA:
+#   IOWASTE_PROCESSO=worker IOWASTE_FILA=ingestao celery -A core worker -Q ingestao -n ingestao@%h
+# Tarefas longas usam prefetch 1 (um worker ocupado não segura mensagens da fila)
+CELERY_FILAS = {
+    'ingestao': {'concorrencia': 4, 'prefetch': 4},
+    'relatorios': {'concorrencia': 2, 'prefetch': 1},
+    'manutencao': {'concorrencia': 1, 'prefetch': 1},
+}
+FILA = config('IOWASTE_FILA', default='')
+if FILA in CELERY_FILAS:
+    CELERY_WORKER_CONCURRENCY = config('CELERY_CONCORRENCIA', default=CELERY_FILAS[FILA]['concorrencia'], cast=int)
+    CELERY_WORKER_PREFETCH_MULTIPLIER = CELERY_FILAS[FILA]['prefetch']
+else:
+    CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+
+
+# Monitoramento de desempenho
+MONITORAMENTO_ATIVO = config('MONITORAMENTO_ATIVO', default=DEBUG, cast=bool)
+MONITORAMENTO_AMOSTRAGEM = config('MONITORAMENTO_AMOSTRAGEM', default=1.0, cast=float)  # fração de requisições (0 a 1)
+MONITORAMENTO_LIMITE_LENTO_MS = config('MONITORAMENTO_LIMITE_LENTO_MS', default=500, cast=int)
+
+# Métricas (Prometheus): 'memoria' mantém por processo, 'redis' agrega entre workers
+MONITORAMENTO_METRICAS_ATIVO = config('MONITORAMENTO_METRICAS_ATIVO', default=True, cast=bool)
+MONITORAMENTO_METRICAS_BACKEND = config('MONITORAMENTO_METRICAS_BACKEND', default='redis')
+MONITORAMENTO_METRICAS_REDIS_URL = f"{REDIS_URL}/1"
+MONITORAMENTO_METRICAS_INTERVALO = config('MONITORAMENTO_METRICAS_INTERVALO', default=10, cast=int)  # segundos
+MONITORAMENTO_METRICAS_TOKEN = config('MONITORAMENTO_METRICAS_TOKEN', default='')  # vazio: endpoint desativado
+
+# Profiler sob demanda (header X-Profile, apenas administradores)
+MONITORAMENTO_PROFILER_ATIVO = config('MONITORAMENTO_PROFILER_ATIVO', default=True, cast=bool)
+MONITORAMENTO_PROFILER_DIR = config('MONITORAMENTO_PROFILER_DIR', default=str(BASE_DIR / 'perfis'))
+MONITORAMENTO_PROFILER_MAX = config('MONITORAMENTO_PROFILER_MAX', default=50, cast=int)  # perfis mantidos em disco
+MONITORAMENTO_PROFILER_MAX_EXPLAIN = config('MONITORAMENTO_PROFILER_MAX_EXPLAIN', default=50, cast=int)
+
 
 # Swagger Settings
 SWAGGER_SETTINGS = {
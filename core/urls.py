@@ -38,6 +38,7 @@ urlpatterns = [
     path('api/alertas/', include('apps.alertas.urls')),
     path('api/relatorios/', include('apps.relatorios.urls')),
     path('api/simulator/', include('apps.simulator.urls')),
+    path('api/monitoramento/', include('apps.monitoramento.urls')),
 ]
 
 if settings.DEBUG: